@@ -0,0 +1,185 @@
+import collections
+import os
+import threading
+import time
+
+from stream_profiles import FRAME_BUDGET_MS, active_processors, cpu_load, processing_load
+
+# ============================================================
+#   ADMISSION CONTROL
+#   Process-wide gate in front of the video sessions. New
+#   sessions are admitted while there is capacity, otherwise
+#   queued (FIFO) or refused. Under load, running sessions are
+#   degraded one service tier at a time, newest first, so the
+#   people who were already practicing keep the full experience
+#   the longest; tiers are restored oldest first.
+# ============================================================
+
+TIER_FULL = 0         # All three models + every effect
+TIER_LANDMARKS = 1    # All three models, landmark overlay + sidebar only
+TIER_POSE = 2         # Pose model only, skeleton overlay
+TIER_PASSTHROUGH = 3  # Mirrored camera, no inference
+
+TIER_NAMES = ("Full effects", "Landmarks only", "Pose only", "Passthrough")
+
+MAX_SESSIONS = int(os.environ.get("YOGA_MAX_SESSIONS", os.cpu_count() or 1))
+MAX_QUEUE = int(os.environ.get("YOGA_MAX_QUEUE", MAX_SESSIONS))
+
+DEGRADE_LOAD = 0.9      # Load (1.0 = saturated) above which sessions are degraded
+RESTORE_LOAD = 0.6      # ... and below which they are restored
+SATURATED_LOAD = 1.1    # No new admissions above this, even with free slots
+DEGRADE_HOLD_S = 3.0    # Load must stay high this long before each step down
+RESTORE_HOLD_S = 15.0   # ... and low this long before each step up
+ADMITTED_TTL_S = 60.0   # An admitted page that never starts / stops polling frees its slot
+QUEUED_TTL_S = 15.0     # A queued page that stops re-polling leaves the line
+
+Ticket = collections.namedtuple("Ticket", "status position")
+ADMITTED = "admitted"
+QUEUED = "queued"
+REFUSED = "refused"
+
+
+class AdmissionController:
+    """
+    Session gate + tier assignment, shared by every Streamlit session.
+
+        ticket = admission.request(session_key)  # once per script run
+        admission.touch(session_key)             # while the stream plays
+        admission.release(session_key)           # when the stream stops
+        admission.update()                       # re-tiers, at most once per second
+
+    Processors are tiered through `active_processors`; each carries a
+    `tier` attribute and a `session_start` used for newest-first ordering.
+    """
+    def __init__(self, max_sessions=MAX_SESSIONS, max_queue=MAX_QUEUE, budget_ms=FRAME_BUDGET_MS):
+        self.max_sessions = max_sessions
+        self.max_queue = max_queue
+        self.budget_ms = budget_ms
+        self.admitted = collections.OrderedDict()  # key -> last seen
+        self.waiting = collections.OrderedDict()   # key -> last seen (FIFO)
+        self.load = 0.0
+        self.high_since = None
+        self.low_since = None
+        self.last_sample = 0.0
+        self.refused = 0
+        self.lock = threading.Lock()
+
+    def _prune(self, now):
+        for table, ttl in ((self.admitted, ADMITTED_TTL_S), (self.waiting, QUEUED_TTL_S)):
+            for key in [k for k, seen in table.items() if now - seen > ttl]:
+                del table[key]
+
+    def request(self, key, now=None):
+        """Admits, queues or refuses `key`; idempotent, so it is safe on every rerun."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self._prune(now)
+            if key in self.admitted:
+                self.admitted[key] = now
+                return Ticket(ADMITTED, 0)
+            first_in_line = not self.waiting or next(iter(self.waiting)) == key
+            if first_in_line and len(self.admitted) < self.max_sessions and self.load < SATURATED_LOAD:
+                self.waiting.pop(key, None)
+                self.admitted[key] = now
+                print(f"[INFO] Session admitted ({len(self.admitted)}/{self.max_sessions})")
+                return Ticket(ADMITTED, 0)
+            if key in self.waiting or len(self.waiting) < self.max_queue:
+                self.waiting[key] = now
+                return Ticket(QUEUED, list(self.waiting).index(key) + 1)
+            self.refused += 1
+            return Ticket(REFUSED, 0)
+
+    def touch(self, key, now=None):
+        """Keeps an admitted session's slot while its stream is playing."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if key in self.admitted:
+                self.admitted[key] = now
+
+    def release(self, key):
+        """Frees `key`'s slot (or place in line) right away instead of at its TTL."""
+        with self.lock:
+            self.admitted.pop(key, None)
+            self.waiting.pop(key, None)
+
+    def update(self, now=None, load=None, processors=None):
+        """Samples the load and moves at most one session one tier; returns the load."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if now - self.last_sample < 1.0 and load is None:
+                return self.load
+            self.last_sample = now
+            self.load = max(cpu_load(), processing_load(self.budget_ms)) if load is None else load
+            procs = sorted(active_processors if processors is None else processors,
+                           key=lambda p: p.session_start)
+
+            if self.load > DEGRADE_LOAD:
+                self.low_since = None
+                if self.high_since is None:
+                    self.high_since = now
+                elif now - self.high_since >= DEGRADE_HOLD_S:
+                    self.high_since = now
+                    for p in reversed(procs): # Newest first
+                        if p.tier < TIER_PASSTHROUGH:
+                            p.set_tier(p.tier + 1)
+                            print(f"[WARN] Load {self.load:.2f}: session degraded to {TIER_NAMES[p.tier]}")
+                            break
+            elif self.load < RESTORE_LOAD:
+                self.high_since = None
+                if self.low_since is None:
+                    self.low_since = now
+                elif now - self.low_since >= RESTORE_HOLD_S:
+                    self.low_since = now
+                    for p in procs: # Oldest first
+                        if p.tier > TIER_FULL:
+                            p.set_tier(p.tier - 1)
+                            print(f"[INFO] Load {self.load:.2f}: session restored to {TIER_NAMES[p.tier]}")
+                            break
+            else:
+                self.high_since = self.low_since = None
+            return self.load
+
+    def stats(self):
+        with self.lock:
+            return {
+                "admitted": len(self.admitted),
+                "queued": len(self.waiting),
+                "refused": self.refused,
+                "max_sessions": self.max_sessions,
+                "load": self.load,
+            }
+
+
+# Shared by every Streamlit session of this process
+admission = AdmissionController()
+
+
+if __name__ == "__main__":
+    # Capacity 2 + queue 1: the third page waits, the fourth is refused;
+    # overload degrades the newest session first and recovery restores the oldest first
+    class FakeProcessor:
+        def __init__(self, start):
+            self.session_start = start
+            self.tier = TIER_FULL
+
+        def set_tier(self, tier):
+            self.tier = tier
+
+    gate = AdmissionController(max_sessions=2, max_queue=1)
+    tickets = [gate.request(k, now=0.0) for k in "abcd"]
+    print(f"[INFO] Tickets: {[t.status for t in tickets]}")
+    assert [t.status for t in tickets] == [ADMITTED, ADMITTED, QUEUED, REFUSED]
+    gate.release("a")
+    assert gate.request("d", now=1.0).status == REFUSED # "c" is still first in line
+    assert gate.request("c", now=1.0).status == ADMITTED
+
+    old, new = FakeProcessor(0.0), FakeProcessor(10.0)
+    t = 0.0
+    for load, seconds in ((1.3, 10), (0.3, 40)):
+        for _ in range(seconds):
+            t += 1.0
+            gate.update(now=t, load=load, processors=[old, new])
+        print(f"[INFO] load={load}: old={TIER_NAMES[old.tier]}, new={TIER_NAMES[new.tier]}")
+        if load > DEGRADE_LOAD:
+            assert new.tier > old.tier, "The newest session must be degraded first"
+    assert old.tier == TIER_FULL and new.tier < TIER_PASSTHROUGH
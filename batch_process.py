@@ -0,0 +1,610 @@
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import sys
+import time
+import types
+import cv2
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from landmark_filter import LandmarkSmoother
+from practice_state import PracticeState, StateTimer, replay_xp, xp_flags
+from telemetry import SCHEMA, TELEMETRY_BATCH_ROWS, TelemetryRecorder
+
+# ============================================================
+#   BATCH PROCESSOR
+#   Headless analysis of recorded practice videos: the same
+#   models, landmark smoothing and PracticeState rules as the
+#   live app, one worker process per core with its own models.
+#   Per video it writes <name>.report.json and
+#   <name>.telemetry.parquet. The report is written last
+#   (atomically), so a re-run skips every finished video and
+#   redoes only the interrupted ones.
+#
+#   Long videos are split into chunks of --chunk-min minutes
+#   that run in parallel too. Each chunk first replays a
+#   --warmup-s overlap of the previous one without counting it,
+#   so tracking, the energy model and the breath / meditation
+#   trackers are converged when its own frames start. The
+#   chunks are then stitched into one timeline; XP and levels
+#   are replayed over the whole session. --verify also runs
+#   chunked videos in one piece and compares the two;
+#   --self-check does the same on a synthetic clip with scripted
+#   stand-in models.
+#
+#   python batch_process.py classes/ extra.mp4 --out reports
+# ============================================================
+
+VIDEO_EXTS = (".mp4", ".mov", ".mkv", ".avi", ".webm", ".m4v")
+REPORT_SUFFIX = ".report.json"
+TELEMETRY_SUFFIX = ".telemetry.parquet"
+NAN = float("nan") # No heart-rate sensor in recorded videos
+
+CHUNK_MIN = 10.0   # Split videos into chunks of about this many minutes (0 = never)
+WARMUP_S = 30.0    # Uncounted overlap replayed before each chunk; MeditationTracker needs ~7 s to converge
+
+# --verify tolerances, chunked vs one piece
+VERIFY_FRAME_MATCH = 0.99 # Share of frames with the same mudra and stage
+VERIFY_ENERGY_TOL = 0.02  # Mean absolute chakra energy difference
+VERIFY_REL_TOL = 0.02     # XP and hold / stage durations (relative, at least 1 s or 1 XP)
+
+
+def find_videos(inputs):
+    """Video files among `inputs` (files or directories, searched recursively), sorted."""
+    videos = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                videos += [os.path.join(root, f) for f in files if f.lower().endswith(VIDEO_EXTS)]
+        elif os.path.isfile(item):
+            videos.append(item)
+        else:
+            print(f"[WARN] Not found: {item}")
+    return sorted(set(os.path.abspath(v) for v in videos))
+
+
+def output_names(videos):
+    """Video -> output base name; file stems, disambiguated by a path hash when they collide."""
+    stems = [os.path.splitext(os.path.basename(v))[0] for v in videos]
+    names = {}
+    for video, stem in zip(videos, stems):
+        if stems.count(stem) > 1:
+            stem += "-" + hashlib.sha1(video.encode()).hexdigest()[:8]
+        names[video] = stem
+    return names
+
+
+def source_info(video):
+    st = os.stat(video)
+    return {"video": video, "size": st.st_size, "mtime": st.st_mtime}
+
+
+def is_done(video, report_path):
+    """True if a report for this exact source file (same size + mtime) exists."""
+    try:
+        with open(report_path) as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return False
+    info = source_info(video)
+    return report.get("size") == info["size"] and report.get("mtime") == info["mtime"]
+
+
+def write_json_atomic(path, data):
+    tmp = path + ".part"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def probe(video):
+    """(fps, frame_count) from the container; the count may be an estimate."""
+    cap = cv2.VideoCapture(video)
+    try:
+        return cap.get(cv2.CAP_PROP_FPS) or 30.0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    finally:
+        cap.release()
+
+
+def seek(cap, video, index, fps):
+    """
+    Positions `cap` so that its next read() returns frame `index`; returns the
+    capture (a new one if it had to be reopened). CAP_PROP_POS_FRAMES is not
+    proof of where a seek landed (FFmpeg echoes the request back after landing
+    on a nearby keyframe), so the decoded frame's own timestamp is checked:
+    short of the target, grab forward; past it or unknown, decode from the start.
+    """
+    if index <= 0:
+        return cap
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, index - 1) and cap.grab():
+        msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+        landed = int(round(msec * fps / 1000.0)) if msec >= 0 else index
+        if landed <= index - 1:
+            for _ in range(index - 1 - landed):
+                if not cap.grab():
+                    break
+            return cap
+    cap.release()
+    cap = cv2.VideoCapture(video)
+    for _ in range(index):
+        if not cap.grab():
+            break
+    return cap
+
+
+def plan_chunks(frame_count, fps, chunk_s=CHUNK_MIN * 60, warmup_s=WARMUP_S):
+    """
+    (start, end, warmup) frame ranges covering the video. end is None for
+    the last chunk, which reads to the end of the file whatever the count says.
+    """
+    n = int(frame_count / (chunk_s * fps) + 0.5) if chunk_s > 0 else 0
+    if n < 2:
+        return [(0, None, 0)]
+    size = -(-frame_count // n)
+    warm = int(warmup_s * fps)
+    return [(k * size, (k + 1) * size if k < n - 1 else None, min(warm, k * size)) for k in range(n)]
+
+
+class VideoAnalyzer:
+    """
+    The models of one worker process, reused for every video it is given.
+    models: (hands, face_mesh, pose) stand-ins with process() / reset(), for the self-check.
+    """
+    def __init__(self, models=None):
+        if models is None:
+            import mediapipe as mp # Here, so the self-check runs without MediaPipe
+            # Same settings as the live app (main2.main)
+            models = (mp.solutions.hands.Hands(max_num_hands=2, min_detection_confidence=0.5, min_tracking_confidence=0.5),
+                      mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True,
+                                                      min_detection_confidence=0.5, min_tracking_confidence=0.5),
+                      mp.solutions.pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5, model_complexity=0))
+        self.hands, self.face_mesh, self.pose = models
+
+    def analyze(self, video, telemetry_path=None, start=0, end=None, warmup=0):
+        """
+        Runs the practice pipeline over frames [start, end) of `video` (end None:
+        to the end of the file), after `warmup` uncounted frames before `start`.
+        Returns the chunk's results for stitch().
+        """
+        cap = cv2.VideoCapture(video)
+        if not cap.isOpened():
+            raise IOError(f"could not open {video}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # Timeline in wall-clock seconds: the file's mtime is roughly the end of the recording
+        base_t = os.path.getmtime(video) - frame_count / fps
+        first = start - warmup
+        cap = seek(cap, video, first, fps)
+
+        # Tracking state must not leak from the previous video
+        for model in (self.hands, self.face_mesh, self.pose):
+            model.reset()
+        state = PracticeState()
+        smoother = LandmarkSmoother()
+        stages = StateTimer()
+        stages.MAX_GAP_S = max(StateTimer.MAX_GAP_S, 2.0 / fps)
+        telemetry = TelemetryRecorder(telemetry_path).start() if telemetry_path else None
+
+        flags = bytearray()
+        gyan0 = alignments0 = 0
+        t_start = time.perf_counter()
+        i = first
+        try:
+            while end is None or i < end:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                t = base_t + i / fps
+                if i == start:
+                    # Counting starts here; holds still open from the warm-up are not new events
+                    state.analytics = state.analytics.carry_over()
+                    stages = stages.carry_over()
+                    gyan0, alignments0 = state.total_gyan_count, state.alignment_count
+                counted = i >= start
+                i += 1
+                # The rules were tuned on the live app's mirrored view
+                frame = cv2.flip(frame, 1)
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                hand_res = self.hands.process(rgb)
+                face_res = self.face_mesh.process(rgb)
+                pose_res = self.pose.process(rgb)
+                smoother.smooth_hands(hand_res, t)
+                smoother.smooth_face(face_res, t)
+                smoother.smooth_pose(pose_res, t)
+
+                snap = state.step(hand_res.multi_hand_landmarks or [],
+                                  face_res.multi_face_landmarks[0] if face_res.multi_face_landmarks else None,
+                                  pose_res.pose_landmarks, t)
+                stages.update(snap["meditation_stage"], t)
+                if not counted:
+                    continue
+                flags.append(xp_flags(snap["posture_score"], snap["mudra"] is not None, snap["eyes_closed"]))
+                if telemetry is not None:
+                    telemetry.record(t, snap["chakra_energies"], snap["mudra"], snap["posture_score"],
+                                     snap["eye_ratio"], snap["gaze_label"], NAN, NAN, NAN,
+                                     snap["meditation_stage"], snap["xp"], snap["level"])
+        finally:
+            cap.release()
+            if telemetry is not None:
+                telemetry.stop()
+        if i <= start: # Nothing counted (the frame count overestimated the length)
+            state.analytics, stages = state.analytics.carry_over(), stages.carry_over()
+            gyan0, alignments0 = state.total_gyan_count, state.alignment_count
+        return {
+            "start": start,
+            "fps": fps,
+            "frames": len(flags),
+            "processing_s": time.perf_counter() - t_start,
+            "chakra_energies": state.chakra_energies,
+            "gyan_frames": state.total_gyan_count - gyan0,
+            "alignment_count": state.alignment_count - alignments0,
+            "xp_flags": bytes(flags),
+            "stages": stages,
+            "analytics": state.analytics,
+            "telemetry": telemetry_path if telemetry is not None and telemetry.rows_written else None,
+        }
+
+
+def stitch_telemetry(paths, parquet, xp, level):
+    """Concatenates chunk telemetry into `parquet`, renumbering frames and replacing chunk-local XP."""
+    part = parquet + ".part"
+    frame_col, xp_col, level_col = (SCHEMA.get_field_index(n) for n in ("frame", "xp", "level"))
+    writer = None
+    row = 0
+    try:
+        for path in paths:
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=TELEMETRY_BATCH_ROWS):
+                n = batch.num_rows
+                columns = batch.columns
+                columns[frame_col] = pa.array(np.arange(row, row + n, dtype=np.int32))
+                columns[xp_col] = pa.array(np.asarray(xp[row:row + n], dtype=np.float32))
+                columns[level_col] = pa.array(np.asarray(level[row:row + n], dtype=np.int16))
+                if writer is None:
+                    writer = pq.ParquetWriter(part, SCHEMA, compression="zstd")
+                writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=SCHEMA),
+                                   row_group_size=TELEMETRY_BATCH_ROWS)
+                row += n
+    finally:
+        if writer is not None:
+            writer.close()
+    if row != len(xp):
+        raise ValueError(f"telemetry has {row} rows for {len(xp)} frames")
+    os.replace(part, parquet)
+    for path in paths:
+        os.remove(path)
+
+
+def stitch(parts, parquet=None):
+    """One report from the chunk results of a video (any order); writes the stitched telemetry to `parquet`."""
+    parts = sorted(parts, key=lambda p: p["start"])
+    fps = parts[0]["fps"]
+    analytics, stages = parts[0]["analytics"], parts[0]["stages"]
+    for p in parts[1:]:
+        analytics.merge(p["analytics"])
+        stages.merge(p["stages"])
+    xp, level = replay_xp(b"".join(p["xp_flags"] for p in parts))
+    frames = len(xp)
+    if parquet:
+        paths = [p["telemetry"] for p in parts if p["telemetry"]]
+        if len(parts) == 1:
+            if paths: # Chunk-local XP is already the session's
+                os.replace(paths[0], parquet)
+        else:
+            stitch_telemetry(paths, parquet, xp, level)
+    last = [p for p in parts if p["frames"]] or parts
+    elapsed = sum(p["processing_s"] for p in parts)
+    summary = analytics.summary()
+    summary["posture_quantiles"] = {f"p{int(p * 100)}": v for p, v in summary["posture_quantiles"].items()}
+    return {
+        "fps": fps,
+        "frames": frames,
+        "duration_s": frames / fps,
+        "chunks": len(parts),
+        "processing_s": elapsed, # Summed over chunks
+        "speed": frames / fps / elapsed if elapsed else 0.0,
+        "chakra_energies": last[-1]["chakra_energies"],
+        "xp": xp[-1] if xp else 0.0,
+        "level": level[-1] if level else 1,
+        "gyan_frames": sum(p["gyan_frames"] for p in parts),
+        "alignment_count": sum(p["alignment_count"] for p in parts),
+        "meditation_stages_s": stages.durations,
+        "analytics": summary,
+    }
+
+
+def compare_reports(chunked, sequential):
+    """Differences beyond the VERIFY_* tolerances between a stitched report and a one-piece run."""
+    problems = []
+
+    def close(name, a, b, floor=1.0):
+        if abs(a - b) > max(VERIFY_REL_TOL * abs(b), floor):
+            problems.append(f"{name}: {a:.2f} chunked vs {b:.2f} in one piece")
+
+    if chunked["frames"] != sequential["frames"]:
+        problems.append(f"frames: {chunked['frames']} chunked vs {sequential['frames']} in one piece")
+    close("xp", chunked["xp"], sequential["xp"])
+    close("gyan_frames", chunked["gyan_frames"], sequential["gyan_frames"])
+    close("alignment_count", chunked["alignment_count"], sequential["alignment_count"], floor=chunked["chunks"] - 1)
+    for i, (a, b) in enumerate(zip(chunked["analytics"]["chakra_time"], sequential["analytics"]["chakra_time"])):
+        close(f"chakra {i} (s)", a, b)
+    for label, a, b in (("hold", chunked["analytics"]["mudra_time"], sequential["analytics"]["mudra_time"]),
+                        ("stage", chunked["meditation_stages_s"], sequential["meditation_stages_s"])):
+        for name in set(a) | set(b):
+            close(f"{label} {name} (s)", a.get(name, 0.0), b.get(name, 0.0))
+    close("avg_posture", chunked["analytics"]["avg_posture"], sequential["analytics"]["avg_posture"], floor=0.01)
+    return problems
+
+
+def compare_telemetry(chunked_path, sequential_path):
+    """Frame-by-frame agreement of two telemetry files; returns (metrics, problems)."""
+    columns = ["mudra", "stage", "chakra_energies"]
+    a, b = pq.read_table(chunked_path, columns=columns), pq.read_table(sequential_path, columns=columns)
+    if a.num_rows != b.num_rows or not a.num_rows:
+        return {}, [f"telemetry rows: {a.num_rows} chunked vs {b.num_rows} in one piece"]
+    same = np.ones(a.num_rows, dtype=bool)
+    for name in ("mudra", "stage"):
+        same &= np.array([x == y for x, y in zip(a.column(name).to_pylist(), b.column(name).to_pylist())])
+
+    def energies(table):
+        return np.asarray(table.column("chakra_energies").combine_chunks().flatten()).reshape(-1, 7)
+    metrics = {"frame_match": float(same.mean()),
+               "energy_mae": float(np.abs(energies(a) - energies(b)).mean())}
+    problems = []
+    if metrics["frame_match"] < VERIFY_FRAME_MATCH:
+        problems.append(f"mudra / stage agree on {metrics['frame_match']:.1%} of frames")
+    if metrics["energy_mae"] > VERIFY_ENERGY_TOL:
+        problems.append(f"chakra energies differ by {metrics['energy_mae']:.3f} on average")
+    return metrics, problems
+
+
+# --- Worker process side ---
+
+_analyzer = None
+
+
+def _init_worker():
+    global _analyzer
+    cv2.setNumThreads(1) # One core per worker: OpenCV's own pool would oversubscribe
+    _analyzer = VideoAnalyzer()
+
+
+def _process_chunk(video, chunk, telemetry_path):
+    """Analyzes one (start, end, warmup) chunk of a video; returns its results for stitch()."""
+    start, end, warmup = chunk
+    return _analyzer.analyze(video, telemetry_path, start, end, warmup)
+
+
+# --- Self-check: chunked vs one piece, with scripted stand-in models ---
+
+MARKER_BITS = 12 # Frame number drawn into the synthetic clip as a 3 x 4 grid of black / white blocks
+
+
+def _marker_frame(i, w=160, h=96):
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    bw, bh = w // 4, h // 3
+    for b in range(MARKER_BITS):
+        if i >> b & 1:
+            frame[(b // 4) * bh:(b // 4 + 1) * bh, (b % 4) * bw:(b % 4 + 1) * bw] = 255
+    return frame
+
+
+def _read_marker(rgb):
+    h, w = rgb.shape[:2]
+    bw, bh = w // 4, h // 3
+    img = rgb[:, ::-1] # analyze() mirrors every frame
+    return sum(1 << b for b in range(MARKER_BITS) if img[(b // 4) * bh + bh // 2, (b % 4) * bw + bw // 2, 0] > 127)
+
+
+def _landmarks(points, n, fill):
+    lm = [types.SimpleNamespace(x=fill[0] + 0.2 * (k % 20) / 20, y=fill[1] + 0.2 * (k // 20) / 24, z=0.0)
+          for k in range(n)]
+    for k, (x, y) in points.items():
+        lm[k].x, lm[k].y = x, y
+    return types.SimpleNamespace(landmark=lm)
+
+
+class _ScriptedModel:
+    """
+    Stand-in for a MediaPipe solution: landmarks follow a script keyed by the
+    frame number drawn into the clip (1.5 s segments of good / tilted posture,
+    Gyan Mudra, closed eyes, nobody in view), so results depend on the video
+    content only, as with the real models.
+    """
+    def __init__(self, kind):
+        self.kind = kind
+
+    def reset(self):
+        pass
+
+    def process(self, rgb):
+        segment = (_read_marker(rgb) // 45) % 8
+        res = types.SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None,
+                                    multi_face_landmarks=None, pose_landmarks=None)
+        if segment == 7:
+            return res
+        if self.kind == "hands":
+            tip = (0.45, 0.6) if segment in (1, 2, 5, 6) else (0.35, 0.65) # Thumb on the index tip = Gyan
+            res.multi_hand_landmarks = [_landmarks({0: (0.5, 0.8), 12: (0.5, 0.5), 8: (0.45, 0.6), 4: tip,
+                                                    3: (0.3, 0.7)}, 21, (0.3, 0.45))]
+        elif self.kind == "face":
+            v = 0.02 if segment in (2, 5, 6) else 0.04 # Eye aspect ratio 0.2 (closed) / 0.4
+            res.multi_face_landmarks = [_landmarks({1: (0.5, 0.5), 33: (0.35, 0.4), 362: (0.55, 0.4), 263: (0.65, 0.4),
+                                                    386: (0.6, 0.4 - v), 374: (0.6, 0.4 + v), 473: (0.6, 0.4),
+                                                    13: (0.5, 0.6), 14: (0.5, 0.61)}, 478, (0.4, 0.3))]
+        else:
+            tilt = 0.1 if segment == 3 else 0.0
+            res.pose_landmarks = _landmarks({11: (0.4 + tilt, 0.4), 12: (0.6 + tilt, 0.4 + tilt / 2),
+                                             23: (0.42, 0.7), 24: (0.58, 0.7)}, 33, (0.4, 0.3))
+        return res
+
+
+def self_check():
+    """A synthetic clip through plan_chunks -> analyze -> stitch must match a one-piece run."""
+    import tempfile
+
+    tmp = tempfile.mkdtemp()
+    video = os.path.join(tmp, "selfcheck.mp4")
+    fps, frames = 30.0, 1800 # 60 s
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"mp4v"), fps, (160, 96))
+    for i in range(frames):
+        writer.write(_marker_frame(i))
+    writer.release()
+
+    analyzer = VideoAnalyzer(models=(_ScriptedModel("hands"), _ScriptedModel("face"), _ScriptedModel("pose")))
+    # Seeks land on the exact frame
+    for index in (1, 437, 1200):
+        cap = seek(cv2.VideoCapture(video), video, index, fps)
+        ok, frame = cap.read()
+        cap.release()
+        assert ok and _read_marker(frame[:, ::-1]) == index, f"seek to {index} landed elsewhere"
+
+    t0 = time.perf_counter()
+    whole = stitch([analyzer.analyze(video, os.path.join(tmp, "whole.parquet.part"))],
+                   os.path.join(tmp, "whole.parquet"))
+    plan = plan_chunks(*reversed(probe(video)), chunk_s=20.0, warmup_s=10.0)
+    parts = [analyzer.analyze(video, os.path.join(tmp, f"chunked.parquet.chunk{k}"), *chunk)
+             for k, chunk in enumerate(plan)]
+    chunked = stitch(parts[::-1], os.path.join(tmp, "chunked.parquet"))
+    print(f"[INFO] {frames} frames in {len(plan)} chunks, {time.perf_counter() - t0:.1f} s; "
+          f"xp {chunked['xp']:.0f} (one piece {whole['xp']:.0f}), level {chunked['level']}, "
+          f"holds {chunked['analytics']['mudras']}, stages {len(chunked['meditation_stages_s'])}")
+
+    problems = compare_reports(chunked, whole)
+    metrics, frame_problems = compare_telemetry(os.path.join(tmp, "chunked.parquet"), os.path.join(tmp, "whole.parquet"))
+    print(f"[INFO] Per frame: {metrics}")
+    for problem in problems + frame_problems:
+        print(f"[ERROR] {problem}")
+    assert len(plan) == 3 and chunked["frames"] == whole["frames"] == frames
+    assert whole["analytics"]["mudras"].get("Gyan Mudra") and whole["xp"] > 0, "the script exercised nothing"
+    assert not problems and not frame_problems
+    table = pq.read_table(os.path.join(tmp, "chunked.parquet"), columns=["frame", "xp"])
+    assert table.column("frame").to_pylist() == list(range(frames))
+    assert abs(table.column("xp")[-1].as_py() - whole["xp"]) < 1e-3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze recorded practice videos in parallel (headless).")
+    parser.add_argument("inputs", nargs="*", help="Video files or directories")
+    parser.add_argument("--out", default="reports", help="Output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: one per core)")
+    parser.add_argument("--no-telemetry", action="store_true", help="Skip the per-frame Parquet files")
+    parser.add_argument("--force", action="store_true", help="Re-analyze videos that already have a report")
+    parser.add_argument("--chunk-min", type=float, default=CHUNK_MIN,
+                        help="Split videos into chunks of about this many minutes (0 = never)")
+    parser.add_argument("--warmup-s", type=float, default=WARMUP_S, help="Uncounted overlap before each chunk")
+    parser.add_argument("--verify", action="store_true",
+                        help="Also analyze chunked videos in one piece and compare the results")
+    parser.add_argument("--self-check", action="store_true",
+                        help="Check chunked against one-piece analysis on a synthetic clip (no MediaPipe needed)")
+    args = parser.parse_args()
+    if args.self_check:
+        return self_check()
+    if not args.inputs:
+        parser.error("no inputs")
+
+    videos = find_videos(args.inputs)
+    os.makedirs(args.out, exist_ok=True)
+    names = output_names(videos)
+    bases = {v: os.path.join(args.out, names[v]) for v in videos}
+    todo = [v for v in videos if args.force or not is_done(v, bases[v] + REPORT_SUFFIX)]
+    if len(todo) < len(videos):
+        print(f"[INFO] Resuming: {len(videos) - len(todo)} of {len(videos)} videos already done")
+    if not todo:
+        return
+    # Longest first, so one long video does not start last and leave the other cores idle
+    todo.sort(key=os.path.getsize, reverse=True)
+    plans = {}
+    for v in todo:
+        fps, frame_count = probe(v)
+        plans[v] = plan_chunks(frame_count, fps, args.chunk_min * 60, args.warmup_s)
+    jobs = [] # (video, chunk index or None for the one-piece reference run, chunk, telemetry path)
+    for v in todo:
+        chunked = len(plans[v]) > 1
+        for k, chunk in enumerate(plans[v]):
+            tel = None
+            if not args.no_telemetry:
+                tel = bases[v] + TELEMETRY_SUFFIX + (f".chunk{k}" if chunked else ".part")
+            jobs.append((v, k, chunk, tel))
+        if args.verify and chunked:
+            tel = None if args.no_telemetry else bases[v] + ".sequential" + TELEMETRY_SUFFIX
+            jobs.append((v, None, (0, None, 0), tel))
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"[INFO] Analyzing {len(todo)} videos ({len(jobs)} chunks) on {workers} workers -> {args.out}")
+
+    t0 = time.perf_counter()
+    video_s = 0.0
+    done = failed = mismatched = 0
+    parts = {v: {} for v in todo}
+    references = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(_process_chunk, v, chunk, tel): (v, k) for v, k, chunk, tel in jobs}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                video, k = futures[future]
+                if parts[video] is None:
+                    continue # Another chunk of this video already failed
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    parts[video] = None
+                    print(f"[ERROR] ({done + failed}/{len(todo)}) {video}: {e}")
+                    continue
+                if k is None:
+                    references[video] = result
+                else:
+                    parts[video][k] = result
+                verifying = args.verify and len(plans[video]) > 1
+                if len(parts[video]) < len(plans[video]) or (verifying and video not in references):
+                    continue
+
+                base = bases[video]
+                parquet = None if args.no_telemetry else base + TELEMETRY_SUFFIX
+                try:
+                    report = stitch(parts[video].values(), parquet)
+                    report = dict(source_info(video), telemetry=parquet, **report)
+                    if verifying:
+                        reference = references.pop(video)
+                        ref_parquet = reference["telemetry"]
+                        reference = stitch([reference])
+                        problems = compare_reports(report, reference)
+                        metrics = {}
+                        if parquet and ref_parquet:
+                            metrics, frame_problems = compare_telemetry(parquet, ref_parquet)
+                            problems += frame_problems
+                            os.remove(ref_parquet)
+                        report["verify"] = dict(metrics, ok=not problems, problems=problems)
+                        mismatched += bool(problems)
+                        for problem in problems:
+                            print(f"[WARN] {os.path.basename(video)}: {problem}")
+                    write_json_atomic(base + REPORT_SUFFIX, report)
+                except Exception as e:
+                    failed += 1
+                    print(f"[ERROR] ({done + failed}/{len(todo)}) {video}: {e}")
+                    continue
+                parts[video] = None
+                done += 1
+                video_s += report["duration_s"]
+                print(f"[INFO] ({done + failed}/{len(todo)}) {os.path.basename(video)}: "
+                      f"{report['duration_s']:.0f} s of video in {report['processing_s']:.0f} s "
+                      f"({report['speed']:.1f}x, {report['chunks']} chunks)"
+                      + (f", verify {'ok' if report['verify']['ok'] else 'MISMATCH'}" if verifying else ""))
+        except KeyboardInterrupt:
+            print("[WARN] Interrupted; finished reports are kept, re-run to resume")
+            pool.shutdown(wait=False, cancel_futures=True)
+            sys.exit(130)
+
+    wall = time.perf_counter() - t0
+    print(f"[INFO] Done: {done} videos, {video_s / 60:.1f} min of video in {wall / 60:.1f} min "
+          f"({video_s / wall:.1f}x real time, {video_s / wall / workers:.2f}x per worker), {failed} failed"
+          + (f", {mismatched} chunked results differ from one piece" if args.verify else ""))
+    if failed or mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import collections
+import sys
+import threading
+import time
+import cv2
+
+# ============================================================
+#   LOW-LATENCY CAMERA CAPTURE
+#   A grabber thread keeps only the newest frame (drop-oldest),
+#   so slow processing never lets frames pile up in the driver.
+#   Every frame carries a monotonic capture timestamp.
+#   read() blocks like cv2's until the grabber stops for good:
+#   a slow first frame or a short USB stall is reported, not
+#   treated as the end of the session.
+# ============================================================
+
+STALL_WARN_S = 2.0   # Report a missing frame after this long (and again every STALL_WARN_S)
+GRAB_GIVE_UP_S = 5.0 # The grabber stops after failing this long without a single frame
+
+def _fourcc_to_str(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def open_camera(index, width=None, height=None, fps=None, fourcc="MJPG", buffer_size=1):
+    """
+    Opens a camera with explicit low-latency settings.
+    On Linux the V4L2 backend is used so FOURCC / buffer size are honoured;
+    FOURCC must be set before the resolution for V4L2 to negotiate MJPEG.
+    A string index opens a video file or stream URL instead.
+    """
+    if isinstance(index, str):
+        return cv2.VideoCapture(index)
+    if sys.platform.startswith("linux"):
+        cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
+    else:
+        cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        return cap
+
+    if fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+    if width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    if height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    # Not every backend supports this; it is a no-op where unsupported
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+
+    got_fourcc = _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC))
+    got_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    got_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    got_fps = cap.get(cv2.CAP_PROP_FPS)
+    print(f"[INFO] Camera {index}: {got_w}x{got_h} @ {got_fps:.0f} FPS, "
+          f"FOURCC={got_fourcc!r}, buffer={int(cap.get(cv2.CAP_PROP_BUFFERSIZE))}")
+    if fourcc and got_fourcc.strip("\x00") and got_fourcc != fourcc:
+        print(f"[WARN] Camera did not accept FOURCC {fourcc}, using {got_fourcc!r}")
+    return cap
+
+
+class LatestFrameCapture:
+    """
+    Threaded capture with drop-oldest semantics.
+
+    read() returns (ok, frame, capture_ts) for the newest frame only; frames
+    the consumer never picked up are counted as dropped. The returned frame
+    stays valid until the next read() (three rotating buffers, so the grabber
+    never writes into the frame the consumer is using).
+    Call mark_displayed(capture_ts) after showing a frame to track
+    capture-to-display latency.
+    """
+    NUM_BUFFERS = 3
+
+    def __init__(self, index=0, width=None, height=None, fps=None, fourcc="MJPG", buffer_size=1):
+        self.cap = open_camera(index, width, height, fps, fourcc, buffer_size)
+        self.buffers = [None] * self.NUM_BUFFERS
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+
+        self.latest_slot = None
+        self.latest_ts = None
+        self.latest_seq = 0
+        self.delivered_seq = 0
+        self.in_use_slot = None
+
+        # Stats
+        self.captured = 0
+        self.dropped = 0
+        self.latencies = collections.deque(maxlen=120) # seconds
+        self.start_time = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.start_time = time.monotonic()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _free_slot(self):
+        for i in range(self.NUM_BUFFERS):
+            if i != self.latest_slot and i != self.in_use_slot:
+                return i
+
+    def _run(self):
+        failing_since = None
+        while self.running:
+            if not self.cap.grab():
+                now = time.monotonic()
+                failing_since = failing_since or now
+                if now - failing_since > GRAB_GIVE_UP_S:
+                    print("[ERROR] Camera stopped delivering frames.")
+                    break
+                time.sleep(0.01)
+                continue
+            failing_since = None
+            ts = time.monotonic() # Closest point to exposure we can observe
+
+            with self.cond:
+                slot = self._free_slot()
+            ok, img = self.cap.retrieve(self.buffers[slot])
+            if not ok:
+                continue
+
+            with self.cond:
+                self.buffers[slot] = img
+                if self.latest_seq > self.delivered_seq:
+                    self.dropped += 1 # Previous frame was never consumed
+                self.latest_slot = slot
+                self.latest_ts = ts
+                self.latest_seq += 1
+                self.captured += 1
+                self.cond.notify_all()
+
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def read(self, timeout=None):
+        """
+        Waits for a frame newer than the last one returned. (False, None, None)
+        only once the grabber has stopped, or when an explicit timeout expires.
+        """
+        t0 = time.monotonic()
+        deadline = None if timeout is None else t0 + timeout
+        with self.cond:
+            while self.latest_seq <= self.delivered_seq and self.running:
+                wait = STALL_WARN_S if deadline is None else min(STALL_WARN_S, deadline - time.monotonic())
+                if wait <= 0:
+                    break
+                if not self.cond.wait(wait) and (deadline is None or time.monotonic() < deadline):
+                    what = "first camera frame" if not self.captured else "camera"
+                    print(f"[WARN] Waiting for the {what} ({time.monotonic() - t0:.0f} s)...")
+            if self.latest_seq <= self.delivered_seq:
+                return False, None, None
+            self.delivered_seq = self.latest_seq
+            self.in_use_slot = self.latest_slot
+            return True, self.buffers[self.latest_slot], self.latest_ts
+
+    def mark_displayed(self, capture_ts):
+        if capture_ts is not None:
+            self.latencies.append(time.monotonic() - capture_ts)
+
+    def stats(self):
+        elapsed = max(1e-6, time.monotonic() - self.start_time) if self.start_time else 0.0
+        lat = sorted(self.latencies)
+        return {
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "capture_fps": self.captured / elapsed if elapsed else 0.0,
+            "latency_ms": (sum(lat) / len(lat) * 1000.0) if lat else 0.0,
+            "latency_p95_ms": (lat[int(len(lat) * 0.95) - 1] * 1000.0) if len(lat) >= 20 else 0.0,
+        }
+
+    def release(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.cap.release()
+
+
+if __name__ == "__main__":
+    # A synthetic clip played as a camera: a slow consumer sees only fresh
+    # frames (drop-oldest), a 2.5 s grab stall is waited out instead of
+    # ending the session, and read() fails only once the stream is over
+    import os
+    import tempfile
+    import numpy as np
+
+    STALL_WARN_S = 1.0
+    GRAB_GIVE_UP_S = 0.5
+    path = os.path.join(tempfile.mkdtemp(), "capture_selfcheck.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (320, 240))
+    for i in range(120):
+        writer.write(np.full((240, 320, 3), i, dtype=np.uint8))
+    writer.release()
+
+    class StallingCapture:
+        """The file's capture, with one long stall before frame 60 (a USB hiccup)."""
+        def __init__(self, cap):
+            self.cap = cap
+            self.grabs = 0
+
+        def grab(self):
+            self.grabs += 1
+            if self.grabs == 60:
+                time.sleep(2.5)
+            time.sleep(1 / 120.0)
+            return self.cap.grab()
+
+        def __getattr__(self, name):
+            return getattr(self.cap, name)
+
+    capture = LatestFrameCapture(path)
+    assert capture.isOpened()
+    capture.cap = StallingCapture(capture.cap)
+    capture.start()
+    frames, last_ts, values = 0, 0.0, []
+    while True:
+        ok, frame, ts = capture.read()
+        if not ok:
+            break
+        assert ts > last_ts
+        last_ts = ts
+        values.append(int(frame[0, 0, 0]))
+        frames += 1
+        capture.mark_displayed(ts)
+        time.sleep(1 / 60.0) # Consumer slower than the grabber
+    stats = capture.stats()
+    capture.release()
+    print(f"[INFO] {frames} frames read, {stats['captured']} captured, {stats['dropped']} dropped, "
+          f"latency {stats['latency_ms']:.1f} ms")
+    assert stats["captured"] == 120 and frames + stats["dropped"] >= 119
+    assert values[-1] >= 115, "the session ended at the stall instead of waiting it out"
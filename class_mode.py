@@ -0,0 +1,387 @@
+import math
+import time
+import cv2
+import numpy as np
+from types import SimpleNamespace
+
+from landmark_filter import LandmarkSmoother
+from practice_state import PracticeState
+
+# ============================================================
+#   CLASS MODE — many practitioners in front of one camera
+#   People are detected once per frame, tracked by IoU, and their
+#   crops are packed into one mosaic so Hands / FaceMesh run ONCE
+#   for the whole class. Each person keeps their own PracticeState.
+#   Landmarks are mapped back to full-frame normalized coordinates
+#   before the rules see them: the thresholds (EAR, posture tilt,
+#   breathing) were tuned on the 16:9 frame, not on a portrait tile.
+# ============================================================
+
+TILE_W = 240             # Every person crop is resized to this tile
+TILE_H = 320             # (portrait: head + torso + hands in lap)
+MAX_PEOPLE = 8
+POSE_PER_FRAME = 2       # Pose is single-person: run it round-robin
+TRACK_IOU_MIN = 0.25
+TRACK_MAX_MISSED = 15    # Frames a track survives without a detection
+DETECT_EVERY = 3         # Re-run person detection every N frames
+
+
+def iou(a, b):
+    ax0, ay0, ax1, ay1 = a
+    bx0, by0, bx1, by1 = b
+    iw = max(0, min(ax1, bx1) - max(ax0, bx0))
+    ih = max(0, min(ay1, by1) - max(ay0, by0))
+    inter = iw * ih
+    if inter == 0:
+        return 0.0
+    union = (ax1 - ax0) * (ay1 - ay0) + (bx1 - bx0) * (by1 - by0) - inter
+    return inter / union
+
+
+def face_to_person_box(face_box, frame_w, frame_h):
+    """
+    Grows a face box into a seated-practitioner box (head, torso, hands in lap)
+    with the tile aspect ratio. Near the frame edge the box is shifted (and if
+    need be shrunk) to fit instead of clipped, so crops are never stretched.
+    """
+    x0, y0, x1, y1 = face_box
+    fw = x1 - x0
+    cx = (x0 + x1) / 2
+    bw = fw * 3.6
+    bh = bw * TILE_H / TILE_W
+    fit = min(1.0, frame_w / bw, frame_h / bh)
+    bw, bh = bw * fit, bh * fit
+    left = min(max(0.0, cx - bw / 2), frame_w - bw)
+    top = min(max(0.0, y0 - fw * 0.6), frame_h - bh)
+    return int(left), int(top), int(left + bw), int(top + bh)
+
+
+class PersonDetector:
+    """Finds practitioners via full-range face detection (cheap, works seated)."""
+    def __init__(self, min_confidence=0.5):
+        import mediapipe as mp # Here, so the coordinate self-check runs without MediaPipe
+        self.detector = mp.solutions.face_detection.FaceDetection(model_selection=1,
+                                                                  min_detection_confidence=min_confidence)
+
+    def detect(self, rgb):
+        h, w = rgb.shape[:2]
+        res = self.detector.process(rgb)
+        boxes = []
+        for det in res.detections or []:
+            bb = det.location_data.relative_bounding_box
+            face = (bb.xmin * w, bb.ymin * h, (bb.xmin + bb.width) * w, (bb.ymin + bb.height) * h)
+            box = face_to_person_box(face, w, h)
+            if box[2] - box[0] > 20 and box[3] - box[1] > 20:
+                boxes.append(box)
+        return boxes[:MAX_PEOPLE]
+
+
+class Track:
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = box
+        self.missed = 0
+        self.state = PracticeState()
+        self.smoother = LandmarkSmoother()
+        self.pose = None # Created lazily: one Pose graph per person
+        self.last_pose_time = 0.0
+        self.hands = []
+        self.face = None
+        self.pose_landmarks = None
+        self.snapshot = {}
+
+    def close(self):
+        if self.pose is not None:
+            self.pose.close()
+            self.pose = None
+
+
+class IoUTracker:
+    """Greedy IoU matching; keeps identities stable while people sit still."""
+    def __init__(self):
+        self.tracks = {}
+        self.next_id = 1
+
+    def update(self, boxes):
+        unmatched = list(range(len(boxes)))
+        pairs = []
+        for tid, track in self.tracks.items():
+            for i in unmatched:
+                pairs.append((iou(track.box, boxes[i]), tid, i))
+        pairs.sort(reverse=True)
+
+        used_tracks = set()
+        for score, tid, i in pairs:
+            if score < TRACK_IOU_MIN:
+                break
+            if tid in used_tracks or i not in unmatched:
+                continue
+            track = self.tracks[tid]
+            # Light box smoothing so tiles do not jitter
+            track.box = tuple(int(0.7 * n + 0.3 * o) for n, o in zip(boxes[i], track.box))
+            track.missed = 0
+            used_tracks.add(tid)
+            unmatched.remove(i)
+
+        for tid, track in list(self.tracks.items()):
+            if tid not in used_tracks:
+                track.missed += 1
+                if track.missed > TRACK_MAX_MISSED:
+                    track.close()
+                    del self.tracks[tid]
+
+        for i in unmatched:
+            if len(self.tracks) >= MAX_PEOPLE:
+                break
+            self.tracks[self.next_id] = Track(self.next_id, boxes[i])
+            self.next_id += 1
+
+        return self.active()
+
+    def active(self):
+        return [t for t in sorted(self.tracks.values(), key=lambda t: t.id) if t.missed == 0]
+
+    def close(self):
+        for track in self.tracks.values():
+            track.close()
+        self.tracks.clear()
+
+
+class MosaicBatcher:
+    """
+    Packs N person crops into one grid image, runs a Mediapipe solution on it
+    once, and hands back each result in full-frame normalized coordinates,
+    as if the model had run on the whole frame.
+    """
+    def __init__(self, cols=4):
+        self.cols = cols
+        self.mosaic = None
+        self.views = [] # Per tile: (tile x, y in the mosaic, crop offset in the tile, crop px per mosaic px, box x0, y0)
+        self.frame_size = (1, 1)
+
+    def layout(self, n):
+        cols = max(1, min(self.cols, n))
+        rows = max(1, math.ceil(n / cols))
+        return cols, rows
+
+    def build(self, rgb, boxes):
+        self.frame_size = (rgb.shape[1], rgb.shape[0])
+        cols, rows = self.layout(len(boxes))
+        shape = (rows * TILE_H, cols * TILE_W, 3)
+        if self.mosaic is None or self.mosaic.shape != shape:
+            self.mosaic = np.zeros(shape, dtype=np.uint8)
+        else:
+            self.mosaic.fill(0)
+        self.views = []
+        for i, (x0, y0, x1, y1) in enumerate(boxes):
+            r, c = divmod(i, cols)
+            # Letterbox: one scale for both axes, so hand / face / pose geometry is not distorted
+            bw, bh = x1 - x0, y1 - y0
+            scale = min(TILE_W / bw, TILE_H / bh)
+            pw, ph = max(1, min(TILE_W, round(bw * scale))), max(1, min(TILE_H, round(bh * scale)))
+            ox, oy = (TILE_W - pw) // 2, (TILE_H - ph) // 2
+            tx, ty = c * TILE_W, r * TILE_H
+            placed = self.mosaic[ty + oy:ty + oy + ph, tx + ox:tx + ox + pw]
+            cv2.resize(rgb[y0:y1, x0:x1], (pw, ph), dst=placed, interpolation=cv2.INTER_AREA)
+            self.views.append((tx, ty, ox, oy, bw / pw, bh / ph, x0, y0))
+        return self.mosaic
+
+    def to_frame(self, lms, i, tile=False):
+        """Mosaic-normalized (tile-normalized if `tile`) landmarks of tile i -> frame-normalized, in place."""
+        tx, ty, ox, oy, sx, sy, x0, y0 = self.views[i]
+        if tile: # Result of a model run on the tile alone
+            mw, mh = TILE_W, TILE_H
+        else:
+            mw, mh = self.mosaic.shape[1], self.mosaic.shape[0]
+            ox, oy = tx + ox, ty + oy
+        fw, fh = self.frame_size
+        for p in lms.landmark:
+            p.x = (x0 + (p.x * mw - ox) * sx) / fw
+            p.y = (y0 + (p.y * mh - oy) * sy) / fh
+        return lms
+
+    def split(self, landmark_lists, n, labels=None):
+        """
+        Assigns each landmark list to the tile holding its centroid, mapped to
+        frame coordinates in place. `labels` (e.g. multi_handedness) travel
+        with their landmarks; returns (per_tile, per_tile_labels).
+        """
+        cols, rows = self.layout(n)
+        per_tile = [[] for _ in range(n)]
+        per_tile_labels = [[] for _ in range(n)]
+        labels = labels or []
+        for k, lms in enumerate(landmark_lists or []):
+            pts = lms.landmark
+            cx = sum(p.x for p in pts) / len(pts) * cols
+            cy = sum(p.y for p in pts) / len(pts) * rows
+            c = min(cols - 1, max(0, int(cx)))
+            r = min(rows - 1, max(0, int(cy)))
+            idx = r * cols + c
+            if idx >= n:
+                continue
+            per_tile[idx].append(self.to_frame(lms, idx))
+            if k < len(labels):
+                per_tile_labels[idx].append(labels[k])
+        return per_tile, per_tile_labels
+
+
+class ClassSession:
+    """
+    Per-frame pipeline for class mode.
+    process() returns the active tracks; each carries frame-normalized
+    hands / face / pose landmarks, its box in frame pixels and the latest
+    PracticeState snapshot.
+    """
+    def __init__(self, max_people=MAX_PEOPLE):
+        import mediapipe as mp
+        self.mp_pose = mp.solutions.pose
+        self.max_people = max_people
+        self.detector = PersonDetector()
+        self.tracker = IoUTracker()
+        self.batcher = MosaicBatcher()
+        self.hands = mp.solutions.hands.Hands(max_num_hands=2 * max_people, min_detection_confidence=0.5,
+                                    min_tracking_confidence=0.5)
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=max_people, refine_landmarks=True,
+                                          min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        self.frame_count = 0
+        self.pose_cursor = 0
+
+    def process(self, rgb, now=None):
+        now = time.time() if now is None else now
+        self.frame_count += 1
+
+        if self.frame_count % DETECT_EVERY == 1 or not self.tracker.tracks:
+            people = self.tracker.update(self.detector.detect(rgb))
+        else:
+            people = self.tracker.active()
+        if not people:
+            return []
+
+        # One Hands + one FaceMesh call for the whole class
+        boxes = [t.box for t in people]
+        mosaic = self.batcher.build(rgb, boxes)
+        hand_res = self.hands.process(mosaic)
+        face_res = self.face_mesh.process(mosaic)
+        hands_per, handed_per = self.batcher.split(hand_res.multi_hand_landmarks, len(people),
+                                                   hand_res.multi_handedness)
+        faces_per, _ = self.batcher.split(face_res.multi_face_landmarks, len(people))
+
+        # Pose: a few people per frame, the rest are predicted
+        pose_turn = set()
+        for k in range(min(POSE_PER_FRAME, len(people))):
+            pose_turn.add(people[(self.pose_cursor + k) % len(people)].id)
+        self.pose_cursor = (self.pose_cursor + POSE_PER_FRAME) % max(1, len(people))
+
+        for i, track in enumerate(people):
+            track.hands = hands_per[i]
+            # Keyed by handedness: MediaPipe's hand order is not stable between frames
+            track.smoother.smooth_hands(SimpleNamespace(multi_hand_landmarks=track.hands,
+                                                        multi_handedness=handed_per[i]), now)
+            track.face = faces_per[i][0] if faces_per[i] else None
+            track.smoother.smooth("face", track.face, now)
+
+            if track.id in pose_turn:
+                if track.pose is None:
+                    track.pose = self.mp_pose.Pose(model_complexity=0, min_detection_confidence=0.5,
+                                                   min_tracking_confidence=0.5)
+                tile = np.ascontiguousarray(self.tile(mosaic, i, len(people)))
+                pose_res = track.pose.process(tile)
+                if pose_res.pose_landmarks:
+                    self.batcher.to_frame(pose_res.pose_landmarks, i, tile=True)
+                track.pose_landmarks = track.smoother.smooth_pose(pose_res, now)
+                track.last_pose_time = now
+            else:
+                track.pose_landmarks = track.smoother.predict("pose", now)
+
+            track.snapshot = track.state.step(track.hands, track.face, track.pose_landmarks, now)
+        return people
+
+    def tile(self, mosaic, i, n):
+        cols, _ = self.batcher.layout(n)
+        r, c = divmod(i, cols)
+        return mosaic[r * TILE_H:(r + 1) * TILE_H, c * TILE_W:(c + 1) * TILE_W]
+
+    def close(self):
+        self.tracker.close()
+        self.hands.close()
+        self.face_mesh.close()
+        self.detector.detector.close()
+
+
+def to_frame_px(frame, x, y):
+    """Frame-normalized landmark -> pixel."""
+    h, w = frame.shape[:2]
+    return int(x * w), int(y * h)
+
+
+if __name__ == "__main__":
+    # The same face / body seen by the single-person path (whole 16:9 frame)
+    # and by the mosaic path must give the same EAR, gaze and posture
+    import copy
+    from practice_state import EYE_CLOSED_THRESHOLD, PostureAnalyzer, analyze_face
+
+    fw, fh = 1120, 630
+    rng = np.random.default_rng(5)
+
+    def landmarks(points_px, n, center):
+        pts = [SimpleNamespace(x=(center[0] + rng.uniform(-40, 40)) / fw, y=(center[1] + rng.uniform(-50, 50)) / fh, z=0.0)
+               for _ in range(n)]
+        for k, (x, y) in points_px.items():
+            pts[k].x, pts[k].y = x / fw, y / fh
+        return SimpleNamespace(landmark=pts)
+
+    def person(cx, cy):
+        # Open eye: 30 px wide, 9 px tall (pixel EAR 0.30); iris 3 px off centre; a slight shoulder tilt
+        face = landmarks({1: (cx, cy + 5), 33: (cx - 30, cy - 10), 263: (cx + 30, cy - 10), 362: (cx, cy - 10),
+                          386: (cx + 15, cy - 14.5), 374: (cx + 15, cy - 5.5), 473: (cx + 18, cy - 10),
+                          13: (cx, cy + 25), 14: (cx, cy + 27)}, 478, (cx, cy))
+        pose = landmarks({11: (cx - 60, cy + 100), 12: (cx + 60, cy + 108), 23: (cx - 45, cy + 260),
+                          24: (cx + 45, cy + 262)}, 33, (cx, cy + 150))
+        face_box = (cx - 40, cy - 50, cx + 40, cy + 50)
+        return face, pose, face_to_person_box(face_box, fw, fh)
+
+    def readings(face, pose):
+        _, _, ear, _, gaze, gaze_x = analyze_face(face, 1, 1)
+        return ear, gaze, gaze_x, PostureAnalyzer().assess(pose)[0]
+
+    # The third sits at the left edge: the box keeps the tile aspect, the crop is not stretched
+    people = [person(300, 200), person(700, 220), person(40, 330)]
+    for _, _, (x0, y0, x1, y1) in people:
+        assert 0 <= x0 < x1 <= fw and 0 <= y0 < y1 <= fh
+        assert abs((x1 - x0) / (y1 - y0) - TILE_W / TILE_H) < 0.01, "person box lost the tile aspect ratio"
+    rgb = np.zeros((fh, fw, 3), dtype=np.uint8)
+    batcher = MosaicBatcher()
+    mosaic = batcher.build(rgb, [box for _, _, box in people])
+    mh, mw = mosaic.shape[:2]
+
+    def as_model_output(lms, i, tile=False):
+        """What a model run on the mosaic (or the tile) would return for frame-normalized `lms`."""
+        tx, ty, ox, oy, sx, sy, x0, y0 = batcher.views[i]
+        out = copy.deepcopy(lms)
+        for p in out.landmark:
+            mx, my = ox + (p.x * fw - x0) / sx, oy + (p.y * fh - y0) / sy # Pixels inside the tile
+            if tile:
+                p.x, p.y = mx / TILE_W, my / TILE_H
+            else:
+                p.x, p.y = (tx + mx) / mw, (ty + my) / mh
+        return out
+
+    faces_per, _ = batcher.split([as_model_output(face, i) for i, (face, _, _) in enumerate(people)], len(people))
+
+    # Hands listed out of person order: each handedness label must stay with its hand
+    hand = lambda i, label: (as_model_output(people[i][0], i), SimpleNamespace(classification=[SimpleNamespace(label=label)]))
+    hands = [hand(2, "Left"), hand(0, "Right"), hand(1, "Left"), hand(0, "Left")]
+    hands_per, handed_per = batcher.split([h for h, _ in hands], len(people), [c for _, c in hands])
+    labels = [[c.classification[0].label for c in tile] for tile in handed_per]
+    assert [len(t) for t in hands_per] == [2, 1, 1] and labels == [["Right", "Left"], ["Left"], ["Left"]], labels
+    for i, (face, pose, box) in enumerate(people):
+        direct = readings(face, pose)
+        tiled = as_model_output(face, i, tile=True)
+        old_ear = analyze_face(tiled, 1, 1)[2] # What the rules saw with tile-normalized landmarks
+        mosaic_path = readings(faces_per[i][0], batcher.to_frame(as_model_output(pose, i, tile=True), i, tile=True))
+        print(f"[INFO] Person {i} box {box}: EAR {direct[0]:.3f} frame / {mosaic_path[0]:.3f} mosaic "
+              f"(tile-normalized {old_ear:.3f}), gaze {direct[1]} / {mosaic_path[1]}, "
+              f"posture {direct[3]:.3f} / {mosaic_path[3]:.3f}")
+        assert direct[0] > EYE_CLOSED_THRESHOLD, "test face should read as open"
+        assert direct[1] == mosaic_path[1]
+        assert np.allclose([direct[k] for k in (0, 2, 3)], [mosaic_path[k] for k in (0, 2, 3)], atol=1e-4)
@@ -0,0 +1,138 @@
+import threading
+import tracemalloc
+import cv2
+import numpy as np
+
+# ============================================================
+#   FRAME BUFFER POOL
+#   Recycles fixed-size arrays for the per-frame hot path
+#   (flip / color convert / resize / overlay scratch) so a 30 FPS
+#   loop does not churn hundreds of MB/s through the allocator.
+# ============================================================
+
+class FramePool:
+    """
+    Named, reusable frame buffers.
+    A buffer is reallocated only when the requested shape/dtype changes
+    (e.g. camera resolution switch). Buffers are per thread, so one pool can
+    be shared by the streamlit-webrtc worker threads without locking.
+
+    NOTE: a buffer returned by the pool is overwritten the next time the same
+    name is requested on that thread. Copy it if you need to keep it.
+    """
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, name, shape, dtype=np.uint8):
+        bufs = getattr(self._local, "bufs", None)
+        if bufs is None:
+            bufs = self._local.bufs = {}
+        shape = tuple(shape)
+        buf = bufs.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            bufs[name] = buf
+        return buf
+
+    def flip(self, src, flip_code=1, name="flip"):
+        dst = self.get(name, src.shape, src.dtype)
+        cv2.flip(src, flip_code, dst=dst)
+        return dst
+
+    def cvt_color(self, src, code, channels=3, name="cvt"):
+        dst = self.get(name, src.shape[:2] + (channels,), src.dtype)
+        cv2.cvtColor(src, code, dst=dst)
+        return dst
+
+    def resize(self, src, size, name="resize", interpolation=cv2.INTER_AREA):
+        w, h = size
+        dst = self.get(name, (h, w) + src.shape[2:], src.dtype)
+        cv2.resize(src, (w, h), dst=dst, interpolation=interpolation)
+        return dst
+
+    def scratch_copy(self, frame, name="overlay"):
+        """Drop-in for `overlay = frame.copy()` before an addWeighted blend."""
+        dst = self.get(name, frame.shape, frame.dtype)
+        np.copyto(dst, frame)
+        return dst
+
+
+# Shared pool for the drawing helpers
+frame_pool = FramePool()
+
+
+def blit_premultiplied(frame, x, y, inv, premul):
+    """
+    Blends a premultiplied uint8 sprite with its top-left corner at (x, y):
+    roi = roi * inv / 255 + premul. Clipped at the frame borders.
+    Two saturating OpenCV ops on the ROI only, no temporary allocation.
+    """
+    sh, sw = inv.shape[:2]
+    h, w = frame.shape[:2]
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(w, x + sw), min(h, y + sh)
+    if x0 >= x1 or y0 >= y1:
+        return
+    sx0, sy0 = x0 - x, y0 - y
+    sx1, sy1 = sx0 + (x1 - x0), sy0 + (y1 - y0)
+
+    roi = frame[y0:y1, x0:x1]
+    tmp = frame_pool.get("blit", frame.shape, frame.dtype)[y0:y1, x0:x1]
+    cv2.multiply(roi, inv[sy0:sy1, sx0:sx1], dst=tmp, scale=1.0 / 255.0)
+    cv2.add(tmp, premul[sy0:sy1, sx0:sx1], dst=roi)
+
+
+def measure_frame_allocations(step, frames=60, warmup=10):
+    """
+    Runs `step()` like a frame loop and returns the peak bytes allocated by a
+    single steady-state frame (after `warmup` frames have filled the pool).
+    """
+    for _ in range(warmup):
+        step()
+    tracemalloc.start()
+    worst = 0
+    try:
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            step()
+            _, peak = tracemalloc.get_traced_memory()
+            worst = max(worst, peak - base)
+    finally:
+        tracemalloc.stop()
+    return worst
+
+
+# Steady-state allocation budget per frame (a 1120x630 BGR frame is ~2 MB)
+FRAME_ALLOC_BUDGET = 64 * 1024
+
+
+if __name__ == "__main__":
+    # Allocation-budget check: a typical frame (flip, RGB convert, downscale,
+    # a few overlay blends) must stay well below one frame's worth of memory.
+    pool = FramePool()
+    raw = np.random.randint(0, 255, (630, 1120, 3), dtype=np.uint8)
+
+    def pooled_step():
+        frame = pool.flip(raw, 1)
+        pool.cvt_color(frame, cv2.COLOR_BGR2RGB, name="rgb")
+        pool.resize(frame, (280, 158), name="small")
+        for _ in range(3):
+            overlay = pool.scratch_copy(frame)
+            cv2.circle(overlay, (560, 315), 200, (0, 215, 255), -1)
+            cv2.addWeighted(overlay, 0.15, frame, 0.85, 0, frame)
+
+    def naive_step():
+        frame = cv2.flip(raw, 1)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        cv2.resize(frame, (280, 158), interpolation=cv2.INTER_AREA)
+        for _ in range(3):
+            overlay = frame.copy()
+            cv2.circle(overlay, (560, 315), 200, (0, 215, 255), -1)
+            cv2.addWeighted(overlay, 0.15, frame, 0.85, 0, frame)
+
+    pooled = measure_frame_allocations(pooled_step)
+    naive = measure_frame_allocations(naive_step)
+    print(f"[INFO] Per-frame allocation: pooled={pooled / 1024:.1f} KB, naive={naive / 1024:.1f} KB")
+    assert pooled < FRAME_ALLOC_BUDGET, f"Pooled frame path allocated {pooled} bytes (budget {FRAME_ALLOC_BUDGET})"
+    print("[INFO] Allocation budget OK")
@@ -0,0 +1,183 @@
+import collections
+import threading
+import time
+import cv2
+import numpy as np
+
+from frame_pool import blit_premultiplied
+
+# ============================================================
+#   GLOW SPRITES
+#   Pre-rendered radial-gradient glows, blended only inside the
+#   glow's own bounding box instead of copying and blending the
+#   whole frame for every aura.
+# ============================================================
+
+RADIUS_STEP = 2      # Radii are quantized to this many pixels
+ALPHA_LEVELS = 32    # Alpha is quantized to this many levels
+CORE_FRACTION = 0.45 # Fully-lit core; soft falloff from here to the edge
+
+
+def radial_falloff(radius, core=CORE_FRACTION):
+    """(2r+1, 2r+1) float32 mask: 1 inside the core, smooth (cosine) falloff to 0 at r."""
+    yy, xx = np.mgrid[-radius:radius + 1, -radius:radius + 1].astype(np.float32)
+    d = np.sqrt(xx * xx + yy * yy) / max(1, radius)
+    t = np.clip((d - core) / (1.0 - core), 0.0, 1.0)
+    return 0.5 + 0.5 * np.cos(np.pi * t)
+
+
+class GlowSpriteCache:
+    """
+    Caches glow sprites by (color, quantized radius, quantized alpha).
+    A sprite is stored premultiplied (uint8), so blending is
+    roi = roi * inv / 255 + premul on the glow's ROI only.
+    Thread-safe: the shared instance serves every session's worker thread.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.sprites = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def quantize(radius, alpha):
+        r = max(RADIUS_STEP, int(round(radius / RADIUS_STEP)) * RADIUS_STEP)
+        a = int(round(min(1.0, max(0.0, alpha)) * ALPHA_LEVELS))
+        return r, a
+
+    def get(self, color, radius, alpha):
+        r, a = self.quantize(radius, alpha)
+        key = (tuple(int(c) for c in color), r, a)
+        with self.lock:
+            sprite = self.sprites.get(key)
+            if sprite is not None:
+                self.sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+            self.misses += 1
+        mask = (radial_falloff(r) * (a / ALPHA_LEVELS))[..., None]
+        inv = np.repeat(np.rint(255.0 * (1.0 - mask)).astype(np.uint8), 3, axis=2)
+        premul = np.rint(mask * np.array(key[0], dtype=np.float32)).astype(np.uint8)
+        sprite = (r, inv, premul)
+        with self.lock:
+            self.sprites[key] = sprite
+            self.sprites.move_to_end(key)
+            while len(self.sprites) > self.max_entries:
+                self.sprites.popitem(last=False)
+        return sprite
+
+    def blit(self, frame, center, radius, color, alpha):
+        """Blends a soft glow into `frame` in place (clipped at the borders)."""
+        if radius <= 0 or alpha <= 0:
+            return
+        r, inv, premul = self.get(color, radius, alpha)
+        blit_premultiplied(frame, int(center[0]) - r, int(center[1]) - r, inv, premul)
+
+
+# Shared cache for the drawing helpers
+glow_sprites = GlowSpriteCache()
+
+
+def draw_glow(frame, center, radius, color, alpha):
+    glow_sprites.blit(frame, center, radius, color, alpha)
+
+
+# ============================================================
+#   BLURRED-MASK GLOW
+#   Shape mask in a small ROI -> downsample -> one separable
+#   Gaussian blur -> upsample -> additive colored composite.
+#   Replaces stacks of full-frame addWeighted "glow passes".
+# ============================================================
+
+GLOW_DOWNSCALE = 4 # Blur runs at 1/4 resolution (16x fewer pixels)
+
+
+def draw_glow_shape(frame, draw_mask, bbox, color, sigma=8.0, intensity=1.0, downscale=GLOW_DOWNSCALE):
+    """
+    Additive glow around any shape.
+    bbox: (x0, y0, x1, y1) of the shape in frame pixels.
+    draw_mask(mask, ox, oy): draws the shape with value 255 into `mask`,
+    whose top-left corner sits at frame pixel (ox, oy).
+    """
+    h, w = frame.shape[:2]
+    pad = int(3 * sigma) + downscale
+    x0, y0 = max(0, int(bbox[0]) - pad), max(0, int(bbox[1]) - pad)
+    x1, y1 = min(w, int(bbox[2]) + pad + 1), min(h, int(bbox[3]) + pad + 1)
+    if x0 >= x1 or y0 >= y1 or intensity <= 0:
+        return
+    rw, rh = x1 - x0, y1 - y0
+
+    mask = np.zeros((rh, rw), dtype=np.uint8)
+    draw_mask(mask, x0, y0)
+
+    sw, sh = max(1, rw // downscale), max(1, rh // downscale)
+    small = cv2.resize(mask, (sw, sh), interpolation=cv2.INTER_AREA)
+    s = max(0.5, sigma / downscale)
+    k = int(s * 3) * 2 + 1
+    small = cv2.sepFilter2D(small, -1, cv2.getGaussianKernel(k, s), cv2.getGaussianKernel(k, s),
+                            borderType=cv2.BORDER_CONSTANT)
+    glow = cv2.resize(small, (rw, rh), interpolation=cv2.INTER_LINEAR)
+
+    glow = cv2.cvtColor(glow, cv2.COLOR_GRAY2BGR)
+    scale = intensity / 255.0
+    cv2.multiply(glow, (color[0] * scale, color[1] * scale, color[2] * scale, 0), dst=glow)
+    roi = frame[y0:y1, x0:x1]
+    cv2.add(roi, glow, dst=roi)
+
+
+def glow_rect(frame, p0, p1, color, sigma=6.0, intensity=0.6, thickness=-1, downscale=GLOW_DOWNSCALE):
+    def shape(mask, ox, oy):
+        cv2.rectangle(mask, (p0[0] - ox, p0[1] - oy), (p1[0] - ox, p1[1] - oy), 255, thickness)
+    draw_glow_shape(frame, shape, (p0[0], p0[1], p1[0], p1[1]), color, sigma, intensity, downscale)
+
+
+def glow_line(frame, p0, p1, color, thickness=4, sigma=10.0, intensity=0.8, downscale=GLOW_DOWNSCALE):
+    def shape(mask, ox, oy):
+        cv2.line(mask, (p0[0] - ox, p0[1] - oy), (p1[0] - ox, p1[1] - oy), 255, thickness)
+    bbox = (min(p0[0], p1[0]) - thickness, min(p0[1], p1[1]) - thickness,
+            max(p0[0], p1[0]) + thickness, max(p0[1], p1[1]) + thickness)
+    draw_glow_shape(frame, shape, bbox, color, sigma, intensity, downscale)
+
+
+if __name__ == "__main__":
+    # Timing check against the old "copy frame, draw disc, blend frame" aura
+    frame = np.full((630, 1120, 3), 40, dtype=np.uint8)
+    centers = [(560, int(y)) for y in np.linspace(535, 157, 7)]
+
+    def old_auras(f):
+        for c in centers:
+            overlay = f.copy()
+            cv2.circle(overlay, c, 60, (0, 215, 255), -1)
+            cv2.addWeighted(overlay, 0.5, f, 0.5, 0, f)
+
+    def new_auras(f):
+        for c in centers:
+            draw_glow(f, c, 60, (0, 215, 255), 0.5)
+
+    for name, fn in (("frame blend", old_auras), ("glow sprite", new_auras)):
+        f = frame.copy()
+        fn(f)
+        t0 = time.perf_counter()
+        for _ in range(50):
+            fn(f)
+        print(f"[INFO] 7 auras via {name}: {(time.perf_counter() - t0) / 50 * 1000:.2f} ms")
+    print(f"[INFO] Sprite cache: {glow_sprites.hits} hits, {glow_sprites.misses} misses")
+
+    # Sidebar border glow: 15 stacked full-frame blends vs one blurred mask
+    def old_border(f):
+        for i in range(15):
+            alpha = 0.15 - (i * 0.01)
+            overlay_glow = f.copy()
+            cv2.line(overlay_glow, (840, 0), (840, 630), (0, 255, 255), max(1, 30 - i * 2))
+            cv2.addWeighted(overlay_glow, alpha, f, 1 - alpha, 0, f)
+
+    def new_border(f):
+        glow_line(f, (840, 0), (840, 630), (0, 255, 255), thickness=8, sigma=12.0, intensity=0.8)
+
+    for name, fn in (("15 blend passes", old_border), ("blurred mask", new_border)):
+        f = frame.copy()
+        t0 = time.perf_counter()
+        for _ in range(20):
+            fn(f)
+        print(f"[INFO] Border glow via {name}: {(time.perf_counter() - t0) / 20 * 1000:.2f} ms")
@@ -0,0 +1,149 @@
+import collections
+import time
+import cv2
+import numpy as np
+
+from frame_pool import frame_pool
+from text_cache import text_cache
+
+# ============================================================
+#   GRAPH RENDERER
+#   Live panel graphs drawn into a small ROI buffer: the static
+#   background + label is cached, coordinates are computed with
+#   NumPy in one go, and the ROI is copied into the frame once.
+# ============================================================
+
+BG_COLOR = (10, 15, 20)
+BORDER_COLOR = (50, 50, 50)
+LABEL_COLOR = (200, 200, 200)
+
+
+def push(series, value):
+    """Shift a fixed-length NumPy series left by one and append `value`."""
+    series[:-1] = series[1:]
+    series[-1] = value
+
+
+class GraphRenderer:
+    """
+    Draws the MultiGraphVisualizer styles ("line", "ecg", "bars",
+    "double_wave", "glow_beam", "filled_area").
+    Polylines are decimated to at most one point per pixel column and the
+    bars are rasterized as one NumPy mask, so cost is bounded by the ROI
+    size, not by the history length.
+    """
+    def __init__(self, max_backgrounds=32):
+        self.max_backgrounds = max_backgrounds
+        self.backgrounds = collections.OrderedDict()
+        self.columns = {}
+
+    def _background(self, w, h, label):
+        key = (w, h, label)
+        bg = self.backgrounds.get(key)
+        if bg is not None:
+            self.backgrounds.move_to_end(key)
+            return bg
+        bg = np.empty((h + 1, w + 1, 3), dtype=np.uint8)
+        bg[:] = BG_COLOR
+        cv2.rectangle(bg, (0, 0), (w, h), BORDER_COLOR, 1)
+        text_cache.put_text(bg, label, (5, 15), 0.5, LABEL_COLOR, 1, line_type=cv2.LINE_8)
+        self.backgrounds[key] = bg
+        if len(self.backgrounds) > self.max_backgrounds:
+            self.backgrounds.popitem(last=False)
+        return bg
+
+    def _sample(self, n, max_len, w, decimate=1):
+        """(indices, x pixels): at most one sample per `decimate` pixel columns."""
+        key = (n, max_len, w, decimate)
+        cols = self.columns.get(key)
+        if cols is None:
+            points = max(2, w // decimate)
+            idx = np.arange(n) if n <= points else np.linspace(0, n - 1, points).astype(np.intp)
+            xs = (idx / max_len * w).astype(np.int32)
+            cols = (idx, xs)
+            self.columns[key] = cols
+        return cols
+
+    @staticmethod
+    def _points(xs, ys):
+        return np.stack([xs, ys.astype(np.int32)], axis=1).reshape(-1, 1, 2)
+
+    @staticmethod
+    def _fill_under(roi, pts, w, h, color, alpha):
+        overlay = frame_pool.get("graph_fill", roi.shape)
+        np.copyto(overlay, roi)
+        poly = np.vstack([pts.reshape(-1, 2), [[w, h], [0, h]]]).astype(np.int32)
+        cv2.fillPoly(overlay, [poly], color)
+        cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0, roi)
+
+    def _bars(self, roi, data, w, h, color):
+        n = len(data)
+        bar_w = max(1, w // n)
+        col = np.arange(w + 1) // bar_w # Bar index per pixel column
+        in_bar = col < n
+        col = np.minimum(col, n - 1)
+        vals = data[col]
+        tops = h - (vals * h * 0.8).astype(np.int32)
+        palette = np.array([color, (0, 255, 255), (0, 0, 255)], dtype=np.uint8)
+        level = (vals > 0.3).astype(np.intp) + (vals > 0.6)  # Yellow mid, red tips for high stress
+        mask = (np.arange(h + 1)[:, None] >= tops[None, :]) & in_bar[None, :]
+        np.copyto(roi, np.broadcast_to(palette[level][None, :, :], roi.shape), where=mask[..., None])
+
+    def draw(self, frame, x, y, w, h, data, color, label, style="line", max_len=None, phase=0.0, decimate=1):
+        """decimate > 1 draws coarser polylines (used by the LOD controller)."""
+        data = np.asarray(data, dtype=np.float64)
+        max_len = max_len or len(data)
+        roi = frame_pool.get("graph", (h + 1, w + 1, 3))
+        np.copyto(roi, self._background(w, h, label))
+
+        if style == "bars":
+            if len(data):
+                self._bars(roi, data, w, h, color)
+        elif len(data) > 1:
+            idx, xs = self._sample(len(data), max_len, w, decimate)
+            vals = data[idx]
+            if style == "ecg":
+                pts = self._points(xs, h / 2 - vals * h * 0.4)
+                cv2.polylines(roi, [pts], False, color, 2, cv2.LINE_AA)
+            elif style == "double_wave":
+                pts1 = self._points(xs, h - vals * h * 0.9)
+                vals2 = vals * 0.8 + 0.1 * np.sin(idx * 0.2 + phase)
+                pts2 = self._points(xs, h - vals2 * h * 0.9)
+                cv2.polylines(roi, [pts1], False, color, 2, cv2.LINE_AA)
+                cv2.polylines(roi, [pts2], False, (255, 255, 255), 1, cv2.LINE_AA)
+                self._fill_under(roi, pts1, w, h, color, 0.3)
+            elif style == "glow_beam":
+                pts = self._points(xs, h - vals * h * 0.9)
+                cv2.polylines(roi, [pts], False, color, 6, cv2.LINE_AA)           # Outer glow
+                cv2.polylines(roi, [pts], False, (255, 255, 255), 2, cv2.LINE_AA) # White core
+            elif style == "filled_area":
+                pts = self._points(xs, h - vals * h * 0.9)
+                self._fill_under(roi, pts, w, h, color, 0.4)
+                cv2.polylines(roi, [pts], False, (255, 255, 255), 1, cv2.LINE_AA)
+            else:
+                pts = self._points(xs, h - vals * h * 0.9)
+                cv2.polylines(roi, [pts], False, color, 2, cv2.LINE_AA)
+
+        # Composite once (clipped at the frame borders)
+        fh, fw = frame.shape[:2]
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(fw, x + w + 1), min(fh, y + h + 1)
+        if x0 < x1 and y0 < y1:
+            frame[y0:y1, x0:x1] = roi[y0 - y:y1 - y, x0 - x:x1 - x]
+
+
+# Shared renderer for the panel graphs
+graph_renderer = GraphRenderer()
+
+
+if __name__ == "__main__":
+    # Cost must stay flat as the history grows
+    frame = np.zeros((630, 1120, 3), dtype=np.uint8)
+    styles = ["ecg", "bars", "double_wave", "glow_beam", "filled_area"]
+    for max_len in (100, 1000, 10000):
+        data = np.random.rand(max_len).astype(np.float32)
+        t0 = time.perf_counter()
+        for k in range(20):
+            for i, style in enumerate(styles):
+                graph_renderer.draw(frame, 840, 100 + i * 70, 240, 60, data, (0, 215, 255), style, style, phase=k * 0.2)
+        print(f"[INFO] max_len={max_len}: {(time.perf_counter() - t0) / 20 * 1000:.2f} ms for 5 graphs")
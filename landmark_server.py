@@ -0,0 +1,221 @@
+import argparse
+import collections
+import json
+import math
+import os
+import time
+import tornado.ioloop
+import tornado.web
+import tornado.websocket
+
+from practice_state import PracticeState, PhysiologyEngine
+
+# ============================================================
+#   LANDMARK INGESTION SERVER
+#   Browsers run the Hand / Face (/ Pose) landmarkers themselves
+#   and send only the landmarks; the server runs the headless
+#   practice logic and streams the state back. No video, no
+#   MediaPipe on the server.
+#
+#   WebSocket  /ws/landmarks[?mirror=1]
+#     client -> server (JSON, one packet per processed video frame):
+#       {"t": 1712.5,                 capture time in ms (performance.now())
+#        "hands": [[x, y, z, ...]],   21 points per hand, flattened
+#        "face":  [x, y, z, ...],     468/478 points, or null
+#        "pose":  [x, y, z, ...],     33 points, or null
+#        "hr": 72, "beat": false}     optional heart-rate sensor reading
+#     server -> client: the PracticeState snapshot + physiology scores.
+#   mirror=1: landmarks come from the raw (unmirrored) camera image;
+#   x is flipped to match the mirrored view the rules were tuned on.
+#
+#   GET /stats   active sessions and traffic totals
+#
+#   Browsers may only connect from the origins in
+#   YOGA_ALLOWED_ORIGINS (comma separated, default: the Next.js
+#   dev server) or --allow-origin.
+# ============================================================
+
+DEFAULT_PORT = 8765
+MAX_PACKET_BYTES = 64 * 1024 # A full face mesh as JSON is ~15 KB
+HAND_POINTS = 21
+FACE_POINTS = (468, 478)
+POSE_POINTS = 33
+ALLOWED_ORIGINS = [o.strip().rstrip("/") for o in
+                   os.environ.get("YOGA_ALLOWED_ORIGINS", "http://localhost:3000").split(",") if o.strip()]
+
+
+class Landmark(collections.namedtuple("Landmark", "x y z")):
+    __slots__ = ()
+
+
+class LandmarkList:
+    """Duck-types MediaPipe's NormalizedLandmarkList (`.landmark[i].x/.y/.z`)."""
+    __slots__ = ("landmark",)
+
+    def __init__(self, flat, mirror=False):
+        if mirror:
+            self.landmark = [Landmark(1.0 - flat[i], flat[i + 1], flat[i + 2]) for i in range(0, len(flat), 3)]
+        else:
+            self.landmark = [Landmark(flat[i], flat[i + 1], flat[i + 2]) for i in range(0, len(flat), 3)]
+
+
+def finite(value, name):
+    """float(value); ValueError for NaN / inf, which would poison the trackers for the whole session."""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"non-finite {name}")
+    return value
+
+
+def parse_landmarks(flat, points, mirror):
+    """Flat [x, y, z, ...] -> LandmarkList, or None if missing / malformed."""
+    if not flat or not isinstance(flat, list):
+        return None
+    if isinstance(points, int):
+        points = (points,)
+    if len(flat) not in [3 * n for n in points]:
+        raise ValueError(f"expected {' or '.join(str(3 * n) for n in points)} values, got {len(flat)}")
+    return LandmarkList([finite(v, "landmark") for v in flat], mirror)
+
+
+class IngestSession:
+    """Practice + physiology state for one connected client."""
+    def __init__(self, mirror=False):
+        self.mirror = mirror
+        self.state = PracticeState()
+        self.physio = PhysiologyEngine()
+        self.started = time.time()
+        self.clock_offset = None # server time - client time (s)
+        self.last_t = None
+        self.packets = 0
+        self.stale = 0
+        self.rejected = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.step_ms = 0.0
+
+    def ingest(self, packet):
+        """
+        Runs one packet through the rules; returns the reply dict, or None for
+        stale packets. Malformed packets raise ValueError / KeyError / TypeError
+        before they touch any state.
+        """
+        t = finite(packet["t"], "t") / 1000.0
+        hands = [parse_landmarks(h, HAND_POINTS, self.mirror) for h in (packet.get("hands") or [])[:2]]
+        face = parse_landmarks(packet.get("face"), FACE_POINTS, self.mirror)
+        pose = parse_landmarks(packet.get("pose"), POSE_POINTS, self.mirror)
+        hr = packet.get("hr")
+        if hr is not None:
+            hr = finite(hr, "hr")
+
+        # Only a valid packet may advance the clock
+        if self.last_t is not None and t <= self.last_t:
+            self.stale += 1 # Out of order / duplicate
+            return None
+        self.last_t = t
+        if self.clock_offset is None:
+            self.clock_offset = time.time() - t
+        now = t + self.clock_offset # Client capture time on the server's clock
+
+        t0 = time.perf_counter()
+        snapshot = self.state.step([h for h in hands if h], face, pose, now)
+        reply = dict(snapshot)
+        if hr is not None:
+            physio = self.physio.analyze(hr, bool(packet.get("beat")), snapshot["gaze_label"], now)
+            reply["physiology"] = {k: v for k, v in physio.items() if k != "tiny_graphs"}
+        self.step_ms = (time.perf_counter() - t0) * 1000.0
+        self.packets += 1
+        reply["t"] = packet["t"] # Echo the client timestamp for round-trip measurement
+        return reply
+
+    def stats(self):
+        return {
+            "uptime_s": time.time() - self.started,
+            "packets": self.packets,
+            "stale": self.stale,
+            "rejected": self.rejected,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "step_ms": self.step_ms,
+        }
+
+
+sessions = {} # handler -> IngestSession
+
+
+class LandmarkSocket(tornado.websocket.WebSocketHandler):
+    def check_origin(self, origin):
+        # The Next.js client is served from another origin: allow only the configured ones
+        allowed = self.settings.get("allowed_origins", ())
+        return origin.rstrip("/") in allowed or "*" in allowed or super().check_origin(origin)
+
+    def open(self):
+        mirror = self.get_argument("mirror", "0") in ("1", "true")
+        self.session = IngestSession(mirror)
+        sessions[self] = self.session
+        self.set_nodelay(True)
+        print(f"[INFO] Landmark client connected ({len(sessions)} active)")
+
+    def on_message(self, message):
+        session = self.session
+        session.bytes_in += len(message)
+        try:
+            packet = json.loads(message)
+            reply = session.ingest(packet)
+        except (ValueError, KeyError, TypeError) as e:
+            session.rejected += 1
+            if session.rejected <= 5:
+                print(f"[WARN] Rejected landmark packet: {e}")
+            return
+        except (LookupError, ArithmeticError) as e:
+            # The rules choked on odd landmark data; the session state cannot be trusted any more
+            print(f"[ERROR] Landmark session failed: {e!r}")
+            self.close(1011, "practice state error")
+            return
+        if reply is not None:
+            out = json.dumps(reply, separators=(",", ":"))
+            session.bytes_out += len(out)
+            self.write_message(out)
+
+    def on_close(self):
+        session = sessions.pop(self, None)
+        if session is not None:
+            s = session.stats()
+            print(f"[INFO] Landmark client left after {s['uptime_s']:.0f} s: {s['packets']} packets, "
+                  f"{s['bytes_in'] / max(1, s['packets']):.0f} B/packet in, {s['stale']} stale, {s['rejected']} rejected")
+
+
+class StatsHandler(tornado.web.RequestHandler):
+    def get(self):
+        per_session = [s.stats() for s in sessions.values()]
+        self.write({
+            "sessions": len(per_session),
+            "packets": sum(s["packets"] for s in per_session),
+            "bytes_in": sum(s["bytes_in"] for s in per_session),
+            "bytes_out": sum(s["bytes_out"] for s in per_session),
+            "per_session": per_session,
+        })
+
+
+def make_app(allowed_origins=ALLOWED_ORIGINS):
+    return tornado.web.Application([
+        (r"/ws/landmarks", LandmarkSocket),
+        (r"/stats", StatsHandler),
+    ], websocket_max_message_size=MAX_PACKET_BYTES,
+       allowed_origins=[o.rstrip("/") for o in allowed_origins])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark ingestion server (browser inference, server-side state).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--allow-origin", action="append", default=[],
+                        help="Extra browser origin allowed to connect (repeatable; '*' allows any)")
+    args = parser.parse_args()
+    origins = ALLOWED_ORIGINS + args.allow_origin
+    make_app(origins).listen(args.port)
+    print(f"[INFO] Landmark server on ws://0.0.0.0:{args.port}/ws/landmarks (origins: {', '.join(origins)})")
+    tornado.ioloop.IOLoop.current().start()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+import argparse
+import asyncio
+import concurrent.futures
+import fractions
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import av
+import cv2
+import numpy as np
+import tornado.httpclient
+import tornado.web
+from aiortc import MediaStreamTrack, RTCPeerConnection, RTCSessionDescription
+from aiortc.contrib.media import MediaPlayer
+from aiortc.mediastreams import MediaStreamError
+from frame_io import OutputFrames, decode_mirrored
+from session_registry import rss_mb
+
+# ============================================================
+#   WEBRTC LOAD GENERATOR
+#   Spawns a server process that hosts one YogaProcessor per peer
+#   (same latest-frame-wins path as app.py), then connects N
+#   headless aiortc clients that stream a clip and time every
+#   frame's round trip. Steps N up and prints a capacity curve.
+#
+#   streamlit-webrtc signals through Streamlit's own websocket,
+#   which a headless client cannot drive, so the server side here
+#   uses a plain HTTP offer/answer endpoint around the same
+#   processor class.
+#
+#   python loadtest_webrtc.py --clip session.mp4 --clients 1,2,4,8
+# ============================================================
+
+DEFAULT_PORT = 8090
+MARKER_BITS = 16
+MARKER_BLOCK = 12 # px; survives VP8 at the test bitrates
+SENT_MAX_AGE_S = 5.0 # Send times of frames the server dropped are forgotten after this
+VIDEO_TIME_BASE = fractions.Fraction(1, 90000)
+
+
+# --- Frame id marker (top-left row of black/white blocks) ---
+
+def write_marker(img, frame_id):
+    """Stamps frame_id into a BGR image: guard white, guard black, then 16 bits."""
+    bits = [1, 0] + [(frame_id >> i) & 1 for i in range(MARKER_BITS)]
+    for i, bit in enumerate(bits):
+        img[0:MARKER_BLOCK, i * MARKER_BLOCK:(i + 1) * MARKER_BLOCK] = 255 if bit else 0
+
+
+def read_marker(frame):
+    """Frame id from a decoded av.VideoFrame's luma plane, or None if no valid marker."""
+    plane = frame.planes[0]
+    luma = np.frombuffer(plane, np.uint8).reshape(-1, plane.line_size)
+    c = MARKER_BLOCK // 2
+    row = luma[c - 2:c + 2]
+    values = [row[:, i * MARKER_BLOCK + c - 2:i * MARKER_BLOCK + c + 2].mean() > 128
+              for i in range(MARKER_BITS + 2)]
+    if not values[0] or values[1]:
+        return None
+    return sum(1 << i for i, bit in enumerate(values[2:]) if bit)
+
+
+# ============================================================
+#   SERVER PROCESS
+# ============================================================
+
+class EchoProcessor:
+    """--processor none: only mirror the frame, to measure the WebRTC cost alone."""
+    def __init__(self):
+        self.processed = 0
+        self.dropped = 0
+        self.latency_ms = 0.0
+        self.output_frames = OutputFrames()
+
+    def process_latest(self, frames, post=None):
+        t0 = time.perf_counter()
+        img = decode_mirrored(frames[-1])
+        if post is not None:
+            post(img)
+        out = self.output_frames.wrap(img)
+        self.processed += 1
+        self.dropped += len(frames) - 1
+        self.latency_ms = (time.perf_counter() - t0) * 1000.0
+        return [out]
+
+    def metrics(self):
+        return {"processed": self.processed, "dropped": self.dropped, "latency_ms": self.latency_ms}
+
+    def on_ended(self):
+        pass
+
+
+class ProcessedTrack(MediaStreamTrack):
+    """
+    Latest-frame-wins like streamlit-webrtc's async_processing: a reader task
+    queues incoming frames, recv() hands everything queued to the processor on
+    a worker thread, which processes only the newest.
+    """
+    kind = "video"
+
+    def __init__(self, source, processor, executor):
+        super().__init__()
+        self.source = source
+        self.processor = processor
+        self.executor = executor
+        self.pending = []
+        self.ready = asyncio.Event()
+        self.reader = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        try:
+            while True:
+                frame = await self.source.recv()
+                self.pending.append(frame) # Look up self.pending after the await: recv() swaps it
+                self.ready.set()
+        except MediaStreamError:
+            self.ready.set()
+
+    def _process(self, frames):
+        frame_id = read_marker(frames[-1])
+        post = (lambda img: write_marker(img, frame_id)) if frame_id is not None else None
+        return self.processor.process_latest(frames, post)[0]
+
+    async def recv(self):
+        await self.ready.wait()
+        if not self.pending:
+            self.stop()
+            raise MediaStreamError
+        frames, self.pending = self.pending, []
+        self.ready.clear()
+        # The processor reuses per-thread buffers, so the frame is finished on the same thread
+        out = await asyncio.get_running_loop().run_in_executor(self.executor, self._process, frames)
+        out.pts, out.time_base = frames[-1].pts, frames[-1].time_base
+        return out
+
+
+class Server:
+    def __init__(self, processor):
+        self.processor_name = processor
+        self.peers = {} # pc -> processor
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) + 4)
+
+    def make_processor(self):
+        if self.processor_name == "none":
+            return EchoProcessor()
+        from yoga_processor import YogaProcessor # mediapipe + streamlit-webrtc
+        return YogaProcessor()
+
+    async def offer(self, params):
+        pc = RTCPeerConnection()
+        processor = self.make_processor()
+        self.peers[pc] = processor
+
+        @pc.on("track")
+        def on_track(track):
+            if track.kind == "video":
+                pc.addTrack(ProcessedTrack(track, processor, self.executor))
+
+        @pc.on("connectionstatechange")
+        async def on_state():
+            if pc.connectionState in ("failed", "closed"):
+                await self.close(pc)
+
+        await pc.setRemoteDescription(RTCSessionDescription(params["sdp"], params["type"]))
+        await pc.setLocalDescription(await pc.createAnswer())
+        return {"sdp": pc.localDescription.sdp, "type": pc.localDescription.type}
+
+    async def close(self, pc):
+        processor = self.peers.pop(pc, None)
+        if processor is not None:
+            processor.on_ended()
+        await pc.close()
+
+    def stats(self):
+        metrics = [p.metrics() for p in self.peers.values()]
+        return {
+            "sessions": len(metrics),
+            "processed": sum(m["processed"] for m in metrics),
+            "dropped": sum(m["dropped"] for m in metrics),
+            "latency_ms": statistics.mean(m["latency_ms"] for m in metrics) if metrics else 0.0,
+            "cpu_s": time.process_time(),
+            "rss_mb": rss_mb(),
+        }
+
+
+class OfferHandler(tornado.web.RequestHandler):
+    def initialize(self, server):
+        self.server = server
+
+    async def post(self):
+        self.write(await self.server.offer(json.loads(self.request.body)))
+
+
+class StatsHandler(tornado.web.RequestHandler):
+    def initialize(self, server):
+        self.server = server
+
+    def get(self):
+        self.write(self.server.stats())
+
+
+async def serve(port, processor):
+    server = Server(processor)
+    tornado.web.Application([
+        (r"/offer", OfferHandler, {"server": server}),
+        (r"/stats", StatsHandler, {"server": server}),
+    ]).listen(port, address="127.0.0.1")
+    print(f"[INFO] Load-test server on http://127.0.0.1:{port} (processor: {processor})", flush=True)
+    await asyncio.Event().wait()
+
+
+# ============================================================
+#   CLIENTS
+# ============================================================
+
+class MarkedTrack(MediaStreamTrack):
+    """Clip (or a synthetic pattern) at the test size, every frame stamped with an id."""
+    kind = "video"
+
+    def __init__(self, clip, size, fps, sent):
+        super().__init__()
+        self.size = size
+        self.fps = fps
+        self.sent = sent # frame_id -> send time, oldest first
+        self.player = MediaPlayer(clip, loop=True) if clip else None
+        self.count = 0 # Frames sent
+        self.start = None
+
+    async def _next_image(self):
+        if self.player is not None:
+            frame = await self.player.video.recv() # MediaPlayer paces file playback
+            return cv2.resize(frame.to_ndarray(format="bgr24"), self.size, interpolation=cv2.INTER_AREA)
+        # Synthetic: moving gradient, paced at fps
+        wait = self.start + self.count / self.fps - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        w, h = self.size
+        x = np.linspace(0, 255, w, dtype=np.float32)[None, :] + self.count * 4
+        img = np.empty((h, w, 3), dtype=np.uint8)
+        img[:] = (x % 256).astype(np.uint8)[..., None]
+        return img
+
+    async def recv(self):
+        if self.start is None:
+            self.start = time.monotonic()
+        img = await self._next_image()
+        self.count += 1
+        frame_id = self.count % (1 << MARKER_BITS)
+        write_marker(img, frame_id)
+        frame = av.VideoFrame.from_ndarray(img, format="bgr24")
+        now = time.monotonic()
+        frame.pts = int((now - self.start) / VIDEO_TIME_BASE)
+        frame.time_base = VIDEO_TIME_BASE
+        # Re-insert so the dict stays in send order; forget frames the server
+        # dropped, so the map stays small and a wrapped id never matches a stale send
+        self.sent.pop(frame_id, None)
+        self.sent[frame_id] = now
+        while self.sent:
+            old_id = next(iter(self.sent))
+            if now - self.sent[old_id] <= SENT_MAX_AGE_S:
+                break
+            del self.sent[old_id]
+        return frame
+
+
+class LoadClient:
+    def __init__(self, index, args):
+        self.index = index
+        self.args = args
+        self.sent = {}
+        self.rtts = []
+        self.received = 0
+        self.reset_at = 0.0
+        self.window_end = float("inf")
+        self.pc = None
+        self.track = None
+        self.reader = None
+
+    async def connect(self, url):
+        self.pc = RTCPeerConnection()
+        self.track = MarkedTrack(self.args.clip, self.args.size, self.args.fps, self.sent)
+        self.pc.addTrack(self.track)
+
+        @self.pc.on("track")
+        def on_track(track):
+            self.reader = asyncio.ensure_future(self._read(track))
+
+        await self.pc.setLocalDescription(await self.pc.createOffer())
+        response = await tornado.httpclient.AsyncHTTPClient().fetch(
+            url + "/offer", method="POST",
+            body=json.dumps({"sdp": self.pc.localDescription.sdp, "type": self.pc.localDescription.type}),
+            request_timeout=60)
+        answer = json.loads(response.body)
+        await self.pc.setRemoteDescription(RTCSessionDescription(answer["sdp"], answer["type"]))
+
+    async def _read(self, track):
+        try:
+            while True:
+                frame = await track.recv()
+                now = time.monotonic()
+                frame_id = read_marker(frame)
+                sent = self.sent.pop(frame_id, None) if frame_id is not None else None
+                if sent is not None and self.reset_at <= sent <= self.window_end: # Sent in the window
+                    self.rtts.append((now - sent) * 1000.0)
+                    self.received += 1
+        except MediaStreamError:
+            pass
+
+    def reset(self):
+        self.reset_at = time.monotonic()
+        self.rtts = []
+        self.received = 0
+
+    async def close(self):
+        if self.pc is not None:
+            await self.pc.close()
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def fetch_stats(url):
+    response = await tornado.httpclient.AsyncHTTPClient().fetch(url + "/stats")
+    return json.loads(response.body)
+
+
+async def run_step(n, args, url):
+    clients = [LoadClient(i, args) for i in range(n)]
+    await asyncio.gather(*(c.connect(url) for c in clients))
+    await asyncio.sleep(args.warmup)
+
+    for c in clients:
+        c.reset()
+    sent0 = [c.track.count for c in clients]
+    s0, t0, c0 = await fetch_stats(url), time.monotonic(), time.process_time()
+    await asyncio.sleep(args.duration)
+    s1, t1, c1 = await fetch_stats(url), time.monotonic(), time.process_time()
+    sent = sum(c.track.count - n0 for c, n0 in zip(clients, sent0))
+    for c in clients:
+        c.window_end = t1
+    await asyncio.sleep(1.0) # Let the window's in-flight frames arrive
+    elapsed = t1 - t0
+
+    rtts = [r for c in clients for r in c.rtts]
+    received = sum(c.received for c in clients)
+    row = {
+        "clients": n,
+        "rtt_p50_ms": percentile(rtts, 0.5),
+        "rtt_p95_ms": percentile(rtts, 0.95),
+        "fps_per_client": received / elapsed / n,
+        "drop_pct": 100.0 * (1.0 - received / sent) if sent else float("nan"),
+        "server_cpu_cores": (s1["cpu_s"] - s0["cpu_s"]) / elapsed,
+        "server_rss_mb": s1["rss_mb"],
+        "client_cpu_cores": (c1 - c0) / elapsed, # Near a full core: the clients, not the server, saturate
+        "processing_ms": s1["latency_ms"],
+    }
+    await asyncio.gather(*(c.close() for c in clients))
+    await asyncio.sleep(2.0) # Let the server release the sessions
+    return row
+
+
+async def run_load_test(args):
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve",
+                               "--port", str(args.port), "--processor", args.processor])
+    try:
+        for _ in range(100):
+            try:
+                baseline = await fetch_stats(url)
+                break
+            except (OSError, tornado.httpclient.HTTPClientError):
+                await asyncio.sleep(0.2)
+        else:
+            raise RuntimeError("load-test server did not start")
+
+        rows = []
+        print(f"{'clients':>7} {'rtt p50':>8} {'rtt p95':>8} {'fps/cl':>7} {'drop%':>6} {'cpu':>5} {'rss MB':>7} {'MB/sess':>8} {'cl cpu':>6}")
+        for n in args.clients:
+            row = await run_step(n, args, url)
+            row["mb_per_session"] = (row["server_rss_mb"] - baseline["rss_mb"]) / n
+            rows.append(row)
+            print(f"{n:>7} {row['rtt_p50_ms']:>7.0f}ms {row['rtt_p95_ms']:>6.0f}ms {row['fps_per_client']:>7.1f} "
+                  f"{row['drop_pct']:>6.1f} {row['server_cpu_cores']:>5.2f} {row['server_rss_mb']:>7.0f} "
+                  f"{row['mb_per_session']:>8.1f} {row['client_cpu_cores']:>6.2f}", flush=True)
+    finally:
+        server.terminate()
+        server.wait()
+
+    # Capacity: the largest step before frames start dropping or latency blows up
+    ok = [r for r in rows if r["drop_pct"] <= args.max_drop and r["rtt_p95_ms"] <= args.max_rtt]
+    first_bad = next((r for r in rows if r not in ok), None)
+    if first_bad is None:
+        print(f"[INFO] No saturation up to {rows[-1]['clients']} clients")
+    else:
+        print(f"[INFO] Frames start dropping at {first_bad['clients']} clients; "
+              f"capacity ~{ok[-1]['clients'] if ok else 0} clients at {args.size[0]}x{args.size[1]} @ {args.fps} fps")
+    if args.csv:
+        with open(args.csv, "w") as f:
+            f.write(",".join(rows[0]) + "\n")
+            for r in rows:
+                f.write(",".join(f"{v:.2f}" if isinstance(v, float) else str(v) for v in r.values()) + "\n")
+        print(f"[INFO] Capacity curve written to {args.csv}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent WebRTC users against the Yoga AI video processor.")
+    parser.add_argument("--clip", help="Video file streamed by every client (default: synthetic pattern)")
+    parser.add_argument("--clients", default="1,2,4,8", help="Comma-separated client counts to step through")
+    parser.add_argument("--size", default="640x480", help="Frame size sent by the clients")
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds after connecting")
+    parser.add_argument("--max-drop", type=float, default=5.0, help="Drop %% that counts as saturated")
+    parser.add_argument("--max-rtt", type=float, default=250.0, help="p95 round trip (ms) that counts as saturated")
+    parser.add_argument("--processor", choices=("yoga", "none"), default="yoga",
+                        help="'none' only mirrors frames (WebRTC overhead baseline)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--csv", help="Write the capacity curve to this CSV file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        asyncio.run(serve(args.port, args.processor))
+        return
+    args.clients = [int(n) for n in args.clients.split(",")]
+    args.size = tuple(int(v) for v in args.size.lower().split("x"))
+    if not args.clip:
+        print("[WARN] No --clip given: synthetic frames have no people, so inference is cheaper than real use.")
+    asyncio.run(run_load_test(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import collections
+import contextlib
+import time
+import cv2
+
+# ============================================================
+#   LEVEL-OF-DETAIL CONTROLLER
+#   Measures each effect's render cost and the rolling frame time.
+#   Over budget -> the most expensive effect steps down one level;
+#   sustained headroom -> the last effect stepped down steps back up.
+# ============================================================
+
+TARGET_FPS = 24
+OVER_BUDGET_FRAMES = 15  # Sustained overload before stepping down (~0.5 s)
+HEADROOM_FRAMES = 90     # Sustained headroom before stepping up (~3 s)
+HEADROOM_RATIO = 0.75    # "Headroom" = frame time below 75% of budget
+COST_EMA = 0.1
+
+
+class LODController:
+    """
+    Effects register how many quality levels they have (0 = full).
+
+        lod.register("om", ["5 particles", "3 particles", "1 particle", "off"])
+        n = lod.pick("om", (5, 3, 1, 0))
+        with lod.measure("om"):
+            draw_om_effect(...)
+
+    Stepping is one effect at a time with hysteresis, so quality does
+    not oscillate around the budget.
+    """
+    def __init__(self, target_fps=TARGET_FPS):
+        self.budget_ms = 1000.0 / target_fps
+        self.effects = collections.OrderedDict() # name -> level labels
+        self.levels = {}
+        self.cost_ms = {}       # name -> EMA of current cost
+        self.full_cost_ms = {}  # name -> EMA of cost at level 0
+        self.stepped = []       # Stack of effects stepped down (LIFO restore)
+        self.frame_ms = collections.deque(maxlen=30)
+        self.last_frame = None
+        self.over = 0
+        self.under = 0
+        self.enabled = True
+
+    def register(self, name, labels):
+        if name not in self.effects:
+            self.effects[name] = list(labels)
+            self.levels[name] = 0
+
+    def level(self, name):
+        return self.levels.get(name, 0) if self.enabled else 0
+
+    def pick(self, name, options):
+        """options[level], clamped to the last option."""
+        return options[min(self.level(name), len(options) - 1)]
+
+    @contextlib.contextmanager
+    def measure(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000.0
+            prev = self.cost_ms.get(name)
+            self.cost_ms[name] = ms if prev is None else prev + COST_EMA * (ms - prev)
+            if self.level(name) == 0:
+                prev = self.full_cost_ms.get(name)
+                self.full_cost_ms[name] = ms if prev is None else prev + COST_EMA * (ms - prev)
+
+    def frame_tick(self, now=None):
+        """Call once per frame (e.g. at the top of the loop)."""
+        now = time.perf_counter() if now is None else now
+        if self.last_frame is not None:
+            self.frame_ms.append((now - self.last_frame) * 1000.0)
+            self._adapt()
+        self.last_frame = now
+
+    def avg_frame_ms(self):
+        return sum(self.frame_ms) / len(self.frame_ms) if self.frame_ms else 0.0
+
+    def _adapt(self):
+        if not self.enabled or len(self.frame_ms) < self.frame_ms.maxlen // 2:
+            return
+        avg = self.avg_frame_ms()
+        if avg > self.budget_ms:
+            self.over += 1
+            self.under = 0
+        elif avg < self.budget_ms * HEADROOM_RATIO:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        if self.over >= OVER_BUDGET_FRAMES:
+            self.over = 0
+            self._step_down()
+        elif self.under >= HEADROOM_FRAMES:
+            self.under = 0
+            self._step_up()
+
+    def _step_down(self):
+        # Most expensive effect that can still go lower
+        candidates = [n for n in self.effects if self.levels[n] < len(self.effects[n]) - 1]
+        if not candidates:
+            return
+        name = max(candidates, key=lambda n: self.cost_ms.get(n, 0.0))
+        self.levels[name] += 1
+        self.stepped.append(name)
+        self.frame_ms.clear() # Judge the new level on fresh frames
+        print(f"[INFO] LOD: {name} -> {self.effects[name][self.levels[name]]}")
+
+    def _step_up(self):
+        if not self.stepped:
+            return
+        name = self.stepped.pop()
+        self.levels[name] -= 1
+        self.frame_ms.clear()
+        print(f"[INFO] LOD: {name} -> {self.effects[name][self.levels[name]]}")
+
+    def savings_ms(self, name):
+        full = self.full_cost_ms.get(name)
+        cur = self.cost_ms.get(name)
+        if full is None or cur is None or self.level(name) == 0:
+            return 0.0
+        return max(0.0, full - cur)
+
+    def draw_overlay(self, frame, x, y):
+        """Debug overlay: frame time vs budget, per-effect level / cost / savings."""
+        lines = [f"LOD {'ON' if self.enabled else 'OFF'}  frame {self.avg_frame_ms():.1f} / {self.budget_ms:.1f} ms"]
+        for name, labels in self.effects.items():
+            lvl = self.level(name)
+            lines.append(f"{name:<10} L{lvl} {labels[lvl]:<14} {self.cost_ms.get(name, 0.0):5.1f} ms"
+                         f"  -{self.savings_ms(name):.1f}")
+        box_h = 18 * len(lines) + 8
+        roi = frame[max(0, y - 14):max(0, y - 14 + box_h), max(0, x - 6):max(0, x + 330)]
+        roi //= 3 # Darken in place
+        # Numbers change every frame, so plain putText (not the text cache)
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (x, y + i * 18), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 0), 1, cv2.LINE_AA)
+
+
+if __name__ == "__main__":
+    # Simulated load: 50 ms frames must step the most expensive effect down first,
+    # and 10 ms frames must restore it afterwards.
+    lod = LODController(target_fps=24)
+    lod.register("cheap", ["full", "off"])
+    lod.register("heavy", ["full", "half", "off"])
+    lod.cost_ms.update({"cheap": 1.0, "heavy": 20.0})
+    t = 0.0
+    for _ in range(45):
+        t += 0.050
+        lod.frame_tick(t)
+    assert lod.level("heavy") == 1 and lod.level("cheap") == 0, lod.levels
+    for _ in range(300):
+        t += 0.010
+        lod.frame_tick(t)
+    assert lod.level("heavy") == 0, lod.levels
+    print(f"[INFO] LOD self-check passed: {lod.levels}")
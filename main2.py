@@ -5,12 +5,35 @@ import time
 import math
 import pygame
 import os
+import sys
+import getpass
+import sqlite3
 import random
 import speech_recognition as sr
 import pyttsx3
 import serial
 import serial.tools.list_ports
 import ai_explainer
+from landmark_filter import LandmarkSmoother
+from frame_pool import frame_pool
+from glow import draw_glow, glow_rect, glow_line
+from text_cache import text_cache
+from animation_cache import PhaseSprites
+from graph_renderer import graph_renderer, push
+from camera_capture import LatestFrameCapture
+from practice_state import (
+    EYE_CLOSED_THRESHOLD, EYE_CLOSED_FRAMES_REQUIRED, XP_PER_LEVEL, MAX_LEVEL,
+    analyze_face, detect_namaste, detect_peace, detect_mudra, detect_gaze_distraction,
+    compute_energy_limit, apply_energy_rules, compute_xp_gain,
+    BreathingTracker, PostureAnalyzer, AnalyticsTracker, MeditationTracker, PhysiologyEngine,
+)
+from class_mode import ClassSession, to_frame_px
+from motion_gate import MotionGate, landmarks_box
+from lod import LODController
+from session_recorder import SessionRecorder
+from snapshot import snapshots, FlashMessage
+from telemetry import start_session_telemetry
+from session_store import SessionStore
 
 # ============================================================
 #   AI CHAKRAFLOW — FULL VERSION (MUSIC + VOICE + SUMMARY)
@@ -93,11 +116,7 @@ CHAKRA_SCRIPTURES = [
         "meaning": "Sit in quiet awareness; no hurry, no pressure."
     },
 ]
-# Thresholds
-# Thresholds
-EYE_CLOSED_THRESHOLD = 0.30 # EAR Ratio (Increased to 0.30 for very robust detection)
-EYE_CLOSED_FRAMES_REQUIRED = 15 # ~0.5-1 sec.5s
-
+# Thresholds (EYE_CLOSED_*) live in practice_state.py
 AI_REFRESH_SECS = 6  # refresh AI tip every few seconds
 
 # ---------------- Pygame audio init -----------------
@@ -274,7 +293,7 @@ def draw_status_panel(frame, center_x, center_y, radius, status):
     max_w = 0
     line_heights = []
     for line in lines:
-        (w, h), baseline = cv2.getTextSize(line['text'], cv2.FONT_HERSHEY_SIMPLEX, line['scale'], line['thick'])
+        (w, h), baseline = text_cache.measure(line['text'], line['scale'], line['thick'])
         lh = h + baseline + 10 # 10px padding
         line_heights.append(lh)
         total_h += lh
@@ -295,24 +314,26 @@ def draw_status_panel(frame, center_x, center_y, radius, status):
         color = line['color']
         lh = line_heights[i]
         
-        (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thick)
+        (w, h), _ = text_cache.measure(text, scale, thick)
         x = center_x - (w // 2)
         
         # Draw Shadow/Outline for better visibility
         # [FIX] Much thicker outline (4px minimum)
-        cv2.putText(frame, text, (x, current_y), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), thick + 4, cv2.LINE_AA)
-        # Draw Main Text
-        cv2.putText(frame, text, (x, current_y), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thick, cv2.LINE_AA)
+        # [NEW] Outline + main text as one cached sprite
+        text_cache.put_stroked(frame, text, (x, current_y), scale, (((0, 0, 0), thick + 4), (color, thick)))
         
         current_y += lh
 
 def draw_text_with_bg(frame, text, x, y, font_scale=0.6, color=(255, 255, 255), thickness=1, bg_color=(0, 0, 0), bg_alpha=0.6):
-    (text_w, text_h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
-    overlay = frame.copy()
-    # Draw background rectangle
-    cv2.rectangle(overlay, (x - 5, y - text_h - 5), (x + text_w + 5, y + 5), bg_color, -1)
-    cv2.addWeighted(overlay, bg_alpha, frame, 1 - bg_alpha, 0, frame)
-    cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness, cv2.LINE_AA)
+    (text_w, text_h), _ = text_cache.measure(text, font_scale, thickness)
+    # [NEW] Blend the background box inside its own ROI only (no full-frame copy)
+    h, w = frame.shape[:2]
+    x0, y0 = max(0, x - 5), max(0, y - text_h - 5)
+    x1, y1 = min(w, x + text_w + 6), min(h, y + 6)
+    if x0 < x1 and y0 < y1:
+        roi = frame[y0:y1, x0:x1]
+        cv2.addWeighted(roi, 1 - bg_alpha, np.full_like(roi, bg_color), bg_alpha, 0, roi)
+    text_cache.put_text(frame, text, (x, y), font_scale, color, thickness)
 
 def draw_paragraph_with_bg(frame, text, x, y, max_width=600, font_scale=0.5, color=(255, 255, 255), thickness=1, bg_color=(0, 0, 0), bg_alpha=0.6):
     """
@@ -320,33 +341,20 @@ def draw_paragraph_with_bg(frame, text, x, y, max_width=600, font_scale=0.5, col
     x, y: Bottom-left corner of the *first line* (or roughly the anchor).
     Actually, let's make x, y the center-bottom anchor for the whole block to stack upwards easily.
     """
-    words = text.split()
-    lines = []
-    line = ""
-    
-    # Simple wrapping
-    for w in words:
-        test_line = line + (" " if line else "") + w
-        (w_px, _), _ = cv2.getTextSize(test_line, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
-        if w_px > max_width:
-            lines.append(line)
-            line = w
-        else:
-            line = test_line
-    if line:
-        lines.append(line)
+    # Simple wrapping ([NEW] cached: AI texts repeat for many frames)
+    lines = text_cache.wrap_pixels(text, max_width, font_scale, thickness)
         
     if not lines: return
 
     # Calculate total height
-    (txt_w, txt_h), baseline = cv2.getTextSize("Test", cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+    (txt_w, txt_h), baseline = text_cache.measure("Test", font_scale, thickness)
     line_height = txt_h + baseline + 10 # Spacing
     total_h = line_height * len(lines)
     
     # Calculate max width of the block
     max_line_w = 0
     for l in lines:
-        (lw, _), _ = cv2.getTextSize(l, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        (lw, _), _ = text_cache.measure(l, font_scale, thickness)
         max_line_w = max(max_line_w, lw)
         
     # Anchor: (x, y) is the bottom center of the block
@@ -357,7 +365,7 @@ def draw_paragraph_with_bg(frame, text, x, y, max_width=600, font_scale=0.5, col
     box_h = total_h + 20
     
     # Draw Background
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     cv2.rectangle(overlay, (box_x, box_y), (box_x + box_w, box_y + box_h), bg_color, -1)
     cv2.addWeighted(overlay, bg_alpha, frame, 1 - bg_alpha, 0, frame)
     
@@ -365,303 +373,14 @@ def draw_paragraph_with_bg(frame, text, x, y, max_width=600, font_scale=0.5, col
     cur_y = box_y + 10 + txt_h # First line baseline
     for l in lines:
         # Center each line
-        (lw, _), _ = cv2.getTextSize(l, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        (lw, _), _ = text_cache.measure(l, font_scale, thickness)
         lx = x - lw // 2
-        cv2.putText(frame, l, (lx, cur_y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness, cv2.LINE_AA)
+        text_cache.put_text(frame, l, (lx, cur_y), font_scale, color, thickness)
         cur_y += line_height
 
-def get_finger_states(hand_landmarks, image_width, image_height):
-    lm = hand_landmarks.landmark
-
-    def to_pixel(idx):
-        return int(lm[idx].x * image_width), int(lm[idx].y * image_height)
-
-    tips = [4, 8, 12, 16, 20]
-    pips = [3, 6, 10, 14, 18]
-
-    states = {}
-
-    thumb_tip_x, thumb_tip_y = to_pixel(4)
-    thumb_pip_x, thumb_pip_y = to_pixel(3)
-    states["thumb"] = thumb_tip_x > thumb_pip_x
-
-    finger_names = ["index", "middle", "ring", "pinky"]
-    for name, tip_idx, pip_idx in zip(finger_names, tips[1:], pips[1:]):
-        tip_x, tip_y = to_pixel(tip_idx)
-        pip_x, pip_y = to_pixel(pip_idx)
-        states[name] = tip_y < pip_y
-
-    return states
-
-
-def detect_gyan_mudra(hand_landmarks, frame=None, width=0, height=0):
-    lm = hand_landmarks.landmark
-    thumb_tip = lm[4]
-    index_tip = lm[8]
-    wrist = lm[0]
-    mid_tip = lm[12]
-    
-    # Normalize by hand size (wrist to middle fingertip) for scale tolerance
-    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
-    d = math.sqrt((thumb_tip.x - index_tip.x) ** 2 + (thumb_tip.y - index_tip.y) ** 2) / hand_scale
-    
-    # Visual Debugging (Draw line between thumb and index)
-    if frame is not None:
-        tx, ty = int(thumb_tip.x * width), int(thumb_tip.y * height)
-        ix, iy = int(index_tip.x * width), int(index_tip.y * height)
-        
-        # Color code: Green=Active, Yellow=Close, Red=Far
-        # Debug info
-        cv2.putText(frame, f"Gyan Dist: {d:.2f}", (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        if d < 0.28: # Further relaxed from 0.22
-            col = (0, 255, 0)
-            cv2.circle(frame, (ix, iy), 8, (0, 255, 0), -1) 
-        elif d < 0.35:
-            col = (0, 255, 255)
-        else:
-            col = (0, 0, 255)
-            
-        cv2.line(frame, (tx, ty), (ix, iy), col, 2)
-
-    return d < 0.28 # Further relaxed threshold
-
-def detect_prana_mudra(hand_landmarks):
-    # Ring and Pinky tips touch Thumb tip. Index and Middle straight.
-    lm = hand_landmarks.landmark
-    thumb_tip = lm[4]
-    ring_tip = lm[16]
-    pinky_tip = lm[20]
-    wrist = lm[0]
-    mid_tip = lm[12]
-    
-    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
-    
-    d_ring = math.sqrt((thumb_tip.x - ring_tip.x)**2 + (thumb_tip.y - ring_tip.y)**2) / hand_scale
-    d_pinky = math.sqrt((thumb_tip.x - pinky_tip.x)**2 + (thumb_tip.y - pinky_tip.y)**2) / hand_scale
-    
-    # Check if index and middle are extended (tip further from wrist than pip)
-    # Using simple y check might fail if hand is rotated, better to check distance from wrist
-    def dist_sq(p1, p2): return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
-    
-    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
-    middle_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
-
-    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
-    middle_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
-
-    return d_ring < 0.28 and d_pinky < 0.28 and index_ext and middle_ext
-
-def detect_apana_mudra(hand_landmarks):
-    # Middle and Ring tips touch Thumb tip. Index and Pinky straight.
-    lm = hand_landmarks.landmark
-    thumb_tip = lm[4]
-    mid_tip = lm[12]
-    ring_tip = lm[16]
-    wrist = lm[0]
-    
-    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
-    
-    d_mid = math.sqrt((thumb_tip.x - mid_tip.x)**2 + (thumb_tip.y - mid_tip.y)**2) / hand_scale
-    d_ring = math.sqrt((thumb_tip.x - ring_tip.x)**2 + (thumb_tip.y - ring_tip.y)**2) / hand_scale
-    
-    def dist_sq(p1, p2): return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
-    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
-    pinky_ext = dist_sq(lm[20], wrist) > dist_sq(lm[18], wrist)
-    
-    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
-    pinky_ext = dist_sq(lm[20], wrist) > dist_sq(lm[18], wrist)
-    
-    return d_mid < 0.28 and d_ring < 0.28 and index_ext and pinky_ext
-
-def detect_surya_mudra(hand_landmarks):
-    # Ring finger bent, thumb pressing it.
-    # This is hard to detect perfectly. Approximation: Ring tip close to thumb base (CMC or MCP), Thumb tip close to Ring PIP.
-    lm = hand_landmarks.landmark
-    thumb_tip = lm[4]
-    ring_tip = lm[16]
-    ring_pip = lm[14]
-    wrist = lm[0]
-    mid_tip = lm[12]
-    
-    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
-    
-    # Check if ring finger is folded
-    ring_folded = dist_sq(ring_tip, wrist) < dist_sq(ring_pip, wrist)
-    
-    # Check if thumb is over ring finger (distance between thumb tip and ring pip/dip)
-    d_thumb_ring = math.sqrt((thumb_tip.x - ring_pip.x)**2 + (thumb_tip.y - ring_pip.y)**2) / hand_scale
-    
-    # Check if thumb is over ring finger (distance between thumb tip and ring pip/dip)
-    d_thumb_ring = math.sqrt((thumb_tip.x - ring_pip.x)**2 + (thumb_tip.y - ring_pip.y)**2) / hand_scale
-    
-    return ring_folded and d_thumb_ring < 0.30 # Further relaxed from 0.25
-
-def detect_varun_mudra(hand_landmarks):
-    # Pinky tip touches Thumb tip. Others straight.
-    lm = hand_landmarks.landmark
-    thumb_tip = lm[4]
-    pinky_tip = lm[20]
-    wrist = lm[0]
-    mid_tip = lm[12]
-    
-    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
-    
-    d_pinky = math.sqrt((thumb_tip.x - pinky_tip.x)**2 + (thumb_tip.y - pinky_tip.y)**2) / hand_scale
-    
-    def dist_sq(p1, p2): return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
-    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
-    mid_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
-    ring_ext = dist_sq(lm[16], wrist) > dist_sq(lm[14], wrist)
-    
-    mid_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
-    ring_ext = dist_sq(lm[16], wrist) > dist_sq(lm[14], wrist)
-    
-    return d_pinky < 0.28 and index_ext and mid_ext and ring_ext
-
-def dist_sq(p1, p2):
-    return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
-
-def detect_open_palm(finger_states):
-    return all(finger_states.values())
-
-
-def detect_fist(finger_states):
-    return not any(finger_states.values())
-
-
-def detect_peace(hand_landmarks):
-    # Index/middle extended, ring/pinky folded
-    lm = hand_landmarks.landmark
-    states = get_finger_states(hand_landmarks, 1, 1)
-    return states["index"] and states["middle"] and not states["ring"] and not states["pinky"]
-
-
-def classify_chakra_gesture(finger_states, hand_landmarks=None):
-    # Enhanced classification using specific mudra functions
-    if hand_landmarks:
-        if detect_gyan_mudra(hand_landmarks): return "Gyan Mudra"
-        if detect_prana_mudra(hand_landmarks): return "Prana Mudra"
-        if detect_apana_mudra(hand_landmarks): return "Apana Mudra"
-        if detect_surya_mudra(hand_landmarks): return "Surya Mudra"
-        if detect_varun_mudra(hand_landmarks): return "Varun Mudra"
-    
-    # Fallback to finger states for basic chakra mapping if needed, or return None
-    t = finger_states["thumb"]
-    i = finger_states["index"]
-    m = finger_states["middle"]
-    r = finger_states["ring"]
-    p = finger_states["pinky"]
-
-    if not t and not i and not m and not r and not p:
-        return "Root (Fist)"
-    
-    return None
-
-
 def wrap_text(text, max_chars=60):
-    words = text.split()
-    lines = []
-    line = ""
-    for w in words:
-        if len(line) + len(w) + 1 <= max_chars:
-            line += (" " if line else "") + w
-        else:
-            lines.append(line)
-            line = w
-    if line:
-        lines.append(line)
-    return lines
-
-
-def analyze_face(face_landmarks, img_w, img_h):
-    if not face_landmarks:
-        return (255, 255, 255), "No face", 0.02, 0.02
-
-    lm = face_landmarks.landmark
-    upper_lip = lm[13]
-    lower_lip = lm[14]
-    left_eye_top = lm[159]
-    left_eye_bottom = lm[145]
-
-    def dist(a, b):
-        return math.sqrt((a.x - b.x) ** 2 + (a.y - b.y) ** 2)
-
-    mouth_open = dist(upper_lip, lower_lip)
-    eye_open = dist(left_eye_top, left_eye_bottom)
-
-    # Gaze & Eye State Detection
-    gaze_label = "Center"
-    eye_ratio = 0.3 # Default Open
-    gaze_x = 0.0 # -1.0 (Left) to 1.0 (Right)
-    
-    if len(lm) > 470: # Check if iris landmarks exist
-        # Right Eye (User's Right, Screen Left)
-        # Inner: 362, Outer: 263, Top: 386, Bottom: 374
-        r_inner = lm[362]
-        r_outer = lm[263]
-        r_top = lm[386]
-        r_bottom = lm[374]
-        r_iris = lm[473]
-        
-        # Calculate Eye Aspect Ratio (EAR) - Scale Invariant
-        h_dist = dist(r_inner, r_outer)
-        v_dist = dist(r_top, r_bottom)
-        
-        if h_dist > 0:
-            eye_ratio = v_dist / h_dist
-            
-            # Calculate Gaze X (Relative to center)
-            eye_center_x = (r_inner.x + r_outer.x) / 2
-            # Normalize: deviation / (half_width)
-            # Factor 4.0 to make it more sensitive
-            gaze_x = (r_iris.x - eye_center_x) / (h_dist / 2) * 4.0
-        
-        # Thresholds (tuned for mirrored/webcam view)
-        # In mirrored view: Looking Left (Screen Left) -> Iris moves Left (smaller x)
-        if gaze_x < -0.3:
-            gaze_label = "Right" # Actually Screen Left (User's Right?) - Naming is confusing, let's rely on gaze_x
-        elif gaze_x > 0.3:
-            gaze_label = "Left" # Screen Right
-            
-    if mouth_open > 0.035:
-        aura_color = (0, 255, 255)
-        mood = "Expressive / Happy"
-    elif eye_ratio < EYE_CLOSED_THRESHOLD:
-        aura_color = (255, 128, 0)
-        mood = "Calm / Meditative"
-    else:
-        aura_color = (255, 255, 255)
-        mood = "Neutral"
-
-    return aura_color, mood, eye_ratio, mouth_open, gaze_label, gaze_x
-
-
-class BreathingTracker:
-    def __init__(self, smoothing=0.9):
-        self.prev_y = None
-        self.smoothed = 0.0
-        self.smoothing = smoothing
-        self.last_time = time.time()
-        self.breath_phase = 0.0
-
-    def update(self, nose_y):
-        if self.prev_y is None:
-            self.prev_y = nose_y
-            return
-        dy = nose_y - self.prev_y
-        self.prev_y = nose_y
-        self.smoothed = self.smoothing * self.smoothed + (1 - self.smoothing) * dy
-        dt = max(1e-3, time.time() - self.last_time)
-        self.last_time = time.time()
-        self.breath_phase += self.smoothed * 50
-        if self.breath_phase > 2 * math.pi:
-            self.breath_phase -= 2 * math.pi
-        if self.breath_phase < 0:
-            self.breath_phase += 2 * math.pi
-
-    def get_breath_factor(self):
-        return 1.0 + 0.3 * math.sin(self.breath_phase)
+    # [NEW] Cached: the same AI text is re-wrapped every frame otherwise
+    return text_cache.wrap_chars(text, max_chars)
 
 
 def draw_chakras(frame, center_x, top_y, bottom_y,
@@ -689,9 +408,9 @@ def draw_chakras(frame, center_x, top_y, bottom_y,
         aura_radius = int(radius * (1.5 + 0.3 * music_pulse))
         aura_alpha = min(0.9, 0.25 + 0.5 * energy * music_pulse)
 
-        overlay = frame.copy()
-        cv2.circle(overlay, center, aura_radius, aura_color, -1)
-        cv2.addWeighted(overlay, aura_alpha, frame, 1 - aura_alpha, 0, frame)
+        # [NEW] Soft radial glow blended only inside its own ROI
+        # (sprite is 25% wider than the old flat disc to match its visual size)
+        draw_glow(frame, center, int(aura_radius * 1.25), aura_color, aura_alpha)
 
         cv2.circle(frame, center, radius, base_color, -1)
 
@@ -714,14 +433,11 @@ def draw_chakra_meter(frame, energies):
         y_top = y0 + i * (bar_h + gap)
         color = CHAKRA_COLORS[i]
         
-        # PREMIUM GLOW EFFECT - Outer aura
-        for glow_i in range(4):
-            alpha = 0.1 - (glow_i * 0.025)
-            offset = 4 - glow_i
-            overlay_glow = frame.copy()
-            cv2.rectangle(overlay_glow, (x0 - offset, y_top - offset), 
-                         (x0 + bar_w + offset, y_top + bar_h + offset), color, -1)
-            cv2.addWeighted(overlay_glow, alpha, frame, 1 - alpha, 0, frame)
+        # PREMIUM GLOW EFFECT - Outer aura ([NEW] blurred mask, was 4 full-frame blends)
+        # [NEW] Blur resolution (or off) is chosen by the LOD controller
+        glow_ds = lod.pick("glow", GLOW_LOD_DOWNSCALE)
+        if glow_ds:
+            glow_rect(frame, (x0, y_top), (x0 + bar_w, y_top + bar_h), color, sigma=3.0, intensity=0.3, downscale=glow_ds)
         
         # Dark Background with Premium Border
         cv2.rectangle(frame, (x0, y_top), (x0 + bar_w, y_top + bar_h),
@@ -745,7 +461,7 @@ def draw_chakra_meter(frame, energies):
         
         # Inner glow on filled portion
         if filled_h > 0:
-            overlay_fill = frame.copy()
+            overlay_fill = frame_pool.scratch_copy(frame)
             cv2.rectangle(overlay_fill, (x0 + 1, y_fill), (x0 + bar_w - 1, y_top + bar_h - 1),
                          (255, 255, 255), -1)
             cv2.addWeighted(overlay_fill, 0.15, frame, 0.85, 0, frame)
@@ -785,7 +501,7 @@ def generate_smart_coach_message(energies, mood_label, alignment_mode, gyan_acti
 
 
 def draw_gyan_sparkles(frame, center_x, center_y, radius):
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     for _ in range(35):
         angle = random.uniform(0, 2 * math.pi)
         r = random.uniform(radius * 0.6, radius * 1.1)
@@ -802,7 +518,7 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
     golden_color = (0, 215, 255) # BGR: Gold/Orange-ish
     
     # Draw main glowing halo
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     cv2.circle(overlay, (center_x, center_y), radius, golden_color, -1)
     cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
     
@@ -821,50 +537,6 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
         cv2.circle(frame, (px, py), 10, golden_color, 2) # Golden rim
 
 
-class PostureAnalyzer:
-    def __init__(self):
-        self.last_label = "Unknown"
-
-    def assess(self, pose_landmarks):
-        if not pose_landmarks:
-            self.last_label = "No body"
-            return 0.0, self.last_label
-
-        lm = pose_landmarks.landmark
-        ls, rs = lm[11], lm[12]
-        lh, rh = lm[23], lm[24]
-
-        mid_shoulders = ((ls.x + rs.x) * 0.5, (ls.y + rs.y) * 0.5)
-        mid_hips = ((lh.x + rh.x) * 0.5, (lh.y + rh.y) * 0.5)
-
-        dx = mid_shoulders[0] - mid_hips[0]
-        dy = mid_shoulders[1] - mid_hips[1] + 1e-6
-        spine_angle = abs(math.degrees(math.atan2(dx, dy)))  # 0 is vertical
-
-        shoulder_level = abs(ls.y - rs.y)
-        hips_level = abs(lh.y - rh.y)
-
-        score = 1.0
-        if spine_angle > 10:
-            score -= min(0.5, (spine_angle - 10) / 40)
-        if shoulder_level > 0.03:
-            score -= min(0.3, (shoulder_level - 0.03) / 0.1)
-        if hips_level > 0.03:
-            score -= min(0.2, (hips_level - 0.03) / 0.1)
-
-        score = max(0.0, min(1.0, score))
-        if score > 0.8:
-            label = "Aligned"
-        elif score > 0.6:
-            label = "Slight tilt"
-        elif score > 0.4:
-            label = "Adjust spine/shoulders"
-        else:
-            label = "Poor posture"
-        self.last_label = label
-        return score, label
-
-
 def draw_smart_tracking(frame, hand_results, face_results, yoga_mode=False):
     """
     Draws 'smart' tracking overlays:
@@ -914,20 +586,6 @@ def draw_smart_tracking(frame, hand_results, face_results, yoga_mode=False):
     #             connection_drawing_spec=face_style
     #         )
 
-def detect_namaste(hand_results):
-    """
-    Detects if two hands are present and close together (Namaste/Anjali gesture).
-    """
-    if not hand_results.multi_hand_landmarks or len(hand_results.multi_hand_landmarks) < 2:
-        return False
-    
-    # Simple check: distance between wrist points
-    h1 = hand_results.multi_hand_landmarks[0].landmark[0]
-    h2 = hand_results.multi_hand_landmarks[1].landmark[0]
-    
-    dist = math.sqrt((h1.x - h2.x)**2 + (h1.y - h2.y)**2)
-    return dist < 0.40  # [FIX] Relaxed threshold (was 0.30) for easier detection
-
 def draw_mini_hand(frame, cx, cy, mudra_name, scale=1.0):
     """
     Draws a stylized colorful hand skeleton representing the mudra.
@@ -1036,21 +694,15 @@ def draw_mudra_sidebar(frame, active_mudra):
     sidebar_w = 280 
     
     # --- Premium Glow Background ---
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     
     # 1. Ultra Dark Glass Background (Almost Black with slight blue tint)
     cv2.rectangle(overlay, (w - sidebar_w, 0), (w, h), (2, 2, 5), -1)
     cv2.addWeighted(overlay, 0.95, frame, 0.05, 0, frame)
     
     # 2. Glowing Left Border (Cyan/Gold Gradient Effect)
-    # Stronger Glow
-    for i in range(15):
-        alpha = 0.15 - (i * 0.01)
-        thickness = 30 - (i * 2)
-        if thickness < 1: thickness = 1
-        overlay_glow = frame.copy()
-        cv2.line(overlay_glow, (w - sidebar_w, 0), (w - sidebar_w, h), (0, 255, 255), thickness)
-        cv2.addWeighted(overlay_glow, alpha, frame, 1 - alpha, 0, frame)
+    # [NEW] One blurred-mask glow instead of 15 stacked full-frame blends
+    glow_line(frame, (w - sidebar_w, 0), (w - sidebar_w, h), (0, 255, 255), thickness=20, sigma=6.0, intensity=0.8)
         
     # Solid thin line for sharpness
     cv2.line(frame, (w - sidebar_w, 0), (w - sidebar_w, h), (0, 255, 255), 2)
@@ -1086,7 +738,7 @@ def draw_mudra_sidebar(frame, active_mudra):
             border_col = (0, 255, 255) # Yellow border
             
             # Glow effect for active item
-            overlay_item = frame.copy()
+            overlay_item = frame_pool.scratch_copy(frame)
             cv2.rectangle(overlay_item, (w - sidebar_w + 10, y - 25), (w - 10, y + 45), (0, 255, 255), -1)
             cv2.addWeighted(overlay_item, 0.2, frame, 0.8, 0, frame)
             
@@ -1144,7 +796,7 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
     golden_color = (0, 215, 255) # BGR: Gold/Orange-ish
     
     # Draw main glowing halo
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     cv2.circle(overlay, (center_x, center_y), radius, golden_color, -1)
     cv2.addWeighted(overlay, 0.2, frame, 0.8, 0, frame)
     
@@ -1163,50 +815,6 @@ def draw_revolving_aura(frame, center_x, center_y, radius, t):
         cv2.circle(frame, (px, py), 10, golden_color, 2) # Golden rim
 
 
-class PostureAnalyzer:
-    def __init__(self):
-        self.last_label = "Unknown"
-
-    def assess(self, pose_landmarks):
-        if not pose_landmarks:
-            self.last_label = "No body"
-            return 0.0, self.last_label
-
-        lm = pose_landmarks.landmark
-        ls, rs = lm[11], lm[12]
-        lh, rh = lm[23], lm[24]
-
-        mid_shoulders = ((ls.x + rs.x) * 0.5, (ls.y + rs.y) * 0.5)
-        mid_hips = ((lh.x + rh.x) * 0.5, (lh.y + rh.y) * 0.5)
-
-        dx = mid_shoulders[0] - mid_hips[0]
-        dy = mid_shoulders[1] - mid_hips[1] + 1e-6
-        spine_angle = abs(math.degrees(math.atan2(dx, dy)))  # 0 is vertical
-
-        shoulder_level = abs(ls.y - rs.y)
-        hips_level = abs(lh.y - rh.y)
-
-        score = 1.0
-        if spine_angle > 10:
-            score -= min(0.5, (spine_angle - 10) / 40)
-        if shoulder_level > 0.03:
-            score -= min(0.3, (shoulder_level - 0.03) / 0.1)
-        if hips_level > 0.03:
-            score -= min(0.2, (hips_level - 0.03) / 0.1)
-
-        score = max(0.0, min(1.0, score))
-        if score > 0.8:
-            label = "Aligned"
-        elif score > 0.6:
-            label = "Slight tilt"
-        elif score > 0.4:
-            label = "Adjust spine/shoulders"
-        else:
-            label = "Poor posture"
-        self.last_label = label
-        return score, label
-
-
 def draw_smart_tracking(frame, hand_results, face_results, yoga_mode=False):
     """
     Draws 'smart' tracking overlays:
@@ -1255,20 +863,6 @@ def draw_smart_tracking(frame, hand_results, face_results, yoga_mode=False):
     #             connection_drawing_spec=face_style
     #         )
 
-def detect_namaste(hand_results):
-    """
-    Detects if two hands are present and close together (Namaste/Anjali gesture).
-    """
-    if not hand_results.multi_hand_landmarks or len(hand_results.multi_hand_landmarks) < 2:
-        return False
-    
-    # Simple check: distance between wrist points
-    h1 = hand_results.multi_hand_landmarks[0].landmark[0]
-    h2 = hand_results.multi_hand_landmarks[1].landmark[0]
-    
-    dist = math.sqrt((h1.x - h2.x)**2 + (h1.y - h2.y)**2)
-    return dist < 0.20  # Relaxed threshold
-
 def draw_mini_hand(frame, cx, cy, mudra_name, scale=1.0):
     """
     Draws a stylized colorful hand skeleton representing the mudra.
@@ -1380,7 +974,7 @@ def draw_mudra_sidebar(frame, active_mudra):
     sidebar_w = 280 
     
     # Glassmorphism Background - HIGH VISIBILITY
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     # Much lighter background (Dark Grey/Blue) for contrast
     cv2.rectangle(overlay, (w - sidebar_w, 0), (w, h), (60, 70, 80), -1)
     # High alpha (0.85) to block out background noise
@@ -1462,7 +1056,7 @@ def draw_mudra_sidebar(frame, active_mudra):
             cv2.line(frame, (w - sidebar_w, y - 25), (w - sidebar_w, y + 45), (0, 255, 0), 5, cv2.LINE_AA)
             
         # Draw Item Background
-        overlay_item = frame.copy()
+        overlay_item = frame_pool.scratch_copy(frame)
         cv2.rectangle(overlay_item, (w - sidebar_w + 2, y - 25), (w, y + 45), bg_col, -1)
         cv2.addWeighted(overlay_item, bg_alpha, frame, 1 - bg_alpha, 0, frame)
             
@@ -1558,7 +1152,7 @@ def draw_mudra_info_panel(frame, mudra_name=None):
     y = 580 # [FIX] Moved UP to avoid bottom cutoff (was 630)
     
     # Background
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     cv2.rectangle(overlay, (x, y), (x + panel_w, y + panel_h), (40, 50, 60), -1)
     cv2.addWeighted(overlay, 0.9, frame, 0.1, 0, frame)
     
@@ -1624,42 +1218,6 @@ def draw_mudra_info_panel(frame, mudra_name=None):
         py += 20 # [FIX] Tighter spacing (was 25)
 
 
-class AnalyticsTracker:
-    def __init__(self):
-        self.mudra_counts = {"Gyan": 0, "Fist": 0, "OpenPalm": 0, "Peace": 0}
-        self.posture_alerts = 0
-        self.posture_samples = []
-        self.chakra_time = [0.0] * 7
-        self.last_chakra_idx = None
-        self.last_chakra_time = time.time()
-
-    def record_chakra(self, idx):
-        now = time.time()
-        if self.last_chakra_idx is not None:
-            self.chakra_time[self.last_chakra_idx] += now - self.last_chakra_time
-        self.last_chakra_idx = idx
-        self.last_chakra_time = now
-
-    def record_mudra(self, name):
-        if name in self.mudra_counts:
-            self.mudra_counts[name] += 1
-
-    def record_posture(self, score):
-        self.posture_samples.append(score)
-        if score < 0.5:
-            self.posture_alerts += 1
-
-    def summary(self):
-        avg_posture = sum(self.posture_samples) / len(self.posture_samples) if self.posture_samples else 0.0
-        return {
-            "chakra_time": self.chakra_time,
-            "mudras": self.mudra_counts,
-            "posture_alerts": self.posture_alerts,
-            "avg_posture": avg_posture,
-        }
-
-
-
 class HeartRateMonitor:
     def __init__(self, baud_rate=115200):
         self.ser = None
@@ -2000,7 +1558,7 @@ def draw_kumbhaka_bar(frame, prana_level, is_holding):
         
         # Glow Effect
         if is_holding:
-            overlay = frame.copy()
+            overlay = frame_pool.scratch_copy(frame)
             cv2.rectangle(overlay, (x, y), (x + fill_w, y + bar_h), (255, 255, 255), -1)
             cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
             
@@ -2064,7 +1622,7 @@ class ElementalEffects:
             # Render
             if life > 0:
                 alpha = life
-                overlay = frame.copy()
+                overlay = frame_pool.scratch_copy(frame)
                 
                 if p_type == "fire":
                     # Rise up, flicker
@@ -2103,7 +1661,7 @@ class ElementalEffects:
         for hand_lm in hand_list:
             lm = hand_lm.landmark[0] # Wrist/Palm
             cx, cy = int(lm.x * w), int(lm.y * h)
-            if random.random() < 0.2:
+            if random.random() < 0.2 and len(self.particles) < self.max_particles:
                 # Water Colors: Blue, Cyan, White
                 col = random.choice([(255, 0, 0), (255, 255, 0), (255, 255, 255)])
                 self.particles.append([cx + random.randint(-40, 40), cy, 0, 0, 1.0, "water", col])
@@ -2113,7 +1671,7 @@ class ElementalEffects:
         for hand_lm in hand_list:
             lm = hand_lm.landmark[8] # Index tip (or any)
             cx, cy = int(lm.x * w), int(lm.y * h)
-            if random.random() < 0.2:
+            if random.random() < 0.2 and len(self.particles) < self.max_particles:
                 # Nature Colors: Green, Lime
                 col = random.choice([(0, 255, 0), (50, 205, 50), (0, 255, 127)])
                 self.particles.append([cx, cy, 0, 0, 1.0, "nature", col])
@@ -2154,7 +1712,7 @@ class ElementalEffects:
             frame[y1:y2, x1:x2] = roi
             
             # Add extra glow (Yellow)
-            overlay = frame.copy()
+            overlay = frame_pool.scratch_copy(frame)
             cv2.circle(overlay, (cx, cy), size // 2 + 15, (0, 255, 255), -1) 
             cv2.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
 
@@ -2199,7 +1757,7 @@ class ElementalEffects:
             frame[y1:y2, x1:x2] = roi
             
             # Add extra glow (simple circle behind)
-            overlay = frame.copy()
+            overlay = frame_pool.scratch_copy(frame)
             cv2.circle(overlay, (cx, cy), size // 2 + 10, (255, 255, 0), -1) # Cyan/Yellow glow
             cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
 
@@ -2264,7 +1822,7 @@ class ThirdEyeController:
         cv2.circle(frame, (fx, fy), 20, glow_color, 1)
         
         # Add a "Light" overlay for bloom
-        overlay = frame.copy()
+        overlay = frame_pool.scratch_copy(frame)
         cv2.circle(overlay, (fx, fy), 40, glow_color, -1)
         cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
 
@@ -2294,11 +1852,13 @@ third_eye = ThirdEyeController()
 class MultiGraphVisualizer:
     def __init__(self, max_len=100):
         self.max_len = max_len
-        self.hrv_data = [0.0] * max_len
-        self.prana_data = [0.0] * max_len
-        self.focus_data = [0.0] * max_len
-        self.hrv_index_data = [0.0] * max_len # [NEW] HRV Index
-        self.pulse_data = [0.0] * max_len
+        self.decimate = 1 # [NEW] Polyline decimation, raised by the LOD controller
+        # [NEW] Fixed-length NumPy series, shifted in place by push()
+        self.hrv_data = np.zeros(max_len)
+        self.prana_data = np.zeros(max_len)
+        self.focus_data = np.zeros(max_len)
+        self.hrv_index_data = np.zeros(max_len) # [NEW] HRV Index
+        self.pulse_data = np.zeros(max_len)
         self.phase = 0.0
         
     def update(self, hr, hr_history, spo2, posture_score, beat_detected, avg_energy=0.5, hrv_val=50.0):
@@ -2308,10 +1868,7 @@ class MultiGraphVisualizer:
         if beat_detected:
             self.pulse_data[-4:] = [-0.2, 1.0, -0.5, 0.1]
         else:
-            self.pulse_data.append(random.uniform(-0.02, 0.02))
-        
-        if len(self.pulse_data) > self.max_len:
-            self.pulse_data.pop(0)
+            push(self.pulse_data, random.uniform(-0.02, 0.02))
             
         # 2. Stress (HRV) -> "EQ Bars"
         # Generate varied data 0.0 to 1.0
@@ -2324,8 +1881,7 @@ class MultiGraphVisualizer:
         if random.random() < stress_factor:
             noise += random.uniform(0.3, 0.7)
             
-        self.hrv_data.append(noise)
-        if len(self.hrv_data) > self.max_len: self.hrv_data.pop(0)
+        push(self.hrv_data, noise)
 
         # 3. Prana (Energy) -> "Double Wave"
         # Now linked to REAL Chakra Energy (avg_energy)
@@ -2337,8 +1893,7 @@ class MultiGraphVisualizer:
         # Clamp 0.0 to 1.0
         val_prana = max(0.0, min(1.0, val_prana))
         
-        self.prana_data.append(val_prana)
-        if len(self.prana_data) > self.max_len: self.prana_data.pop(0)
+        push(self.prana_data, val_prana)
         
         # 4. Focus -> "Glow Beam"
         # Value near 0.5 (center). 
@@ -2346,274 +1901,16 @@ class MultiGraphVisualizer:
         focus_score = 1.0 - stress_factor
         wobble = (1.0 - focus_score) * 0.3
         val_focus = 0.5 + math.sin(self.phase * 0.3) * wobble + random.uniform(-0.05, 0.05)
-        self.focus_data.append(val_focus)
-        if len(self.focus_data) > self.max_len: self.focus_data.pop(0)
+        push(self.focus_data, val_focus)
 
         # 5. HRV Index -> "Filled Area"
         # Normalize HRV (typically 20-100ms) to 0.0-1.0
         norm_hrv = max(0.0, min(1.0, (hrv_val - 20) / 80))
-        self.hrv_index_data.append(norm_hrv)
-        if len(self.hrv_index_data) > self.max_len: self.hrv_index_data.pop(0)
+        push(self.hrv_index_data, norm_hrv)
 
     def draw_graph(self, frame, x, y, w, h, data, color, label, fill=False, style="line"):
-        # Background
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (10, 15, 20), -1)
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (50, 50, 50), 1)
-        
-        # Label
-        cv2.putText(frame, label, (x + 5, y + 15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-        
-        if style == "bars":
-            # EQ Bar Style
-            bar_w = max(1, w // len(data))
-            for i, val in enumerate(data):
-                bx = int(x + i * bar_w)
-                bh = int(val * h * 0.8) # Scale to height
-                by = int(y + h - bh)
-                
-                # Color gradient based on height
-                c = color
-                if val > 0.6: c = (0, 0, 255) # Red tips for high stress
-                elif val > 0.3: c = (0, 255, 255) # Yellow mid
-                
-                cv2.rectangle(frame, (bx, by), (bx + bar_w - 1, y + h), c, -1)
-                
-        elif style == "double_wave":
-            # Double Sine Wave
-            points1 = []
-            points2 = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                
-                # Wave 1 (Main)
-                py1 = int(y + h - (val * h * 0.9))
-                points1.append((px, py1))
-                
-                # Wave 2 (Phase shifted, smaller)
-                val2 = val * 0.8 + 0.1 * math.sin(i * 0.2 + self.phase)
-                py2 = int(y + h - (val2 * h * 0.9))
-                points2.append((px, py2))
-                
-            if len(points1) > 1:
-                # Fill between waves? Or just draw two lines
-                cv2.polylines(frame, [np.array(points1)], False, color, 2, cv2.LINE_AA)
-                cv2.polylines(frame, [np.array(points2)], False, (255, 255, 255), 1, cv2.LINE_AA)
-                
-                # Fill bottom
-                poly_pts = np.vstack([np.array(points1), [x+w, y+h], [x, y+h]])
-                overlay = frame.copy()
-                cv2.fillPoly(overlay, [poly_pts], color)
-                cv2.addWeighted(overlay, 0.3, frame, 0.7, 0, frame)
-
-        elif style == "glow_beam":
-            # Glowing Line
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h - (val * h * 0.9))
-                points.append((px, py))
-                
-            if len(points) > 1:
-                pts_arr = np.array(points, dtype=np.int32)
-                # Outer Glow
-                cv2.polylines(frame, [pts_arr], False, color, 6, cv2.LINE_AA) # Thick colored
-                # Inner Core
-                cv2.polylines(frame, [pts_arr], False, (255, 255, 255), 2, cv2.LINE_AA) # White core
-
-        elif style == "ecg":
-            # ECG look
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h/2 - (val * h * 0.4))
-                points.append((px, py))
-            if len(points) > 1:
-                cv2.polylines(frame, [np.array(points)], False, color, 2, cv2.LINE_AA)
-                
-        elif style == "filled_area":
-            # Filled Area Graph
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h - (val * h * 0.9))
-                points.append((px, py))
-            
-            if len(points) > 1:
-                # Close the polygon
-                poly_pts = np.vstack([np.array(points), [x+w, y+h], [x, y+h]])
-                overlay = frame.copy()
-                cv2.fillPoly(overlay, [poly_pts], color)
-                cv2.addWeighted(overlay, 0.4, frame, 0.6, 0, frame)
-                cv2.polylines(frame, [np.array(points)], False, (255, 255, 255), 1, cv2.LINE_AA)
-
-        else:
-            # Default Line
-            points = []
-            for i, val in enumerate(data):
-                px = int(x + (i / self.max_len) * w)
-                py = int(y + h - (val * h * 0.9))
-                points.append((px, py))
-            if len(points) > 1:
-                cv2.polylines(frame, [np.array(points)], False, color, 2, cv2.LINE_AA)
-
-class PhysiologyEngine:
-    def __init__(self):
-        self.history_bpm = []
-        self.history_ibi = []
-        self.last_beat_time = time.time()
-        self.min_ibi = 300  # 200 BPM
-        self.max_ibi = 1500 # 40 BPM
-        
-        # [NEW] Nadi Pariksha History
-        self.history_vata = []
-        self.history_pitta = []
-        self.history_kapha = []
-        
-        # [NEW] Insight Timer
-        self.last_insight_time = 0
-        self.current_insight = "Scanning bio-rhythms..."
-        
-    def _get_tiny_graph(self, data, length=7):
-        if not data or len(data) < 2: return "       "
-        # Unicode bars:   ▂ ▃ ▄ ▅ ▆ ▇ █
-        bars = "  ▂▃▄▅▆▇█"
-        # Normalize last 'length' points
-        recent = data[-length:]
-        if not recent: return "       "
-        mn, mx = min(recent), max(recent)
-        if mx == mn: return "▃" * len(recent)
-        
-        graph = ""
-        for v in recent:
-            idx = int((v - mn) / (mx - mn + 1e-6) * (len(bars) - 1))
-            graph += bars[idx]
-        return graph.ljust(length)
-
-    def analyze(self, bpm, beat_detected, gaze_label="Center"):
-        # [FIX] Handle No Sensor Input
-        if bpm <= 0:
-            return {
-                'stress_score': 0.0,
-                'calm_score': 0.0,
-                'focus_score': 0.0,
-                'insight_text': "Waiting for Sensor...",
-                'tiny_graphs': {'vata': [], 'pitta': [], 'kapha': []}
-            }
-
-        now = time.time()
-        
-        # 1. Calculate IBI
-        if beat_detected:
-            ibi = (now - self.last_beat_time) * 1000.0 # ms
-            self.last_beat_time = now
-            if self.min_ibi < ibi < self.max_ibi:
-                self.history_ibi.append(ibi)
-                if len(self.history_ibi) > 20: self.history_ibi.pop(0)
-        
-        # Update BPM history
-        if bpm > 0:
-            self.history_bpm.append(bpm)
-            if len(self.history_bpm) > 20: self.history_bpm.pop(0)
-            
-        # 2. Calculate HRV (RMSSD)
-        hrv_rmssd = 0.0
-        if len(self.history_ibi) > 2:
-            diffs = np.diff(self.history_ibi)
-            sq_diffs = diffs ** 2
-            mean_sq = np.mean(sq_diffs)
-            hrv_rmssd = math.sqrt(mean_sq)
-            
-        # 3. Derive Metrics
-        # Stress: High BPM + Low HRV
-        # Normalize BPM (60-100) -> 0-1
-        norm_bpm = max(0, min(1, (bpm - 60) / 40)) if bpm > 0 else 0
-        # Normalize HRV (10-100) -> 0-1 (Higher is better)
-        norm_hrv = max(0, min(1, (hrv_rmssd - 10) / 90))
-        
-        stress_score = (norm_bpm * 0.7) + ((1.0 - norm_hrv) * 0.3)
-        stress_score = max(0, min(1, stress_score)) * 100
-        
-        calm_score = 100 - stress_score
-        
-        # Focus: Stability of BPM (Inverse of BPM variance)
-        bpm_var = np.var(self.history_bpm) if len(self.history_bpm) > 5 else 10
-        focus_score = max(0, min(100, 100 - bpm_var))
-        
-        # [FIX] Gaze Influence on Focus
-        if gaze_label == "Center":
-            focus_score = max(80.0, focus_score) # Ensure high focus
-        else:
-            focus_score = min(40.0, focus_score) # Cap low focus
-        
-        # [NEW] Calculate Doshas (Nadi Pariksha)
-        # Vata (Air): Linked to Variability/Movement -> Proportional to HRV
-        vata_score = min(100, norm_hrv * 100)
-        
-        # Pitta (Fire): Linked to Intensity/Heat -> Proportional to HR
-        pitta_score = min(100, norm_bpm * 100)
-        
-        # Kapha (Water): Linked to Stability/Calm -> Inverse of HR & HRV
-        # High Kapha = Slow, steady pulse
-        kapha_score = min(100, (1.0 - norm_bpm) * 80 + (1.0 - norm_hrv) * 20)
-        
-        # Update History
-        self.history_vata.append(vata_score)
-        self.history_pitta.append(pitta_score)
-        self.history_kapha.append(kapha_score)
-        
-        # Keep history short (20 frames)
-        if len(self.history_vata) > 20: self.history_vata.pop(0)
-        if len(self.history_pitta) > 20: self.history_pitta.pop(0)
-        if len(self.history_kapha) > 20: self.history_kapha.pop(0)
-        
-        # [NEW] Determine Dominant Dosha & Finding
-        doshas = {'Vata': vata_score, 'Pitta': pitta_score, 'Kapha': kapha_score}
-        dominant = max(doshas, key=doshas.get)
-        
-        finding = "Scanning..."
-        if len(self.history_bpm) > 5:
-            if dominant == 'Vata':
-                finding = "Dominant: Vata (High Movement/Anxiety)"
-            elif dominant == 'Pitta':
-                finding = "Dominant: Pitta (High Energy/Heat)"
-            elif dominant == 'Kapha':
-                finding = "Dominant: Kapha (High Stability/Lethargy)"
-                
-            # Check for Balance (if all are close)
-            avg_d = sum(doshas.values()) / 3
-            if all(abs(v - avg_d) < 15 for v in doshas.values()):
-                finding = "Finding: Tridosha Balanced (Excellent)"
-        
-        # 4. Generate Insight (Every 15 Seconds)
-        if now - self.last_insight_time > 15.0:
-            self.last_insight_time = now
-            
-            if len(self.history_bpm) > 5:
-                if calm_score > 80:
-                    self.current_insight = "Deep state of relaxation detected."
-                elif calm_score > 60:
-                    self.current_insight = "Heart rhythm is steady and calm."
-                elif stress_score > 80:
-                    self.current_insight = "High arousal. Focus on slow exhalations."
-                elif stress_score > 60:
-                    self.current_insight = "Slight tension. Soften your shoulders."
-                elif focus_score > 80:
-                    self.current_insight = "Excellent physiological coherence."
-                else:
-                    self.current_insight = "Breathing is syncing with heart rate."
-            else:
-                self.current_insight = "Scanning bio-rhythms..."
-
-        return {
-            "heart_rate": bpm,
-            "hrv_rmssd_ms": hrv_rmssd,
-            "stress_score": stress_score,
-            "calm_score": calm_score,
-            "focus_score": focus_score,
-            "tiny_graphs": {'vata': self.history_vata, 'pitta': self.history_pitta, 'kapha': self.history_kapha},
-            "insight_text": self.current_insight,
-            "finding": finding # [NEW]
-        }
+        # [NEW] Vectorized ROI renderer with cached background/label (see graph_renderer.py)
+        graph_renderer.draw(frame, x, y, w, h, data, color, label, style, self.max_len, self.phase, self.decimate)
 
 multi_visualizer = MultiGraphVisualizer()
 # pulse_visualizer = PulseWaveVisualizer() # Replaced
@@ -2656,7 +1953,7 @@ def draw_heart_rate_panel(frame, hr_monitor, meditation_stage, posture_score=0.0
     multi_visualizer.update(hr, hr_history, spo2, posture_score, beat_detected, avg_energy, hrv_val)
     
     # Panel Background (Premium Dark Glass)
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     cv2.rectangle(overlay, (panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), (5, 8, 15), -1) 
     cv2.addWeighted(overlay, 0.95, frame, 0.05, 0, frame) 
     
@@ -2786,7 +2083,7 @@ def draw_heart_rate_panel(frame, hr_monitor, meditation_stage, posture_score=0.0
     pts = pts.reshape((-1, 1, 2))
     
     # Draw Filled Coherence Blob
-    overlay = frame.copy()
+    overlay = frame_pool.scratch_copy(frame)
     cv2.fillPoly(overlay, [pts], coh_color)
     cv2.addWeighted(overlay, 0.5, frame, 0.5, 0, frame)
     cv2.polylines(frame, [pts], True, (255, 255, 255), 1, cv2.LINE_AA)
@@ -2879,11 +2176,12 @@ else:
 class OmParticleSystem:
     def __init__(self):
         self.particles = []
+        self.max_particles = 5 # [NEW] Lowered by the LOD controller under load
         
     def update(self, w, h, energy_level):
         # Spawn new particles if energy is high
         # [FIX] Only 4-5 particles, larger area, spreading
-        if energy_level > 0.9 and len(self.particles) < 5:
+        if energy_level > 0.9 and len(self.particles) < self.max_particles:
             if random.random() < 0.1: # Slower spawn rate for fewer particles
                 spawn_x = w // 2 + random.randint(-150, 150) # Larger area
                 # Velocity spreads outwards from center
@@ -2909,7 +2207,7 @@ class OmParticleSystem:
 
     def draw(self, frame):
         for p in self.particles:
-            overlay = frame.copy()
+            overlay = frame_pool.scratch_copy(frame)
             # Always use procedural drawing for reliability (No boxes!)
             self.draw_om_shape(overlay, int(p['x']), int(p['y']), p['size'])
             cv2.addWeighted(overlay, p['alpha'], frame, 1 - p['alpha'], 0, frame)
@@ -3013,6 +2311,34 @@ def overlay_image_alpha(img, img_overlay, x, y, alpha_mult=1.0):
 
 om_particles = OmParticleSystem()
 
+# [NEW] Session recording ('v' toggles, or start with --record)
+RECORDING_DIR = "recordings"
+RECORD_SIZE = (1280, 720)
+
+
+def start_session_recording():
+    import datetime
+    os.makedirs(RECORDING_DIR, exist_ok=True)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(RECORDING_DIR, f"yoga_session_{timestamp}.mp4")
+    return SessionRecorder(path, size=RECORD_SIZE).start()
+
+# ============================================================
+#   [NEW] LEVEL OF DETAIL
+#   Effects step down (most expensive first) when the frame time
+#   stays over budget, and back up once there is headroom.
+# ============================================================
+lod = LODController(target_fps=24)
+ELEMENTAL_LOD_PARTICLES = (100, 40, 15, 0)
+OM_LOD_PARTICLES = (5, 3, 1, 0)
+GLOW_LOD_DOWNSCALE = (4, 8, 0)  # 0 = glow off
+GRAPH_LOD_DECIMATE = (1, 2, 4)
+lod.register("elemental", ["100 particles", "40 particles", "15 particles", "no particles"])
+lod.register("om", ["5 particles", "3 particles", "1 particle", "off"])
+lod.register("glow", ["1/4 res blur", "1/8 res blur", "off"])
+lod.register("graphs", ["full", "1/2 points", "1/4 points"])
+lod.register("flag", ["animated", "static"])
+
 def draw_om_effect(frame, energy_level):
     """
     Updates and draws the Om Particle System.
@@ -3022,58 +2348,6 @@ def draw_om_effect(frame, energy_level):
     om_particles.draw(frame)
 
 
-class MeditationTracker:
-    def __init__(self):
-        self.stage = "Dharana (Concentration)"
-        self.concentration_level = 0.0
-        self.start_time = 0
-        self.in_dhyana = False
-        
-    def update(self, eye_open, breath_stable, body_still, gaze_label="Center"):
-        # Logic: 
-        # 1. Eyes Closed -> Jump to 100%
-        # 2. Eyes Open + Center Gaze -> Max 50%
-        # 3. Eyes Open + Looking Away -> Drop to 0%
-        
-        if eye_open < EYE_CLOSED_THRESHOLD: # Eyes closed (Using Ratio now)
-            if not self.in_dhyana:
-                self.in_dhyana = True
-                self.start_time = time.time()
-                self.stage = "Dhyana (Meditation)"
-            
-            # Fast increase to 100%
-            self.concentration_level = min(100.0, self.concentration_level + 1.0) # Faster gain (was 0.5)
-            
-            if self.concentration_level > 90 and breath_stable:
-                self.stage = "Samadhi (Absorption)"
-            elif self.concentration_level > 50:
-                self.stage = "Dhyana (Meditation)"
-            else:
-                self.stage = "Dhyana (Entering...)"
-                
-        else: # Eyes Open
-            self.in_dhyana = False
-            
-            if gaze_label == "Center":
-                # Looking at camera -> Increase to 90% (Max for eyes open)
-                # [FIX] Cap at 90% if eyes open. Must close eyes for 100%.
-                if self.concentration_level < 90.0:
-                    self.concentration_level = min(90.0, self.concentration_level + 0.5) 
-                
-                # [FIX] Accurate Staging
-                if self.concentration_level > 80:
-                    self.stage = "Dharana (Deep Focus)"
-                elif self.concentration_level > 20:
-                    self.stage = "Dharana (Focus)"
-                else:
-                    self.stage = "Focusing..."
-            else:
-                # Looking away -> Distracted
-                self.concentration_level = max(0.0, self.concentration_level - 0.5) # Slower drop (was 1.0)
-                self.stage = "Distracted"
-            
-        return self.stage, self.concentration_level
-
 # 🔊 Bilingual (Hindi + English) voice summary
 def speak_summary(chakra_energies, total_gyan_count, alignment_count, duration_min):
     strongest_idx = int(np.argmax(chakra_energies))
@@ -3180,7 +2454,7 @@ def draw_indian_flag(frame, x, y, width, t):
         
         # Glow (Add weighted) - Subtle
         if i % 4 == 0:
-            overlay = frame.copy()
+            overlay = frame_pool.scratch_copy(frame)
             cv2.circle(overlay, (x+i, int(y+height/2+shift)), 5, (255, 255, 255), -1)
             cv2.addWeighted(overlay, 0.05, frame, 0.95, 0, frame)
 
@@ -3200,141 +2474,62 @@ def draw_indian_flag(frame, x, y, width, t):
     # Text - Enhanced Visibility
     text = "Proudly Made in India"
     # Calculate text size for centering
-    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)
+    (tw, th), _ = text_cache.measure(text, 0.45, 1)
     tx = x + (width // 2) - (tw // 2) # Center horizontally
     ty = y + height + 25 # [FIX] Moved down further (was +15)
     
-    # Triple Stroke for Max Visibility
-    # 1. Black Shadow
-    cv2.putText(frame, text, (tx, ty), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 4, cv2.LINE_AA)
-    # 2. White Outline
-    cv2.putText(frame, text, (tx, ty), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 2, cv2.LINE_AA)
-    # 3. Gold Core
-    cv2.putText(frame, text, (tx, ty), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 215, 255), 1, cv2.LINE_AA)
+    # Triple Stroke for Max Visibility: Black Shadow, White Outline, Gold Core
+    text_cache.put_stroked(frame, text, (tx, ty), 0.45,
+                           (((0, 0, 0), 4), ((255, 255, 255), 2), ((0, 215, 255), 1)))
 
 
-def generate_aura_photo(frame, aura_color, avg_hr, focus_level):
-    """
-    Generates a souvenir photo with aura glow and stats.
-    """
-    h, w, _ = frame.shape
-    souvenir = frame.copy()
-    
-    # 1. Apply Aura Glow (Vignette)
-    # Create a radial gradient mask
-    Y, X = np.ogrid[:h, :w]
-    center = (h//2, w//2)
-    dist_from_center = np.sqrt((X - center[1])**2 + (Y - center[0])**2)
-    mask = 1 - np.clip(dist_from_center / (w * 0.6), 0, 1) # 1 at center, 0 at edges
-    
-    # Apply color tint to edges (inverse of mask)
-    glow_layer = np.full((h, w, 3), aura_color, dtype=np.uint8)
-    
-    # Blend: Center is original, Edges are tinted
-    # We want edges to be glowing with aura_color
-    # So alpha for glow_layer should be high at edges (low mask)
-    alpha = (1 - mask) * 0.6 # Max 60% tint at edges
-    alpha = np.dstack((alpha, alpha, alpha))
-    
-    souvenir = (souvenir * (1 - alpha) + glow_layer * alpha).astype(np.uint8)
-    
-    # 2. Add Border
-    cv2.rectangle(souvenir, (0, 0), (w, h), aura_color, 20)
-    
-    # 3. Add Text Stats
-    # Bottom Bar
-    bar_h = 120
-    cv2.rectangle(souvenir, (0, h - bar_h), (w, h), (20, 20, 20), -1)
-    
-    # Title
-    cv2.putText(souvenir, "YOGA AI SOUVENIR", (w//2 - 150, h - 80), 
-                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
-    
-    # Date
-    import datetime
-    date_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-    cv2.putText(souvenir, date_str, (w - 250, h - 20), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-                
-    # Stats
-    stats_text = f"Avg HR: {int(avg_hr)} BPM   |   Focus: {int(focus_level * 100)}%"
-    cv2.putText(souvenir, stats_text, (50, h - 30), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, aura_color, 2)
-                
-    # Save
-    filename = f"aura_souvenir_{int(time.time())}.png"
-    cv2.imwrite(filename, souvenir)
-    print(f"[INFO] Aura Souvenir saved: {filename}")
-    
-    # Show briefly (optional, but main loop is ending)
-    cv2.imshow("Aura Souvenir", souvenir)
-    cv2.waitKey(2000) # Show for 2 seconds before closing
 
+# [NEW] The flag only depends on t through sin(t * 4 + ...), so it is periodic:
+# pre-render its phases once and blit one sprite per frame.
+FLAG_PERIOD = 2 * math.pi / 4
+FLAG_PHASES = 32
+_flag_sprites = {}
+
+def draw_indian_flag_cached(frame, x, y, width, t):
+    sprites = _flag_sprites.get(width)
+    if sprites is None:
+        height = int(width * 0.6)
+        (tw, _), _ = text_cache.measure("Proudly Made in India", 0.45, 4)
+        ax = max(0, tw // 2 - width // 2) + 8 # Caption is wider than the flag
+        ay = 8
+        sprites = PhaseSprites(lambda canvas, pt: draw_indian_flag(canvas, ax, ay, width, pt),
+                               (width + 2 * ax, height + 45), (ax, ay), FLAG_PERIOD, FLAG_PHASES)
+        _flag_sprites[width] = sprites
+    sprites.draw(frame, x, y, t)
 
 def generate_aura_photo(frame, aura_color, avg_hr, focus_level):
     """
-    Generates a souvenir photo with aura glow and stats.
-    Saves in 'screenshots' folder with timestamp.
+    Queues a souvenir photo with aura glow and stats (see snapshot.py).
+    Composing and saving run in the background; returns the filename
+    in the 'screenshots' folder, or None if the photo was skipped.
     """
-    h, w, _ = frame.shape
-    souvenir = frame.copy()
-    
-    # 1. Apply Aura Glow (Vignette)
-    # Create a radial gradient mask
-    Y, X = np.ogrid[:h, :w]
-    center = (h//2, w//2)
-    dist_from_center = np.sqrt((X - center[1])**2 + (Y - center[0])**2)
-    mask = 1 - np.clip(dist_from_center / (w * 0.6), 0, 1) # 1 at center, 0 at edges
-    
-    # Apply color tint to edges (inverse of mask)
-    glow_layer = np.full((h, w, 3), aura_color, dtype=np.uint8)
-    
-    # Blend: Center is original, Edges are tinted
-    # We want edges to be glowing with aura_color
-    # So alpha for glow_layer should be high at edges (low mask)
-    alpha = (1 - mask) * 0.6 # Max 60% tint at edges
-    alpha = np.dstack((alpha, alpha, alpha))
-    
-    souvenir = (souvenir * (1 - alpha) + glow_layer * alpha).astype(np.uint8)
-    
-    # 2. Add Border
-    cv2.rectangle(souvenir, (0, 0), (w, h), aura_color, 20)
-    
-    # 3. Add Text Stats
-    # Bottom Bar
-    bar_h = 120
-    cv2.rectangle(souvenir, (0, h - bar_h), (w, h), (20, 20, 20), -1)
-    
-    # Title
-    cv2.putText(souvenir, "YOGA AI SOUVENIR", (w//2 - 150, h - 80), 
-                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
-    
-    # Date
-    import datetime
-    date_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-    cv2.putText(souvenir, date_str, (w - 250, h - 20), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-                
-    # Stats
-    stats_text = f"Avg HR: {int(avg_hr)} BPM   |   Focus: {int(focus_level * 100)}%"
-    cv2.putText(souvenir, stats_text, (50, h - 30), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, aura_color, 2)
-                
-    # Save to Screenshots Folder
-    screenshot_dir = "screenshots"
-    if not os.path.exists(screenshot_dir):
-        os.makedirs(screenshot_dir)
-    
-    # Better filename with readable timestamp
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join(screenshot_dir, f"yoga_session_{timestamp}.png")
-    cv2.imwrite(filename, souvenir)
-    print(f"[INFO] 📸 Screenshot saved: {filename}")
-    
-    return filename  # Return filename for confirmation
+    return snapshots.capture(frame, aura_color, avg_hr, focus_level)
+
+
+def save_session_history(session_start, summary, xp, level, telemetry_path):
+    """[NEW] Adds the session to the local store and prints the last 30 days."""
+    user = sys.argv[sys.argv.index("--user") + 1] if "--user" in sys.argv[:-1] else (os.environ.get("YOGA_USER") or getpass.getuser())
+    chakra_time = summary["chakra_time"]
+    dominant_chakra = CHAKRA_NAMES[int(np.argmax(chakra_time))] if max(chakra_time) > 0 else None
+    try:
+        store = SessionStore()
+        store.add_session(user, session_start, time.time() - session_start,
+                          avg_posture=summary["avg_posture"] if summary["posture_samples"] else None,
+                          dominant_chakra=dominant_chakra, mudra_hold=summary["mudra_time"], xp=xp, level=level,
+                          telemetry_path=telemetry_path)
+        month = store.practice_summary(user, days=30)
+        store.close()
+    except sqlite3.Error as e:
+        print(f"[ERROR] Could not save the session history: {e}")
+        return
+    posture = f"{month['avg_posture']:.2f}" if month["avg_posture"] is not None else "n/a"
+    print(f"Last 30 days ({user}): {month['sessions']} sessions, {month['minutes']:.0f} min, "
+          f"avg posture {posture}, mudras held {month['mudra_hold_s'] / 60.0:.1f} min")
 
 
 def show_final_report(session_start, chakra_energies, total_gyan_count, alignment_count):
@@ -3365,12 +2560,12 @@ def show_final_report(session_start, chakra_energies, total_gyan_count, alignmen
 # ======================== MAIN ===========================
 
 def main():
-    cap = cv2.VideoCapture(CAM_INDEX)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+    # [NEW] Threaded capture: newest frame only (MJPEG, 1-frame driver buffer)
+    cap = LatestFrameCapture(CAM_INDEX, FRAME_WIDTH, FRAME_HEIGHT)
     if not cap.isOpened():
         print("[ERROR] Could not open camera.")
         return
+    cap.start()
 
     # Background music
     if os.path.exists(MUSIC_PATH):
@@ -3463,6 +2658,19 @@ def main():
     frame_count = 0
     last_pose_landmarks = None
 
+    # [NEW] One-Euro landmark smoothing + prediction for skipped frames
+    landmark_smoother = LandmarkSmoother()
+
+    # [NEW] Motion gate: reuse hand / face / pose results while the scene is still
+    motion_gate = MotionGate()
+    hand_res = None
+    face_res = None
+    pose_still = False
+    show_lod_overlay = False # [NEW] 'l' toggles the LOD debug overlay
+    recorder = start_session_recording() if "--record" in sys.argv else None
+    telemetry = None if "--no-telemetry" in sys.argv else start_session_telemetry() # [NEW] Per-frame Parquet log
+    flash_msg = FlashMessage() # [NEW] Non-blocking screenshot feedback
+
     # [NEW] Gamification System
     # current_level = 0 # Replaced by XP system
     max_level_session = 0
@@ -3472,8 +2680,6 @@ def main():
     # [NEW] XP System (20 Levels)
     total_xp = 0.0
     current_level = 1
-    XP_PER_LEVEL = 150 # Approx 5 seconds per level at base rate (30fps)
-    MAX_LEVEL = 20
 
     print("[INFO] AI ChakraFlow FULL started. Press 'q' to quit.")
 
@@ -3481,24 +2687,52 @@ def main():
     cv2.setMouseCallback("AI ChakraFlow — Full Experience", mouse_callback)
     
     while True:
-        ret, frame = cap.read()
+        ret, raw_frame, capture_ts = cap.read()
         if not ret:
             break
-        frame = cv2.flip(frame, 1)
+        # [NEW] Frame-budget LOD: adapt, then apply this frame's effect knobs
+        lod.frame_tick()
+        elemental_effects.max_particles = lod.pick("elemental", ELEMENTAL_LOD_PARTICLES)
+        om_particles.max_particles = lod.pick("om", OM_LOD_PARTICLES)
+        multi_visualizer.decimate = lod.pick("graphs", GRAPH_LOD_DECIMATE)
+        # [NEW] Flip / convert into pooled buffers (no per-frame allocation)
+        frame = frame_pool.flip(raw_frame, 1, name="frame")
         h, w, _ = frame.shape
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb = frame_pool.cvt_color(frame, cv2.COLOR_BGR2RGB, name="rgb")
         
         # [FIX] Update Heart Rate Monitor (Read Serial Data)
         hr_monitor.update()
 
-        hand_res = hands.process(rgb)
-        face_res = face_mesh.process(rgb)
+        # [NEW] Motion gate: a model only re-runs if its region moved (or its result is stale)
+        now_ts = time.time()
+        motion_gate.update(frame)
+        hands_box = landmarks_box(hand_res.multi_hand_landmarks) if hand_res and hand_res.multi_hand_landmarks else None
+        face_box = landmarks_box(face_res.multi_face_landmarks[:1]) if face_res and face_res.multi_face_landmarks else None
+        pose_box = landmarks_box([last_pose_landmarks]) if last_pose_landmarks is not None else None
+
+        # [NEW] Smooth all landmarks in place (one NumPy update per stream)
+        # so mudras, EAR, breathing, posture and head yaw stop flapping on jitter
+        if motion_gate.should_run("hands", hands_box, now_ts):
+            hand_res = hands.process(rgb)
+            landmark_smoother.smooth_hands(hand_res, now_ts)
+        if motion_gate.should_run("face", face_box, now_ts):
+            face_res = face_mesh.process(rgb)
+            landmark_smoother.smooth_face(face_res, now_ts)
+
         frame_count += 1
         if frame_count % pose_every_n == 0:
-            pose_res = pose.process(rgb)
-            last_pose_landmarks = pose_res.pose_landmarks if pose_res else None
+            pose_still = not motion_gate.should_run("pose", pose_box, now_ts)
+            if pose_still:
+                # Still body: keep the last pose as-is (no extrapolation needed)
+                pose_res = None
+            else:
+                pose_res = pose.process(rgb)
+                last_pose_landmarks = landmark_smoother.smooth_pose(pose_res, now_ts)
         else:
             pose_res = None
+            # Skipped frame: extrapolate instead of showing a frozen pose
+            if not pose_still:
+                last_pose_landmarks = landmark_smoother.predict("pose", now_ts)
 
         center_x = w // 2
         top_y = int(h * 0.25)
@@ -3633,7 +2867,8 @@ def main():
         # Update Heart Rate
         hr_monitor.update()
         current_avg_energy = sum(chakra_energies) / len(chakra_energies)
-        draw_heart_rate_panel(frame, hr_monitor, meditation_tracker.stage, posture_score, current_avg_energy, gaze_label)
+        with lod.measure("graphs"):
+            draw_heart_rate_panel(frame, hr_monitor, meditation_tracker.stage, posture_score, current_avg_energy, gaze_label)
 
         # Fallback Mood Logic (If Face not detected)
         if mood_label == "Scanning..." or mood_label == "No face":
@@ -3653,142 +2888,34 @@ def main():
             # Debug info - Moved to Bottom Left to avoid overlap
             cv2.putText(frame, f"Hands: {len(hand_res.multi_hand_landmarks)}", (10, h - 100), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
             
-            # Check for Namaste (Anjali) first
-            if detect_namaste(hand_res):
-                detected_mudra_name = "Anjali Mudra"
-                detected_mudra = 4 
-            else:
-                for hand_landmarks in hand_res.multi_hand_landmarks:
-                    finger_states = get_finger_states(hand_landmarks, w, h)
-                    
-                    # Check specific mudras
-                    if detect_gyan_mudra(hand_landmarks, frame, w, h):
-                        detected_mudra_name = "Gyan Mudra"
-                        detected_mudra = 6 
-                    elif detect_prana_mudra(hand_landmarks):
-                        detected_mudra_name = "Prana Mudra"
-                        detected_mudra = 0 
-                    elif detect_apana_mudra(hand_landmarks):
-                        detected_mudra_name = "Apana Mudra"
-                        detected_mudra = 1 
-                    elif detect_surya_mudra(hand_landmarks):
-                        detected_mudra_name = "Surya Mudra"
-                        detected_mudra = 2 
-                    elif detect_varun_mudra(hand_landmarks):
-                        detected_mudra_name = "Varun Mudra"
-                        detected_mudra = 1 
-                    
-                    if detected_mudra_name:
-                        break 
+            # Namaste (Anjali) first, then single-hand mudras
+            detected_mudra_name, detected_mudra = detect_mudra(hand_res.multi_hand_landmarks, frame, w, h)
 
             # Record analytics
             if detected_mudra_name:
-                 analytics.record_mudra(detected_mudra_name)
                  if detected_mudra_name == "Gyan Mudra":
                      total_gyan_count += 1 
                      gyan_active = True
+        analytics.record_mudra(detected_mudra_name, now_ts) # [NEW] Every frame, so holds are timed
 
         # [NEW] Gaze Detection for Distraction
         gaze_distracted = False
         if face_res and face_res.multi_face_landmarks:
-            fl = face_res.multi_face_landmarks[0]
-            # Nose Tip: 1, Left Eye Outer: 33, Right Eye Outer: 263
-            nose_x = fl.landmark[1].x
-            left_eye_x = fl.landmark[33].x
-            right_eye_x = fl.landmark[263].x
-            
-            eye_mid_x = (left_eye_x + right_eye_x) / 2
-            gaze_diff = nose_x - eye_mid_x
-            
-            # Threshold for looking left/right (Distracted)
-            if abs(gaze_diff) > 0.04: 
+            if detect_gaze_distraction(face_res.multi_face_landmarks[0]):
                 gaze_distracted = True
                 gaze_label = "Distracted"
 
-        # [FIX] STRICT ENERGY LIMITS
-        # [FIX] STRICT ENERGY LIMITS (User Request)
-        # 1. Default / Bad Posture -> 10%
-        energy_limit = 0.10 
-        
-        # 2. Good Posture -> 30%
-        if posture_score > 0.60: 
-            energy_limit = 0.30
-            
-        # 3. Mudra -> 60%
-        if detected_mudra_name:
-            energy_limit = 0.60
-            
-        # 4. Eyes Closed -> 100%
-        if is_eyes_closed:
-            energy_limit = 1.0 
-            if 'eyes_closed_start' in locals():
-                duration_closed = time.time() - eyes_closed_start
-                if duration_closed > 30.0:
-                    energy_limit = 1.0 
-        
-        # [FIX] Distraction Penalty (Overrides everything)
-        # "eedhar udhar dekhne pe... energy ghate gii"
-        if gaze_distracted:
-            energy_limit = 0.10 # Cap at 10% if looking away
-
-        # [FIX] Sticky Energy Limit (1.5s grace period)
-        # Prevents energy limit dropping instantly if detection flickers
-        if detected_mudra_name or (time.time() - last_activation_time < 1.5):
-             if energy_limit < 0.60 and not gaze_distracted: # Don't hold if distracted
-                 energy_limit = 0.60
+        # [FIX] STRICT ENERGY LIMITS (User Request) - rules shared with PracticeState
+        energy_limit = compute_energy_limit(posture_score, detected_mudra_name is not None, is_eyes_closed,
+                                            gaze_distracted, time.time() - last_activation_time < 1.5)
 
+        analytics.record_chakra(detected_mudra if not gaze_distracted else None, now_ts)
         if detected_mudra is not None and not gaze_distracted:
-            analytics.record_chakra(detected_mudra)
             active_chakra_idx = detected_mudra
             last_activation_time = time.time()
-            for i in range(len(chakra_energies)):
-                if i == detected_mudra:
-                    # Active Mudra Boost - INSTANT
-                    base_increase = 0.20 
-                    if is_eyes_closed or med_level > 40:
-                        base_increase = 0.25 
-                    
-                    # Apply Limit
-                    chakra_energies[i] = min(energy_limit, chakra_energies[i] + base_increase) 
-                else:
-                    # Holistic Boost
-                    target_other = energy_limit * 0.85 
-                    if chakra_energies[i] < target_other:
-                        chakra_energies[i] += 0.05 
-                    else:
-                        # Normal decay handled by Global Enforcer
-                        pass
-                        
-        # [FIX] Relaxed Condition: Eyes Closed OR Good Posture
-        elif pose_landmarks and (posture_score > 0.5 or is_eyes_closed) and not gaze_distracted:
-            # Passive Body Boost
-            for i in range(len(chakra_energies)):
-                if chakra_energies[i] < energy_limit:
-                    chakra_energies[i] = min(energy_limit, chakra_energies[i] + 0.03) 
-                else:
-                    pass 
 
-        elif pose_landmarks and not gaze_distracted:
-            # [FIX] Just Sitting (Body Detected) -> Rise to 30%
-            target_sitting = 0.30
-            for i in range(len(chakra_energies)):
-                if chakra_energies[i] < target_sitting:
-                    chakra_energies[i] += 0.01 
-                else:
-                    pass
-
-        else:
-            # No Body Detected -> Decay
-            pass 
-            
-        # [FIX] GLOBAL RAPID DECAY ENFORCER
-        # "energy tezi se girni chahiye"
-        # If current energy > limit, drop FAST (-0.05)
-        for i in range(len(chakra_energies)):
-            if chakra_energies[i] > energy_limit:
-                chakra_energies[i] = max(energy_limit, chakra_energies[i] - 0.05) # Rapid Drop
-            elif chakra_energies[i] < 0:
-                chakra_energies[i] = 0.0 
+        apply_energy_rules(chakra_energies, energy_limit, detected_mudra, pose_landmarks is not None,
+                           posture_score, is_eyes_closed, med_level, gaze_distracted)
 
         # Draw Sidebar
         draw_mudra_sidebar(frame, detected_mudra_name)
@@ -3803,28 +2930,8 @@ def main():
         # Removed conflicting assignment: yoga_mode_active = is_yoga_active 
 
         # [NEW] XP & Leveling System (20 Levels)
-        xp_gain = 0.0
-        warning_msg = ""
-        
-        if posture_score > 0.4:
-            xp_gain += 1.0 # Base XP for Posture
-            if detected_mudra_name:
-                xp_gain += 1.0 # Bonus for Mudra
-            if is_eyes_closed:
-                xp_gain += 2.0 # Bonus for Eyes Closed
-        
-        # [NEW] Level Gating Logic
-        # Levels 4-10: Mudra Mandatory
-        if current_level >= 3 and current_level < 10:
-             if not detected_mudra_name:
-                 xp_gain = 0.0
-                 warning_msg = "MUDRA REQUIRED TO PROGRESS!"
-        
-        # Levels 11-20: Eyes Closed Mandatory
-        if current_level >= 10:
-             if not is_eyes_closed:
-                 xp_gain = 0.0
-                 warning_msg = "CLOSE EYES TO PROGRESS!"
+        xp_gain, warning_msg = compute_xp_gain(posture_score, detected_mudra_name is not None,
+                                               is_eyes_closed, current_level)
 
         # Apply XP
         if current_level < MAX_LEVEL:
@@ -3838,6 +2945,12 @@ def main():
             if calculated_level > current_level:
                 current_level = calculated_level
                 speak_threaded(f"Level {current_level} Reached!")
+
+        # [NEW] Per-frame telemetry (columnar; Parquet is written by a background thread)
+        if telemetry is not None:
+            hr_val, spo2_val, _, _, _ = hr_monitor.get_data()
+            telemetry.record(now, chakra_energies, detected_mudra_name, posture_score, eye_open, gaze_label,
+                             hr_val, spo2_val, physio_engine.last_hrv_ms, med_stage, total_xp, current_level)
                 
         # Draw Level Progress UI (Top Center) - PREMIUM VERSION
         # Bar Dimensions - Adjusted to fit between Left Panel and Right Sidebar
@@ -3857,15 +2970,12 @@ def main():
         level_text = f"LEVEL {current_level}"
         
         # Dynamic Centering for Text
-        (lw, lh), _ = cv2.getTextSize(level_text, cv2.FONT_HERSHEY_SIMPLEX, 1.2, 6)
+        (lw, lh), _ = text_cache.measure(level_text, 1.2, 6)
         text_x = bar_center_x - lw // 2
         
-        # Black shadow for depth
-        cv2.putText(frame, level_text, (text_x, bar_y - 15), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 6)
-        # Gold glow
-        cv2.putText(frame, level_text, (text_x, bar_y - 15), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 215, 255), 4)
-        # White core
-        cv2.putText(frame, level_text, (text_x, bar_y - 15), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+        # Black shadow for depth, Gold glow, White core (one cached sprite)
+        text_cache.put_stroked(frame, level_text, (text_x, bar_y - 15), 1.2,
+                               (((0, 0, 0), 6), ((0, 215, 255), 4), ((255, 255, 255), 2)), line_type=cv2.LINE_8)
         
         # Draw Warning Message if Gated
         if warning_msg:
@@ -3875,10 +2985,10 @@ def main():
              alpha = 0.6 + 0.4 * pulse
              
              # 2. Create Overlay for Transparency
-             overlay_warn = frame.copy()
+             overlay_warn = frame_pool.scratch_copy(frame)
              
              # Calculate text size
-             (tw, th), _ = cv2.getTextSize(warning_msg, cv2.FONT_HERSHEY_SIMPLEX, 0.55, 2) # [FIX] Font 0.55
+             (tw, th), _ = text_cache.measure(warning_msg, 0.55, 2) # [FIX] Font 0.55
              # Center relative to the BAR
              tx = bar_center_x - tw // 2
              ty = bar_y + 35 # Adjusted for slightly larger font
@@ -3888,25 +2998,18 @@ def main():
              cv2.rectangle(overlay_warn, (tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (0, 0, 0), -1)
              cv2.rectangle(overlay_warn, (tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (0, 0, 255), 1)
              
-             # Text (High Visibility: Triple Stroke)
-             # 1. Black Outer Shadow (Contrast)
-             cv2.putText(overlay_warn, warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 0), 6)
-             # 2. White Outline (Brightness)
-             cv2.putText(overlay_warn, warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 3) 
-             # 3. Red Core (Color)
-             cv2.putText(overlay_warn, warning_msg, (tx, ty), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 0, 255), 2)
+             # Text (High Visibility: Triple Stroke) - Black Shadow, White Outline, Red Core
+             text_cache.put_stroked(overlay_warn, warning_msg, (tx, ty), 0.55,
+                                    (((0, 0, 0), 6), ((255, 255, 255), 3), ((0, 0, 255), 2)), line_type=cv2.LINE_8)
              
              # 3. Apply Fade Animation
              cv2.addWeighted(overlay_warn, alpha, frame, 1 - alpha, 0, frame)
         
         # Draw Progress Bar with PREMIUM styling
-        # Outer glow
-        for i in range(5):
-            alpha = 0.15 - (i * 0.03)
-            offset = 5 - i
-            overlay_glow = frame.copy()
-            cv2.rectangle(overlay_glow, (bar_x - offset, bar_y - offset), (bar_x + bar_w + offset, bar_y + bar_h + offset), (0, 255, 255), -1)
-            cv2.addWeighted(overlay_glow, alpha, frame, 1 - alpha, 0, frame)
+        # Outer glow ([NEW] blurred mask, was 5 full-frame blends)
+        glow_ds = lod.pick("glow", GLOW_LOD_DOWNSCALE)
+        if glow_ds:
+            glow_rect(frame, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (0, 255, 255), sigma=3.5, intensity=0.4, downscale=glow_ds)
         
         # Dark background with border
         cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (20, 20, 25), -1)
@@ -3930,15 +3033,14 @@ def main():
                 color_val = int(150 + (105 * ratio))
                 cv2.line(frame, (bar_x + i, bar_y), (bar_x + i, bar_y + bar_h), (0, color_val, 255), 1)
             
-            # Inner glow on progress
-            overlay_prog = frame.copy()
-            cv2.rectangle(overlay_prog, (bar_x, bar_y), (bar_x + fill_w, bar_y + bar_h), (100, 255, 255), -1)
-            cv2.addWeighted(overlay_prog, 0.3, frame, 0.7, 0, frame)
+            # Inner glow on progress (blend inside the filled part only)
+            prog = frame[bar_y:bar_y + bar_h + 1, bar_x:bar_x + fill_w + 1]
+            cv2.addWeighted(prog, 0.7, np.full_like(prog, (100, 255, 255)), 0.3, 0, prog)
         else:
             # Max Level - Full Gold Bar with premium glow
             cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_w, bar_y + bar_h), (0, 215, 255), -1)
-            (mw, mh), _ = cv2.getTextSize("MAX LEVEL", cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
-            cv2.putText(frame, "MAX LEVEL", (bar_center_x - mw // 2, bar_y + bar_h + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 215, 255), 2)
+            (mw, mh), _ = text_cache.measure("MAX LEVEL", 0.7, 2)
+            text_cache.put_text(frame, "MAX LEVEL", (bar_center_x - mw // 2, bar_y + bar_h + 25), 0.7, (0, 215, 255), 2, line_type=cv2.LINE_8)
 
         # Keep Old Visual Rewards (Neck Medals) based on Milestones
         # Bronze: Lvl 1-5, Silver: Lvl 6-10, Gold: Lvl 11-15, Trophy: Lvl 16-20
@@ -4043,7 +3145,7 @@ def main():
             else:
                 aura_color = (0, 215, 255) # Gold (High Energy)
 
-        overlay_bg = frame.copy()
+        overlay_bg = frame_pool.scratch_copy(frame)
         cv2.circle(overlay_bg, (center_x, center_y_aura), aura_radius, aura_color, -1)
         cv2.addWeighted(overlay_bg, 0.15, frame, 0.85, 0, frame)
         
@@ -4073,7 +3175,8 @@ def main():
                         chakra_energies, aura_color, breath_factor, anim_time)
             
         # Draw Chakra Meter (ALWAYS VISIBLE)
-        draw_chakra_meter(frame, chakra_energies)
+        with lod.measure("glow"): # Meter cost is dominated by its glow
+            draw_chakra_meter(frame, chakra_energies)
 
         # [MOVED] Meditation Tracker update moved to top of loop
         pass
@@ -4160,12 +3263,14 @@ def main():
         # [NEW] Elemental Mastery Effects
         # Pass hand landmarks list and face landmarks (first face)
         face_lm_single = face_res.multi_face_landmarks[0] if face_res.multi_face_landmarks else None
-        elemental_effects.update_and_draw(frame, detected_mudra_name, hand_res.multi_hand_landmarks, face_lm_single)
+        with lod.measure("elemental"):
+            elemental_effects.update_and_draw(frame, detected_mudra_name, hand_res.multi_hand_landmarks, face_lm_single)
 
         # [NEW] Divine OM Effect
         # Only if Energy > 90%
         if avg_energy > 0.9:
-             draw_om_effect(frame, avg_energy)
+             with lod.measure("om"):
+                 draw_om_effect(frame, avg_energy)
 
         # Namaste Detection for Screenshot (Replaces Mode Toggle)
         # [FIX] Robust Detection with Grace Period & Visual Feedback
@@ -4202,16 +3307,12 @@ def main():
                     filename = generate_aura_photo(frame, aura_color, hr_monitor.heart_rate, avg_energy)
                     
                     namaste_triggered = True
-                    print(f"[INFO] 🙏 Namaste Screenshot Captured! Saved to: {filename}")
-                    
-                    # Visual Flash Effect
-                    flash = frame.copy()
-                    cv2.rectangle(flash, (0, 0), (w, h), (255, 255, 255), -1)
-                    cv2.addWeighted(flash, 0.5, frame, 0.5, 0, frame)
-                    cv2.putText(frame, "NAMASTE - SCREENSHOT SAVED!", (center_x - 250, center_y_aura), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 3)
-                    cv2.imshow("AI ChakraFlow — Full Experience", frame)
-                    cv2.waitKey(300) # Brief flash
+                    # Visual Flash Effect ([NEW] drawn over the next frames, no waitKey stall)
+                    if filename:
+                        print(f"[INFO] 🙏 Namaste Screenshot Captured! Saving to: {filename}")
+                        flash_msg.show("NAMASTE - SCREENSHOT SAVED!", (center_x - 250, center_y_aura), 1.0)
+                    else: # [FIX] Queue full: nothing was captured
+                        flash_msg.show("SKIPPED - STILL SAVING", (center_x - 220, center_y_aura), 1.0)
         else:
             # Grace Period Logic
             if namaste_grace_frames > 0:
@@ -4261,8 +3362,7 @@ def main():
                 # Reset
                 screenshot_countdown_start = 0
                 screenshot_timer = 0
-                cv2.putText(frame, "Captured!", (w//2 - 100, h//2), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 255, 0), 3)
-                cv2.waitKey(500) # Brief pause to show "Captured!"
+                flash_msg.show("Captured!", (w//2 - 100, h//2), 2, duration=0.5, flash=False)
 
         # COACH TEXT & STATUS PANEL
         # Refactored to use draw_status_panel for non-overlapping text in the center
@@ -4316,7 +3416,7 @@ def main():
         ty = 15 # [FIX] Moved to very top (was 30) to avoid overlap
         
         # Background with Border
-        overlay = frame.copy()
+        overlay = frame_pool.scratch_copy(frame)
         pad = 8 # Slightly reduced padding
         cv2.rectangle(overlay, (tx - pad, ty - th - pad), (tx + tw + pad, ty + pad), (10, 10, 10), -1) 
         cv2.addWeighted(overlay, 0.8, frame, 0.2, 0, frame)
@@ -4329,12 +3429,30 @@ def main():
 
         # [NEW] Indian Flag (Top Left Corner - No Overlap)
         # Chakra Meter moved down to y=130 to accommodate this
-        draw_indian_flag(frame, 20, 15, 40, anim_time)
+        with lod.measure("flag"):
+            draw_indian_flag_cached(frame, 20, 15, 40, anim_time if lod.pick("flag", (True, False)) else 0.0)
 
         # [NEW] Check Hover for Speaking Graphs
         check_hover_and_speak(w, h)
 
+        # [NEW] Record the composited frame (before the debug HUD); encoding runs in the background
+        if recorder is not None:
+            recorder.write(frame, capture_ts)
+            cv2.circle(frame, (w - 30, 30), 8, (0, 0, 255), -1)
+            text_cache.put_text(frame, "REC", (w - 75, 36), 0.5, (0, 0, 255), 1)
+
+        # [NEW] Capture health (bottom left, next to hand debug)
+        cam_stats = cap.stats()
+        cv2.putText(frame, f"Cam: {cam_stats['latency_ms']:.0f} ms | Dropped: {cam_stats['dropped']}", (10, h - 80), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
+        gate_txt = "ON" if motion_gate.enabled else "OFF"
+        cv2.putText(frame, f"Gate [{gate_txt}] skipped: H {motion_gate.skip_rate('hands'):.0%} F {motion_gate.skip_rate('face'):.0%} P {motion_gate.skip_rate('pose'):.0%}",
+                    (10, h - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
+        if show_lod_overlay:
+            lod.draw_overlay(frame, 20, 130)
+        flash_msg.draw(frame)
+
         cv2.imshow("AI ChakraFlow — Full Experience", frame)
+        cap.mark_displayed(capture_ts)
 
         # Voice trigger disabled to avoid lag; set ENABLE_VOICE=True to re-enable.
         if False:
@@ -4366,33 +3484,152 @@ def main():
         elif key == ord('r'):
             print("[INFO] Manual Reconnect Requested...")
             hr_monitor.connect()
+        elif key == ord('g'):
+            # [NEW] Toggle motion gate (A/B the CPU saving)
+            motion_gate.enabled = not motion_gate.enabled
+            print(f"[INFO] Motion gate {'enabled' if motion_gate.enabled else 'disabled'}")
+        elif key == ord('v'):
+            # [NEW] Start / stop recording the session video
+            if recorder is None:
+                recorder = start_session_recording()
+            else:
+                recorder.stop()
+                recorder = None
+        elif key == ord('l'):
+            # [NEW] Toggle the LOD debug overlay
+            show_lod_overlay = not show_lod_overlay
         elif key == ord('s'):
             # [NEW] Manual Screenshot with 'S' key
             avg_energy = sum(chakra_energies) / len(chakra_energies)
             filename = generate_aura_photo(frame, aura_color, hr_monitor.heart_rate, avg_energy)
-            print(f"[INFO] 📸 Manual Screenshot Captured! Saved to: {filename}")
-            # Visual Flash Effect
-            flash = frame.copy()
-            cv2.rectangle(flash, (0, 0), (w, h), (255, 255, 255), -1)
-            cv2.addWeighted(flash, 0.5, frame, 0.5, 0, frame)
-            cv2.putText(frame, "SCREENSHOT SAVED!", (center_x - 180, center_y_aura), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
-            cv2.imshow("AI ChakraFlow — Full Experience", frame)
-            cv2.waitKey(300)  # Brief flash
+            # Visual Flash Effect ([NEW] drawn over the next frames, no waitKey stall)
+            if filename:
+                print(f"[INFO] 📸 Manual Screenshot Captured! Saving to: {filename}")
+                flash_msg.show("SCREENSHOT SAVED!", (center_x - 180, center_y_aura), 1.2)
+            else: # [FIX] Queue full: nothing was captured
+                flash_msg.show("SKIPPED - STILL SAVING", (center_x - 220, center_y_aura), 1.2)
 
     cap.release()
+    if recorder is not None:
+        recorder.stop()
+    if telemetry is not None:
+        telemetry.stop()
+    snapshots.flush() # Let queued photos reach the disk
     cv2.destroyAllWindows()
     pygame.mixer.quit()
 
     show_final_report(session_start, chakra_energies, total_gyan_count, alignment_count)
     summary = analytics.summary()
     print("\n--- Analytics ---")
-    print("Mudra counts:", summary["mudras"])
+    print("Mudra holds:", summary["mudras"])
     print("Avg posture score:", f"{summary['avg_posture']:.2f}")
     print("Posture alerts (score<0.5):", summary["posture_alerts"])
     print("Time per chakra (s):", [round(t, 1) for t in summary["chakra_time"]])
+    print("Mudra hold time (s):", {m: round(t, 1) for m, t in summary["mudra_time"].items()})
+    print("Posture p10/p50/p90:", " / ".join(f"{v:.2f}" for v in summary["posture_quantiles"].values()))
+    save_session_history(session_start, summary, total_xp, current_level,
+                         telemetry.path if telemetry is not None else None)
+    cam_stats = cap.stats()
+    print(f"Camera: {cam_stats['captured']} frames, {cam_stats['dropped']} dropped, "
+          f"capture-to-display {cam_stats['latency_ms']:.0f} ms (p95 {cam_stats['latency_p95_ms']:.0f} ms)")
+    for name, g in motion_gate.stats().items():
+        print(f"Motion gate [{name}]: {g['runs']} runs, {g['skips']} skipped ({g['skip_rate']:.0%})")
+    for name, labels in lod.effects.items():
+        print(f"LOD [{name}]: {labels[lod.level(name)]}, {lod.cost_ms.get(name, 0.0):.1f} ms")
+    print("[INFO] Exited cleanly.")
+
+
+# ============================================================
+#   CLASS MODE (python main2.py --class)
+# ============================================================
+
+def draw_person_card(frame, track):
+    """Box + compact chakra bars for one practitioner."""
+    x0, y0, x1, y1 = track.box
+    snap = track.snapshot
+    energies = snap.get("chakra_energies", [0.0] * 7)
+    active = snap.get("active_chakra")
+    color = CHAKRA_COLORS[active] if active is not None else (200, 200, 200)
+    cv2.rectangle(frame, (x0, y0), (x1, y1), color, 2)
+
+    # Hand / face landmarks back in frame pixels
+    for hl in track.hands:
+        for p in hl.landmark[::4]:
+            cv2.circle(frame, to_frame_px(frame, p.x, p.y), 2, (0, 255, 255), -1)
+    if track.face is not None:
+        cv2.circle(frame, to_frame_px(frame, track.face.landmark[1].x, track.face.landmark[1].y), 3, (255, 255, 0), -1)
+
+    # Chakra bars along the left edge of the box (root at the bottom)
+    bar_h = max(4, (y1 - y0) // 14)
+    for i, e in enumerate(energies):
+        by = y1 - (i + 1) * (bar_h + 2)
+        cv2.rectangle(frame, (x0 + 4, by), (x0 + 4 + int(40 * e), by + bar_h), CHAKRA_COLORS[i], -1)
+
+    label = f"#{track.id} Lv{snap.get('level', 1)} {int(snap.get('avg_energy', 0) * 100)}%"
+    draw_text_with_bg(frame, label, x0 + 4, max(15, y0 - 8), font_scale=0.5, color=(255, 255, 255))
+    if snap.get("mudra"):
+        draw_text_with_bg(frame, snap["mudra"], x0 + 4, y0 + 18, font_scale=0.45, color=color)
+    if snap.get("warning"):
+        draw_text_with_bg(frame, snap["warning"], x0 + 4, y1 - 7 * (bar_h + 2) - 10, font_scale=0.4, color=(0, 0, 255))
+
+
+def run_class_mode():
+    """Multi-person session: one camera, one tracker state per practitioner."""
+    cap = LatestFrameCapture(CAM_INDEX, FRAME_WIDTH, FRAME_HEIGHT)
+    if not cap.isOpened():
+        print("[ERROR] Could not open camera.")
+        return
+    cap.start()
+
+    session = ClassSession()
+    window = "AI ChakraFlow — Class Mode"
+    cv2.namedWindow(window, cv2.WINDOW_NORMAL)
+    cv2.resizeWindow(window, FRAME_WIDTH, FRAME_HEIGHT)
+    seen = {}
+    fps_t = time.time()
+    fps = 0.0
+
+    while True:
+        ret, raw_frame, capture_ts = cap.read()
+        if not ret:
+            print("[WARN] Frame not received.")
+            break
+        frame = frame_pool.flip(raw_frame, 1, name="frame")
+        rgb = frame_pool.cvt_color(frame, cv2.COLOR_BGR2RGB, name="rgb")
+        h, w, _ = frame.shape
+
+        people = session.process(rgb)
+        for track in people:
+            seen[track.id] = track
+            draw_person_card(frame, track)
+
+        now = time.time()
+        fps = 0.9 * fps + 0.1 / max(1e-3, now - fps_t)
+        fps_t = now
+        draw_text_with_bg(frame, f"Class Mode: {len(people)} people | {fps:.1f} FPS", 10, 25, color=(0, 255, 255))
+        cam = cap.stats()
+        cv2.putText(frame, f"Cam: {cam['latency_ms']:.0f} ms | Dropped: {cam['dropped']}", (10, h - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
+
+        cv2.imshow(window, frame)
+        cap.mark_displayed(capture_ts)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            break
+
+    session.close()
+    cap.release()
+    cv2.destroyAllWindows()
+
+    print("\n--- Class Analytics ---")
+    for tid, track in sorted(seen.items()):
+        summary = track.state.analytics.summary()
+        print(f"Person #{tid}: level {track.state.level}, avg posture {summary['avg_posture']:.2f}, "
+              f"posture alerts {summary['posture_alerts']}, gyan frames {track.state.total_gyan_count}")
     print("[INFO] Exited cleanly.")
 
 
 if __name__ == "__main__":
-    main()
+    if "--class" in sys.argv:
+        run_class_mode()
+    else:
+        main()
@@ -0,0 +1,145 @@
+import time
+import cv2
+import numpy as np
+
+# ============================================================
+#   MOTION GATE
+#   A tiny grayscale thumbnail of every frame is compared with the
+#   thumbnail from the last time each model ran. If nothing moved
+#   inside that model's region (face / hands / torso), its previous
+#   result is reused — up to a maximum staleness.
+# ============================================================
+
+GATE_SIZE = (96, 54)       # Thumbnail (w, h); ~5 KB, costs well under 1 ms
+PIXEL_DIFF_THRESH = 18     # Gray levels a thumbnail pixel must change by
+MOTION_FRACTION = 0.02     # Share of changed pixels in a region that counts as motion
+MAX_STALE_SECS = 1.0       # Always re-run a model at least this often
+REGION_PAD = 0.08          # Normalized padding around landmark boxes
+
+
+def landmarks_box(landmark_lists, pad=REGION_PAD):
+    """Union bounding box (normalized x0, y0, x1, y1) of landmark lists, or None."""
+    xs, ys = [], []
+    for lms in landmark_lists:
+        if lms is None:
+            continue
+        for p in lms.landmark:
+            xs.append(p.x)
+            ys.append(p.y)
+    if not xs:
+        return None
+    return (max(0.0, min(xs) - pad), max(0.0, min(ys) - pad),
+            min(1.0, max(xs) + pad), min(1.0, max(ys) + pad))
+
+
+class MotionGate:
+    """
+    Decides per region whether a model's last result is still valid.
+
+        gate.update(frame)                     # once per frame
+        if gate.should_run("hands", box, now): # box=None -> whole frame
+            hand_res = hands.process(rgb)
+
+    Motion is measured against the thumbnail from the region's last run,
+    so slow drift accumulates until it triggers a re-run.
+    """
+    def __init__(self, size=GATE_SIZE, pixel_thresh=PIXEL_DIFF_THRESH,
+                 motion_fraction=MOTION_FRACTION, max_stale_secs=MAX_STALE_SECS):
+        self.size = size
+        self.pixel_thresh = pixel_thresh
+        self.motion_fraction = motion_fraction
+        self.max_stale_secs = max_stale_secs
+        self.enabled = True
+
+        w, h = size
+        self.small_bgr = np.empty((h, w, 3), dtype=np.uint8)
+        self.gray = np.empty((h, w), dtype=np.uint8)
+        self.diff = np.empty((h, w), dtype=np.uint8)
+        self.regions = {}
+
+    def update(self, frame):
+        cv2.resize(frame, self.size, dst=self.small_bgr, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.small_bgr, cv2.COLOR_BGR2GRAY, dst=self.gray)
+
+    def _region(self, name):
+        reg = self.regions.get(name)
+        if reg is None:
+            reg = {"ref": None, "last_run": 0.0, "runs": 0, "skips": 0, "motion": 0.0}
+            self.regions[name] = reg
+        return reg
+
+    def motion_in(self, ref, box):
+        w, h = self.size
+        if box is None:
+            x0, y0, x1, y1 = 0, 0, w, h
+        else:
+            x0, y0 = int(box[0] * w), int(box[1] * h)
+            x1, y1 = max(x0 + 1, int(np.ceil(box[2] * w))), max(y0 + 1, int(np.ceil(box[3] * h)))
+        cv2.absdiff(self.gray, ref, dst=self.diff)
+        roi = self.diff[y0:y1, x0:x1]
+        if roi.size == 0:
+            return 1.0
+        return float(np.count_nonzero(roi > self.pixel_thresh)) / roi.size
+
+    def should_run(self, name, box=None, now=None):
+        """True if the model for `name` must run this frame (and records the run)."""
+        now = time.time() if now is None else now
+        reg = self._region(name)
+
+        run = (not self.enabled or reg["ref"] is None
+               or now - reg["last_run"] > self.max_stale_secs)
+        if not run:
+            reg["motion"] = self.motion_in(reg["ref"], box)
+            run = reg["motion"] > self.motion_fraction
+
+        if run:
+            if reg["ref"] is None:
+                reg["ref"] = self.gray.copy()
+            else:
+                np.copyto(reg["ref"], self.gray)
+            reg["last_run"] = now
+            reg["runs"] += 1
+        else:
+            reg["skips"] += 1
+        return run
+
+    def skip_rate(self, name):
+        reg = self.regions.get(name)
+        if not reg:
+            return 0.0
+        total = reg["runs"] + reg["skips"]
+        return reg["skips"] / total if total else 0.0
+
+    def stats(self):
+        return {
+            name: {"runs": reg["runs"], "skips": reg["skips"], "skip_rate": self.skip_rate(name),
+                   "motion": reg["motion"]}
+            for name, reg in self.regions.items()
+        }
+
+    def reset(self):
+        self.regions.clear()
+
+
+if __name__ == "__main__":
+    # Self-check: a static scene is skipped, motion inside a region re-runs it,
+    # motion elsewhere does not, and staleness forces a run.
+    gate = MotionGate()
+    frame = np.full((630, 1120, 3), 90, dtype=np.uint8)
+    face = (0.4, 0.1, 0.6, 0.4)
+    t = 0.0
+    gate.update(frame)
+    assert gate.should_run("face", face, t)          # First frame always runs
+    for _ in range(20):
+        t += 1 / 30
+        gate.update(frame)
+        assert not gate.should_run("face", face, t)  # Static -> reuse
+    cv2.rectangle(frame, (0, 500), (200, 630), (255, 255, 255), -1)
+    gate.update(frame)
+    assert not gate.should_run("face", face, t)      # Motion outside the face box
+    cv2.circle(frame, (560, 150), 60, (255, 255, 255), -1)
+    gate.update(frame)
+    assert gate.should_run("face", face, t)          # Motion inside the face box
+    t += MAX_STALE_SECS + 0.1
+    assert gate.should_run("face", face, t)          # Staleness bound
+    print("[INFO] Motion gate self-check OK:", gate.stats())
@@ -0,0 +1,50 @@
+import hmac
+import os
+import time
+import streamlit as st
+from admission import admission
+from session_registry import reaper, rss_mb, session_rows, BASELINE_RSS_MB
+
+# ============================================================
+#   YOGA AI - ADMIN
+#   Live video sessions of this server process and what each
+#   one costs. Streamlit lists this page for every visitor, so
+#   it stays locked unless YOGA_ADMIN_TOKEN is set and entered.
+# ============================================================
+
+st.set_page_config(page_title="Yoga AI Admin", page_icon="🛠️", layout="wide")
+
+st.title("🛠️ Live Sessions")
+
+admin_token = os.environ.get("YOGA_ADMIN_TOKEN")
+if not admin_token:
+    st.error("The admin page is disabled. Set YOGA_ADMIN_TOKEN on the server to enable it.")
+    st.stop()
+if not hmac.compare_digest(st.text_input("Admin token", type="password").encode(), admin_token.encode()):
+    st.stop()
+
+auto_refresh = st.checkbox("Auto refresh", value=True)
+summary_box = st.empty()
+table_box = st.empty()
+st.caption(f"RSS is the process growth above its {BASELINE_RSS_MB:.0f} MB baseline, split evenly "
+           "between the sessions holding graphs. CPU is % of one core over the last sweep. "
+           f"Graphs of sessions idle for {reaper.idle_timeout_s:.0f} s are released.")
+
+while True:
+    rows = session_rows()
+    a = admission.stats()
+    with summary_box.container():
+        c1, c2, c3, c4, c5 = st.columns(5)
+        c1.metric("Sessions", len(rows), help=f"{a['admitted']}/{a['max_sessions']} admitted pages")
+        c2.metric("Holding Graphs", sum(r["graphs"] == "loaded" for r in rows),
+                  help=f"{reaper.reaped} idle sessions reaped")
+        c3.metric("Process RSS", f"{rss_mb():.0f} MB")
+        c4.metric("Server Load", f"{a['load']:.2f}")
+        c5.metric("Waiting", a["queued"], help=f"{a['refused']} refused")
+    if rows:
+        table_box.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        table_box.info("No live sessions.")
+    if not auto_refresh:
+        break
+    time.sleep(2.0)
@@ -0,0 +1,1125 @@
+import math
+import time
+import cv2
+import numpy as np
+
+# ============================================================
+#   PRACTICE STATE — headless per-practitioner logic
+#   Mudra detection, face/breath/posture analysis, meditation
+#   stages, chakra energy rules and XP. No drawing, no audio,
+#   no camera: shared by the live app, class mode and servers.
+# ============================================================
+
+# Thresholds
+EYE_CLOSED_THRESHOLD = 0.30 # EAR Ratio (Increased to 0.30 for very robust detection)
+EYE_CLOSED_FRAMES_REQUIRED = 15 # ~0.5-1 sec.5s
+
+# XP System (20 Levels)
+XP_PER_LEVEL = 150 # Approx 5 seconds per level at base rate (30fps)
+MAX_LEVEL = 20
+
+
+def get_finger_states(hand_landmarks, image_width, image_height):
+    lm = hand_landmarks.landmark
+
+    def to_pixel(idx):
+        return int(lm[idx].x * image_width), int(lm[idx].y * image_height)
+
+    tips = [4, 8, 12, 16, 20]
+    pips = [3, 6, 10, 14, 18]
+
+    states = {}
+
+    thumb_tip_x, thumb_tip_y = to_pixel(4)
+    thumb_pip_x, thumb_pip_y = to_pixel(3)
+    states["thumb"] = thumb_tip_x > thumb_pip_x
+
+    finger_names = ["index", "middle", "ring", "pinky"]
+    for name, tip_idx, pip_idx in zip(finger_names, tips[1:], pips[1:]):
+        tip_x, tip_y = to_pixel(tip_idx)
+        pip_x, pip_y = to_pixel(pip_idx)
+        states[name] = tip_y < pip_y
+
+    return states
+
+
+def detect_gyan_mudra(hand_landmarks, frame=None, width=0, height=0):
+    lm = hand_landmarks.landmark
+    thumb_tip = lm[4]
+    index_tip = lm[8]
+    wrist = lm[0]
+    mid_tip = lm[12]
+    
+    # Normalize by hand size (wrist to middle fingertip) for scale tolerance
+    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
+    d = math.sqrt((thumb_tip.x - index_tip.x) ** 2 + (thumb_tip.y - index_tip.y) ** 2) / hand_scale
+    
+    # Visual Debugging (Draw line between thumb and index)
+    if frame is not None:
+        tx, ty = int(thumb_tip.x * width), int(thumb_tip.y * height)
+        ix, iy = int(index_tip.x * width), int(index_tip.y * height)
+        
+        # Color code: Green=Active, Yellow=Close, Red=Far
+        # Debug info
+        cv2.putText(frame, f"Gyan Dist: {d:.2f}", (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        
+        if d < 0.28: # Further relaxed from 0.22
+            col = (0, 255, 0)
+            cv2.circle(frame, (ix, iy), 8, (0, 255, 0), -1) 
+        elif d < 0.35:
+            col = (0, 255, 255)
+        else:
+            col = (0, 0, 255)
+            
+        cv2.line(frame, (tx, ty), (ix, iy), col, 2)
+
+    return d < 0.28 # Further relaxed threshold
+
+def detect_prana_mudra(hand_landmarks):
+    # Ring and Pinky tips touch Thumb tip. Index and Middle straight.
+    lm = hand_landmarks.landmark
+    thumb_tip = lm[4]
+    ring_tip = lm[16]
+    pinky_tip = lm[20]
+    wrist = lm[0]
+    mid_tip = lm[12]
+    
+    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
+    
+    d_ring = math.sqrt((thumb_tip.x - ring_tip.x)**2 + (thumb_tip.y - ring_tip.y)**2) / hand_scale
+    d_pinky = math.sqrt((thumb_tip.x - pinky_tip.x)**2 + (thumb_tip.y - pinky_tip.y)**2) / hand_scale
+    
+    # Check if index and middle are extended (tip further from wrist than pip)
+    # Using simple y check might fail if hand is rotated, better to check distance from wrist
+    def dist_sq(p1, p2): return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
+    
+    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
+    middle_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
+
+    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
+    middle_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
+
+    return d_ring < 0.28 and d_pinky < 0.28 and index_ext and middle_ext
+
+def detect_apana_mudra(hand_landmarks):
+    # Middle and Ring tips touch Thumb tip. Index and Pinky straight.
+    lm = hand_landmarks.landmark
+    thumb_tip = lm[4]
+    mid_tip = lm[12]
+    ring_tip = lm[16]
+    wrist = lm[0]
+    
+    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
+    
+    d_mid = math.sqrt((thumb_tip.x - mid_tip.x)**2 + (thumb_tip.y - mid_tip.y)**2) / hand_scale
+    d_ring = math.sqrt((thumb_tip.x - ring_tip.x)**2 + (thumb_tip.y - ring_tip.y)**2) / hand_scale
+    
+    def dist_sq(p1, p2): return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
+    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
+    pinky_ext = dist_sq(lm[20], wrist) > dist_sq(lm[18], wrist)
+    
+    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
+    pinky_ext = dist_sq(lm[20], wrist) > dist_sq(lm[18], wrist)
+    
+    return d_mid < 0.28 and d_ring < 0.28 and index_ext and pinky_ext
+
+def detect_surya_mudra(hand_landmarks):
+    # Ring finger bent, thumb pressing it.
+    # This is hard to detect perfectly. Approximation: Ring tip close to thumb base (CMC or MCP), Thumb tip close to Ring PIP.
+    lm = hand_landmarks.landmark
+    thumb_tip = lm[4]
+    ring_tip = lm[16]
+    ring_pip = lm[14]
+    wrist = lm[0]
+    mid_tip = lm[12]
+    
+    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
+    
+    # Check if ring finger is folded
+    ring_folded = dist_sq(ring_tip, wrist) < dist_sq(ring_pip, wrist)
+    
+    # Check if thumb is over ring finger (distance between thumb tip and ring pip/dip)
+    d_thumb_ring = math.sqrt((thumb_tip.x - ring_pip.x)**2 + (thumb_tip.y - ring_pip.y)**2) / hand_scale
+    
+    # Check if thumb is over ring finger (distance between thumb tip and ring pip/dip)
+    d_thumb_ring = math.sqrt((thumb_tip.x - ring_pip.x)**2 + (thumb_tip.y - ring_pip.y)**2) / hand_scale
+    
+    return ring_folded and d_thumb_ring < 0.30 # Further relaxed from 0.25
+
+def detect_varun_mudra(hand_landmarks):
+    # Pinky tip touches Thumb tip. Others straight.
+    lm = hand_landmarks.landmark
+    thumb_tip = lm[4]
+    pinky_tip = lm[20]
+    wrist = lm[0]
+    mid_tip = lm[12]
+    
+    hand_scale = math.sqrt((wrist.x - mid_tip.x) ** 2 + (wrist.y - mid_tip.y) ** 2) + 1e-6
+    
+    d_pinky = math.sqrt((thumb_tip.x - pinky_tip.x)**2 + (thumb_tip.y - pinky_tip.y)**2) / hand_scale
+    
+    def dist_sq(p1, p2): return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
+    index_ext = dist_sq(lm[8], wrist) > dist_sq(lm[6], wrist)
+    mid_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
+    ring_ext = dist_sq(lm[16], wrist) > dist_sq(lm[14], wrist)
+    
+    mid_ext = dist_sq(lm[12], wrist) > dist_sq(lm[10], wrist)
+    ring_ext = dist_sq(lm[16], wrist) > dist_sq(lm[14], wrist)
+    
+    return d_pinky < 0.28 and index_ext and mid_ext and ring_ext
+
+def dist_sq(p1, p2):
+    return (p1.x-p2.x)**2 + (p1.y-p2.y)**2
+
+def detect_open_palm(finger_states):
+    return all(finger_states.values())
+
+
+def detect_fist(finger_states):
+    return not any(finger_states.values())
+
+
+def detect_peace(hand_landmarks):
+    # Index/middle extended, ring/pinky folded
+    lm = hand_landmarks.landmark
+    states = get_finger_states(hand_landmarks, 1, 1)
+    return states["index"] and states["middle"] and not states["ring"] and not states["pinky"]
+
+
+def classify_chakra_gesture(finger_states, hand_landmarks=None):
+    # Enhanced classification using specific mudra functions
+    if hand_landmarks:
+        if detect_gyan_mudra(hand_landmarks): return "Gyan Mudra"
+        if detect_prana_mudra(hand_landmarks): return "Prana Mudra"
+        if detect_apana_mudra(hand_landmarks): return "Apana Mudra"
+        if detect_surya_mudra(hand_landmarks): return "Surya Mudra"
+        if detect_varun_mudra(hand_landmarks): return "Varun Mudra"
+    
+    # Fallback to finger states for basic chakra mapping if needed, or return None
+    t = finger_states["thumb"]
+    i = finger_states["index"]
+    m = finger_states["middle"]
+    r = finger_states["ring"]
+    p = finger_states["pinky"]
+
+    if not t and not i and not m and not r and not p:
+        return "Root (Fist)"
+    
+    return None
+
+
+def analyze_face(face_landmarks, img_w, img_h):
+    if not face_landmarks:
+        return (255, 255, 255), "No face", 0.02, 0.02
+
+    lm = face_landmarks.landmark
+    upper_lip = lm[13]
+    lower_lip = lm[14]
+    left_eye_top = lm[159]
+    left_eye_bottom = lm[145]
+
+    def dist(a, b):
+        return math.sqrt((a.x - b.x) ** 2 + (a.y - b.y) ** 2)
+
+    mouth_open = dist(upper_lip, lower_lip)
+    eye_open = dist(left_eye_top, left_eye_bottom)
+
+    # Gaze & Eye State Detection
+    gaze_label = "Center"
+    eye_ratio = 0.3 # Default Open
+    gaze_x = 0.0 # -1.0 (Left) to 1.0 (Right)
+    
+    if len(lm) > 470: # Check if iris landmarks exist
+        # Right Eye (User's Right, Screen Left)
+        # Inner: 362, Outer: 263, Top: 386, Bottom: 374
+        r_inner = lm[362]
+        r_outer = lm[263]
+        r_top = lm[386]
+        r_bottom = lm[374]
+        r_iris = lm[473]
+        
+        # Calculate Eye Aspect Ratio (EAR) - Scale Invariant
+        h_dist = dist(r_inner, r_outer)
+        v_dist = dist(r_top, r_bottom)
+        
+        if h_dist > 0:
+            eye_ratio = v_dist / h_dist
+            
+            # Calculate Gaze X (Relative to center)
+            eye_center_x = (r_inner.x + r_outer.x) / 2
+            # Normalize: deviation / (half_width)
+            # Factor 4.0 to make it more sensitive
+            gaze_x = (r_iris.x - eye_center_x) / (h_dist / 2) * 4.0
+        
+        # Thresholds (tuned for mirrored/webcam view)
+        # In mirrored view: Looking Left (Screen Left) -> Iris moves Left (smaller x)
+        if gaze_x < -0.3:
+            gaze_label = "Right" # Actually Screen Left (User's Right?) - Naming is confusing, let's rely on gaze_x
+        elif gaze_x > 0.3:
+            gaze_label = "Left" # Screen Right
+            
+    if mouth_open > 0.035:
+        aura_color = (0, 255, 255)
+        mood = "Expressive / Happy"
+    elif eye_ratio < EYE_CLOSED_THRESHOLD:
+        aura_color = (255, 128, 0)
+        mood = "Calm / Meditative"
+    else:
+        aura_color = (255, 255, 255)
+        mood = "Neutral"
+
+    return aura_color, mood, eye_ratio, mouth_open, gaze_label, gaze_x
+
+
+class BreathingTracker:
+    def __init__(self, smoothing=0.9):
+        self.prev_y = None
+        self.smoothed = 0.0
+        self.smoothing = smoothing
+        self.last_time = time.time()
+        self.breath_phase = 0.0
+
+    def update(self, nose_y):
+        if self.prev_y is None:
+            self.prev_y = nose_y
+            return
+        dy = nose_y - self.prev_y
+        self.prev_y = nose_y
+        self.smoothed = self.smoothing * self.smoothed + (1 - self.smoothing) * dy
+        dt = max(1e-3, time.time() - self.last_time)
+        self.last_time = time.time()
+        self.breath_phase += self.smoothed * 50
+        if self.breath_phase > 2 * math.pi:
+            self.breath_phase -= 2 * math.pi
+        if self.breath_phase < 0:
+            self.breath_phase += 2 * math.pi
+
+    def get_breath_factor(self):
+        return 1.0 + 0.3 * math.sin(self.breath_phase)
+
+
+class PostureAnalyzer:
+    def __init__(self):
+        self.last_label = "Unknown"
+
+    def assess(self, pose_landmarks):
+        if not pose_landmarks:
+            self.last_label = "No body"
+            return 0.0, self.last_label
+
+        lm = pose_landmarks.landmark
+        ls, rs = lm[11], lm[12]
+        lh, rh = lm[23], lm[24]
+
+        mid_shoulders = ((ls.x + rs.x) * 0.5, (ls.y + rs.y) * 0.5)
+        mid_hips = ((lh.x + rh.x) * 0.5, (lh.y + rh.y) * 0.5)
+
+        dx = mid_shoulders[0] - mid_hips[0]
+        dy = mid_shoulders[1] - mid_hips[1] + 1e-6
+        spine_angle = abs(math.degrees(math.atan2(dx, dy)))  # 0 is vertical
+
+        shoulder_level = abs(ls.y - rs.y)
+        hips_level = abs(lh.y - rh.y)
+
+        score = 1.0
+        if spine_angle > 10:
+            score -= min(0.5, (spine_angle - 10) / 40)
+        if shoulder_level > 0.03:
+            score -= min(0.3, (shoulder_level - 0.03) / 0.1)
+        if hips_level > 0.03:
+            score -= min(0.2, (hips_level - 0.03) / 0.1)
+
+        score = max(0.0, min(1.0, score))
+        if score > 0.8:
+            label = "Aligned"
+        elif score > 0.6:
+            label = "Slight tilt"
+        elif score > 0.4:
+            label = "Adjust spine/shoulders"
+        else:
+            label = "Poor posture"
+        self.last_label = label
+        return score, label
+
+
+def detect_namaste(hand_results):
+    """
+    Detects if two hands are present and close together (Namaste/Anjali gesture).
+    """
+    return detect_namaste_hands(hand_results.multi_hand_landmarks)
+
+def detect_namaste_hands(hand_list):
+    if not hand_list or len(hand_list) < 2:
+        return False
+    
+    # Simple check: distance between wrist points
+    h1 = hand_list[0].landmark[0]
+    h2 = hand_list[1].landmark[0]
+    
+    dist = math.sqrt((h1.x - h2.x)**2 + (h1.y - h2.y)**2)
+    return dist < 0.20  # Relaxed threshold
+
+
+class RunningStats:
+    """Welford running mean / variance / min / max in O(1) memory."""
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        if x < self.min: self.min = x
+        if x > self.max: self.max = x
+
+    def merge(self, other):
+        """Adds another stream's statistics (Chan et al. parallel update)."""
+        if not other.n:
+            return
+        n = self.n + other.n
+        d = other.mean - self.mean
+        self.m2 += other.m2 + d * d * self.n * other.n / n
+        self.mean += d * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class Histogram:
+    """Fixed bins over [lo, hi]; values outside land in the edge bins."""
+    def __init__(self, lo=0.0, hi=1.0, bins=20):
+        self.lo = lo
+        self.hi = hi
+        self.counts = [0] * bins
+
+    def add(self, x):
+        bins = len(self.counts)
+        i = int((x - self.lo) / (self.hi - self.lo) * bins)
+        self.counts[min(bins - 1, max(0, i))] += 1
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def quantile(self, p):
+        """Quantile interpolated within its bin (error below one bin width)."""
+        total = sum(self.counts)
+        if not total:
+            return 0.0
+        target = p * total
+        width = (self.hi - self.lo) / len(self.counts)
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= target:
+                return self.lo + width * (i + (target - seen) / c)
+            seen += c
+        return self.hi
+
+
+class P2Quantile:
+    """
+    One quantile estimated with the P-square algorithm (Jain & Chlamtac):
+    five markers, adjusted with a parabolic fit per sample. O(1) memory.
+    """
+    def __init__(self, p):
+        self.p = p
+        self.q = []                                    # Marker heights
+        self.pos = [1, 2, 3, 4, 5]                     # Marker positions
+        self.want = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.step = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x):
+        q = self.q
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        pos = self.pos
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self.want[i] += self.step[i]
+        for i in (1, 2, 3):
+            d = self.want[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + d) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - d) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1]))
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (pos[i + d] - pos[i]) # Linear fallback
+                q[i] = qp
+                pos[i] += d
+
+    def value(self):
+        q = self.q
+        if len(q) == 5:
+            return q[2]
+        return q[int(round(self.p * (len(q) - 1)))] if q else 0.0
+
+
+class StateTimer:
+    """
+    Time-weighted durations and entry counts of a discrete state, updated
+    once per frame (None = no state). The time up to a frame is credited to
+    the previous frame's state; gaps longer than MAX_GAP_S (stalls, pauses)
+    are credited only up to MAX_GAP_S.
+    """
+    MAX_GAP_S = 1.0
+
+    def __init__(self):
+        self.state = None
+        self.last_t = None
+        self.durations = {}
+        self.events = {}
+
+    def update(self, state, now):
+        if self.state is not None and self.last_t is not None:
+            dt = min(max(0.0, now - self.last_t), self.MAX_GAP_S)
+            self.durations[self.state] = self.durations.get(self.state, 0.0) + dt
+        if state is not None and state != self.state:
+            self.events[state] = self.events.get(state, 0) + 1
+        self.state = state
+        self.last_t = now
+
+    def carry_over(self):
+        """Empty timer continuing this one's open state (chunk boundaries: no new event)."""
+        timer = StateTimer()
+        timer.MAX_GAP_S = self.MAX_GAP_S
+        timer.state = self.state
+        timer.last_t = self.last_t
+        return timer
+
+    def merge(self, other):
+        for k, v in other.durations.items():
+            self.durations[k] = self.durations.get(k, 0.0) + v
+        for k, v in other.events.items():
+            self.events[k] = self.events.get(k, 0) + v
+
+
+class AnalyticsTracker:
+    """
+    Session statistics in constant memory, O(1) to summarize.
+    Call record_mudra / record_chakra every frame (None when nothing is
+    active) so holds are timed; record_posture whenever a body is seen.
+    """
+    POSTURE_ALERT = 0.5
+    POSTURE_QUANTILES = (0.1, 0.5, 0.9)
+
+    def __init__(self):
+        self.posture = RunningStats()
+        self.posture_hist = Histogram(0.0, 1.0, 20)
+        self.posture_q = [P2Quantile(p) for p in self.POSTURE_QUANTILES]
+        self.posture_alerts = 0
+        self.mudras = StateTimer()
+        self.chakras = StateTimer()
+
+    def record_chakra(self, idx, now=None):
+        self.chakras.update(idx, time.time() if now is None else now)
+
+    def record_mudra(self, name, now=None):
+        self.mudras.update(name, time.time() if now is None else now)
+
+    def record_posture(self, score):
+        self.posture.add(score)
+        self.posture_hist.add(score)
+        for est in self.posture_q or ():
+            est.add(score)
+        if score < self.POSTURE_ALERT:
+            self.posture_alerts += 1
+
+    def carry_over(self):
+        """Empty tracker continuing the open mudra / chakra holds (chunked processing)."""
+        tracker = AnalyticsTracker()
+        tracker.mudras = self.mudras.carry_over()
+        tracker.chakras = self.chakras.carry_over()
+        return tracker
+
+    def merge(self, other):
+        """
+        Adds a later chunk's statistics. P-square sketches cannot be merged, so
+        a merged tracker reports quantiles from the histogram instead.
+        """
+        self.posture.merge(other.posture)
+        self.posture_hist.merge(other.posture_hist)
+        self.posture_q = None
+        self.posture_alerts += other.posture_alerts
+        self.mudras.merge(other.mudras)
+        self.chakras.merge(other.chakras)
+
+    def summary(self):
+        return {
+            "chakra_time": [self.chakras.durations.get(i, 0.0) for i in range(7)],
+            "mudras": dict(self.mudras.events),        # Times each mudra was formed
+            "mudra_time": dict(self.mudras.durations), # Seconds each mudra was held
+            "posture_alerts": self.posture_alerts,
+            "posture_samples": self.posture.n,
+            "avg_posture": self.posture.mean,
+            "posture_std": self.posture.std,
+            "posture_quantiles": ({p: est.value() for p, est in zip(self.POSTURE_QUANTILES, self.posture_q)}
+                                  if self.posture_q is not None else
+                                  {p: self.posture_hist.quantile(p) for p in self.POSTURE_QUANTILES}),
+            "posture_histogram": list(self.posture_hist.counts),
+        }
+
+
+class MeditationTracker:
+    def __init__(self):
+        self.stage = "Dharana (Concentration)"
+        self.concentration_level = 0.0
+        self.start_time = 0
+        self.in_dhyana = False
+        
+    def update(self, eye_open, breath_stable, body_still, gaze_label="Center"):
+        # Logic: 
+        # 1. Eyes Closed -> Jump to 100%
+        # 2. Eyes Open + Center Gaze -> Max 50%
+        # 3. Eyes Open + Looking Away -> Drop to 0%
+        
+        if eye_open < EYE_CLOSED_THRESHOLD: # Eyes closed (Using Ratio now)
+            if not self.in_dhyana:
+                self.in_dhyana = True
+                self.start_time = time.time()
+                self.stage = "Dhyana (Meditation)"
+            
+            # Fast increase to 100%
+            self.concentration_level = min(100.0, self.concentration_level + 1.0) # Faster gain (was 0.5)
+            
+            if self.concentration_level > 90 and breath_stable:
+                self.stage = "Samadhi (Absorption)"
+            elif self.concentration_level > 50:
+                self.stage = "Dhyana (Meditation)"
+            else:
+                self.stage = "Dhyana (Entering...)"
+                
+        else: # Eyes Open
+            self.in_dhyana = False
+            
+            if gaze_label == "Center":
+                # Looking at camera -> Increase to 90% (Max for eyes open)
+                # [FIX] Cap at 90% if eyes open. Must close eyes for 100%.
+                if self.concentration_level < 90.0:
+                    self.concentration_level = min(90.0, self.concentration_level + 0.5) 
+                
+                # [FIX] Accurate Staging
+                if self.concentration_level > 80:
+                    self.stage = "Dharana (Deep Focus)"
+                elif self.concentration_level > 20:
+                    self.stage = "Dharana (Focus)"
+                else:
+                    self.stage = "Focusing..."
+            else:
+                # Looking away -> Distracted
+                self.concentration_level = max(0.0, self.concentration_level - 0.5) # Slower drop (was 1.0)
+                self.stage = "Distracted"
+            
+        return self.stage, self.concentration_level
+
+
+class PhysiologyEngine:
+    """Heart rate / HRV -> stress, calm, focus, doshas and a coaching insight."""
+    def __init__(self, now=None):
+        self.history_bpm = []
+        self.history_ibi = []
+        self.last_beat_time = time.time() if now is None else now
+        self.min_ibi = 300  # 200 BPM
+        self.max_ibi = 1500 # 40 BPM
+        
+        # [NEW] Nadi Pariksha History
+        self.history_vata = []
+        self.history_pitta = []
+        self.history_kapha = []
+        
+        # [NEW] Insight Timer
+        self.last_insight_time = 0
+        self.current_insight = "Scanning bio-rhythms..."
+        self.last_hrv_ms = 0.0 # Latest RMSSD, for telemetry
+        
+    def _get_tiny_graph(self, data, length=7):
+        if not data or len(data) < 2: return "       "
+        # Unicode bars:   ▂ ▃ ▄ ▅ ▆ ▇ █
+        bars = "  ▂▃▄▅▆▇█"
+        # Normalize last 'length' points
+        recent = data[-length:]
+        if not recent: return "       "
+        mn, mx = min(recent), max(recent)
+        if mx == mn: return "▃" * len(recent)
+        
+        graph = ""
+        for v in recent:
+            idx = int((v - mn) / (mx - mn + 1e-6) * (len(bars) - 1))
+            graph += bars[idx]
+        return graph.ljust(length)
+
+    def analyze(self, bpm, beat_detected, gaze_label="Center", now=None):
+        # [FIX] Handle No Sensor Input
+        if bpm <= 0:
+            return {
+                'stress_score': 0.0,
+                'calm_score': 0.0,
+                'focus_score': 0.0,
+                'insight_text': "Waiting for Sensor...",
+                'tiny_graphs': {'vata': [], 'pitta': [], 'kapha': []}
+            }
+
+        now = time.time() if now is None else now
+        
+        # 1. Calculate IBI
+        if beat_detected:
+            ibi = (now - self.last_beat_time) * 1000.0 # ms
+            self.last_beat_time = now
+            if self.min_ibi < ibi < self.max_ibi:
+                self.history_ibi.append(ibi)
+                if len(self.history_ibi) > 20: self.history_ibi.pop(0)
+        
+        # Update BPM history
+        if bpm > 0:
+            self.history_bpm.append(bpm)
+            if len(self.history_bpm) > 20: self.history_bpm.pop(0)
+            
+        # 2. Calculate HRV (RMSSD)
+        hrv_rmssd = 0.0
+        if len(self.history_ibi) > 2:
+            diffs = np.diff(self.history_ibi)
+            sq_diffs = diffs ** 2
+            mean_sq = np.mean(sq_diffs)
+            hrv_rmssd = math.sqrt(mean_sq)
+        self.last_hrv_ms = hrv_rmssd
+            
+        # 3. Derive Metrics
+        # Stress: High BPM + Low HRV
+        # Normalize BPM (60-100) -> 0-1
+        norm_bpm = max(0, min(1, (bpm - 60) / 40)) if bpm > 0 else 0
+        # Normalize HRV (10-100) -> 0-1 (Higher is better)
+        norm_hrv = max(0, min(1, (hrv_rmssd - 10) / 90))
+        
+        stress_score = (norm_bpm * 0.7) + ((1.0 - norm_hrv) * 0.3)
+        stress_score = max(0, min(1, stress_score)) * 100
+        
+        calm_score = 100 - stress_score
+        
+        # Focus: Stability of BPM (Inverse of BPM variance)
+        bpm_var = np.var(self.history_bpm) if len(self.history_bpm) > 5 else 10
+        focus_score = max(0, min(100, 100 - bpm_var))
+        
+        # [FIX] Gaze Influence on Focus
+        if gaze_label == "Center":
+            focus_score = max(80.0, focus_score) # Ensure high focus
+        else:
+            focus_score = min(40.0, focus_score) # Cap low focus
+        
+        # [NEW] Calculate Doshas (Nadi Pariksha)
+        # Vata (Air): Linked to Variability/Movement -> Proportional to HRV
+        vata_score = min(100, norm_hrv * 100)
+        
+        # Pitta (Fire): Linked to Intensity/Heat -> Proportional to HR
+        pitta_score = min(100, norm_bpm * 100)
+        
+        # Kapha (Water): Linked to Stability/Calm -> Inverse of HR & HRV
+        # High Kapha = Slow, steady pulse
+        kapha_score = min(100, (1.0 - norm_bpm) * 80 + (1.0 - norm_hrv) * 20)
+        
+        # Update History
+        self.history_vata.append(vata_score)
+        self.history_pitta.append(pitta_score)
+        self.history_kapha.append(kapha_score)
+        
+        # Keep history short (20 frames)
+        if len(self.history_vata) > 20: self.history_vata.pop(0)
+        if len(self.history_pitta) > 20: self.history_pitta.pop(0)
+        if len(self.history_kapha) > 20: self.history_kapha.pop(0)
+        
+        # [NEW] Determine Dominant Dosha & Finding
+        doshas = {'Vata': vata_score, 'Pitta': pitta_score, 'Kapha': kapha_score}
+        dominant = max(doshas, key=doshas.get)
+        
+        finding = "Scanning..."
+        if len(self.history_bpm) > 5:
+            if dominant == 'Vata':
+                finding = "Dominant: Vata (High Movement/Anxiety)"
+            elif dominant == 'Pitta':
+                finding = "Dominant: Pitta (High Energy/Heat)"
+            elif dominant == 'Kapha':
+                finding = "Dominant: Kapha (High Stability/Lethargy)"
+                
+            # Check for Balance (if all are close)
+            avg_d = sum(doshas.values()) / 3
+            if all(abs(v - avg_d) < 15 for v in doshas.values()):
+                finding = "Finding: Tridosha Balanced (Excellent)"
+        
+        # 4. Generate Insight (Every 15 Seconds)
+        if now - self.last_insight_time > 15.0:
+            self.last_insight_time = now
+            
+            if len(self.history_bpm) > 5:
+                if calm_score > 80:
+                    self.current_insight = "Deep state of relaxation detected."
+                elif calm_score > 60:
+                    self.current_insight = "Heart rhythm is steady and calm."
+                elif stress_score > 80:
+                    self.current_insight = "High arousal. Focus on slow exhalations."
+                elif stress_score > 60:
+                    self.current_insight = "Slight tension. Soften your shoulders."
+                elif focus_score > 80:
+                    self.current_insight = "Excellent physiological coherence."
+                else:
+                    self.current_insight = "Breathing is syncing with heart rate."
+            else:
+                self.current_insight = "Scanning bio-rhythms..."
+
+        return {
+            "heart_rate": bpm,
+            "hrv_rmssd_ms": hrv_rmssd,
+            "stress_score": stress_score,
+            "calm_score": calm_score,
+            "focus_score": focus_score,
+            "tiny_graphs": {'vata': self.history_vata, 'pitta': self.history_pitta, 'kapha': self.history_kapha},
+            "insight_text": self.current_insight,
+            "finding": finding # [NEW]
+        }
+
+
+# ===================== SHARED RULES =======================
+
+def detect_mudra(hand_list, frame=None, width=0, height=0):
+    """
+    Returns (mudra_name, chakra_idx) for the first recognised mudra, else (None, None).
+    Namaste (two hands) wins over the single-hand mudras.
+    """
+    if not hand_list:
+        return None, None
+    if detect_namaste_hands(hand_list):
+        return "Anjali Mudra", 4
+    for hand_landmarks in hand_list:
+        if detect_gyan_mudra(hand_landmarks, frame, width, height):
+            return "Gyan Mudra", 6
+        elif detect_prana_mudra(hand_landmarks):
+            return "Prana Mudra", 0
+        elif detect_apana_mudra(hand_landmarks):
+            return "Apana Mudra", 1
+        elif detect_surya_mudra(hand_landmarks):
+            return "Surya Mudra", 2
+        elif detect_varun_mudra(hand_landmarks):
+            return "Varun Mudra", 1
+    return None, None
+
+
+def detect_gaze_distraction(face_landmarks):
+    """Head turned away: nose tip (1) far from the mid-point of the outer eye corners (33, 263)."""
+    lm = face_landmarks.landmark
+    eye_mid_x = (lm[33].x + lm[263].x) / 2
+    return abs(lm[1].x - eye_mid_x) > 0.04
+
+
+def compute_energy_limit(posture_score, mudra_active, is_eyes_closed, gaze_distracted, recently_active):
+    # STRICT ENERGY LIMITS
+    # 1. Default / Bad Posture -> 10%
+    energy_limit = 0.10
+    # 2. Good Posture -> 30%
+    if posture_score > 0.60:
+        energy_limit = 0.30
+    # 3. Mudra -> 60%
+    if mudra_active:
+        energy_limit = 0.60
+    # 4. Eyes Closed -> 100%
+    if is_eyes_closed:
+        energy_limit = 1.0
+    # Distraction Penalty (Overrides everything)
+    if gaze_distracted:
+        energy_limit = 0.10
+    # Sticky Energy Limit (1.5s grace period) so flickering detection does not drop it
+    if (mudra_active or recently_active) and energy_limit < 0.60 and not gaze_distracted:
+        energy_limit = 0.60
+    return energy_limit
+
+
+def apply_energy_rules(chakra_energies, energy_limit, active_idx, has_body, posture_score,
+                       is_eyes_closed, med_level, gaze_distracted):
+    """Boosts / decays chakra_energies in place for one frame."""
+    if active_idx is not None and not gaze_distracted:
+        for i in range(len(chakra_energies)):
+            if i == active_idx:
+                # Active Mudra Boost - INSTANT
+                base_increase = 0.20
+                if is_eyes_closed or med_level > 40:
+                    base_increase = 0.25
+                chakra_energies[i] = min(energy_limit, chakra_energies[i] + base_increase)
+            else:
+                # Holistic Boost (normal decay handled by the enforcer below)
+                target_other = energy_limit * 0.85
+                if chakra_energies[i] < target_other:
+                    chakra_energies[i] += 0.05
+
+    elif has_body and (posture_score > 0.5 or is_eyes_closed) and not gaze_distracted:
+        # Passive Body Boost
+        for i in range(len(chakra_energies)):
+            if chakra_energies[i] < energy_limit:
+                chakra_energies[i] = min(energy_limit, chakra_energies[i] + 0.03)
+
+    elif has_body and not gaze_distracted:
+        # Just Sitting (Body Detected) -> Rise to 30%
+        target_sitting = 0.30
+        for i in range(len(chakra_energies)):
+            if chakra_energies[i] < target_sitting:
+                chakra_energies[i] += 0.01
+
+    # GLOBAL RAPID DECAY ENFORCER: above the limit -> drop FAST
+    for i in range(len(chakra_energies)):
+        if chakra_energies[i] > energy_limit:
+            chakra_energies[i] = max(energy_limit, chakra_energies[i] - 0.05)
+        elif chakra_energies[i] < 0:
+            chakra_energies[i] = 0.0
+
+
+def compute_xp_gain(posture_score, mudra_active, is_eyes_closed, current_level):
+    """Returns (xp_gain, warning_msg) for one frame, including level gating."""
+    xp_gain = 0.0
+    warning_msg = ""
+    if posture_score > 0.4:
+        xp_gain += 1.0 # Base XP for Posture
+        if mudra_active:
+            xp_gain += 1.0 # Bonus for Mudra
+        if is_eyes_closed:
+            xp_gain += 2.0 # Bonus for Eyes Closed
+
+    # Levels 4-10: Mudra Mandatory
+    if 3 <= current_level < 10 and not mudra_active:
+        xp_gain = 0.0
+        warning_msg = "MUDRA REQUIRED TO PROGRESS!"
+    # Levels 11-20: Eyes Closed Mandatory
+    if current_level >= 10 and not is_eyes_closed:
+        xp_gain = 0.0
+        warning_msg = "CLOSE EYES TO PROGRESS!"
+    return xp_gain, warning_msg
+
+
+def xp_flags(posture_score, mudra_active, is_eyes_closed):
+    """Everything compute_xp_gain() reads from a frame, packed into one byte (see replay_xp)."""
+    return int(posture_score > 0.4) | int(mudra_active) << 1 | int(is_eyes_closed) << 2
+
+
+def replay_xp(flags):
+    """
+    Re-runs the XP / level rules of PracticeState.step over a sequence of
+    xp_flags() values; returns per-frame (xp, level) lists. Gating depends on
+    the level reached so far, so chunks of one session cannot just be summed.
+    """
+    total_xp, level = 0.0, 1
+    xps, levels = [], []
+    for f in flags:
+        if level < MAX_LEVEL:
+            gain, _ = compute_xp_gain(0.5 if f & 1 else 0.0, bool(f & 2), bool(f & 4), level)
+            total_xp += gain
+            level = min(MAX_LEVEL, int(total_xp / XP_PER_LEVEL) + 1)
+        xps.append(total_xp)
+        levels.append(level)
+    return xps, levels
+
+
+class PracticeState:
+    """
+    Everything one practitioner accumulates during a session.
+    step() applies the same rules as the live loop in main2.main() to one
+    frame of landmarks (normalized to that person's own view) and returns a
+    snapshot dict. One instance per person in class mode.
+    """
+    def __init__(self):
+        self.chakra_energies = [0.4] * 7
+        self.breathing = BreathingTracker()
+        self.posture_analyzer = PostureAnalyzer()
+        self.meditation_tracker = MeditationTracker()
+        self.analytics = AnalyticsTracker()
+
+        self.eye_closed_frames = 0
+        self.alignment_mode = False
+        self.alignment_start_time = 0.0
+        self.alignment_progress = 0.0
+        self.alignment_count = 0
+        self.last_activation_time = 0.0
+        self.total_gyan_count = 0
+
+        self.total_xp = 0.0
+        self.level = 1
+        self.snapshot = {}
+
+    def step(self, hand_list, face_landmarks, pose_landmarks, now=None):
+        now = time.time() if now is None else now
+
+        mood_label = "No face"
+        eye_open = 1.0
+        gaze_label = "Center"
+        gaze_x = 0.0
+        is_eyes_closed = False
+
+        # Face, breath & eyes
+        if face_landmarks:
+            _, mood_label, eye_open, _, gaze_label, gaze_x = analyze_face(face_landmarks, 1, 1)
+            self.breathing.update(face_landmarks.landmark[1].y)
+            is_eyes_closed = eye_open < EYE_CLOSED_THRESHOLD
+            self.eye_closed_frames = self.eye_closed_frames + 1 if is_eyes_closed else 0
+            if self.eye_closed_frames > EYE_CLOSED_FRAMES_REQUIRED and not self.alignment_mode:
+                self.alignment_mode = True
+                self.alignment_count += 1
+                self.alignment_start_time = now
+                self.alignment_progress = 0.0
+        else:
+            self.breathing.update(0.5)
+            self.eye_closed_frames = 0
+
+        # Alignment raises the baseline of every chakra
+        if self.alignment_mode:
+            self.alignment_progress = min(1.0, self.alignment_progress + 0.01)
+            for i in range(len(self.chakra_energies)):
+                self.chakra_energies[i] = max(self.chakra_energies[i], self.alignment_progress)
+            if now - self.alignment_start_time > 8:
+                self.alignment_mode = False
+
+        # Posture
+        if pose_landmarks:
+            posture_score, posture_label = self.posture_analyzer.assess(pose_landmarks)
+            self.analytics.record_posture(posture_score)
+        else:
+            posture_score, posture_label = 0.0, "No body"
+
+        med_stage, med_level = self.meditation_tracker.update(eye_open, True, posture_score > 0.6, gaze_label)
+
+        # Mudras
+        mudra_name, mudra_idx = detect_mudra(hand_list)
+        self.analytics.record_mudra(mudra_name, now)
+        if mudra_name:
+            if mudra_name == "Gyan Mudra":
+                self.total_gyan_count += 1
+
+        gaze_distracted = bool(face_landmarks) and detect_gaze_distraction(face_landmarks)
+        if gaze_distracted:
+            gaze_label = "Distracted"
+
+        # Energy
+        energy_limit = compute_energy_limit(posture_score, mudra_name is not None, is_eyes_closed,
+                                            gaze_distracted, now - self.last_activation_time < 1.5)
+        self.analytics.record_chakra(mudra_idx if not gaze_distracted else None, now)
+        if mudra_idx is not None and not gaze_distracted:
+            self.last_activation_time = now
+        apply_energy_rules(self.chakra_energies, energy_limit, mudra_idx, pose_landmarks is not None,
+                           posture_score, is_eyes_closed, med_level, gaze_distracted)
+
+        # XP
+        xp_gain, warning_msg = compute_xp_gain(posture_score, mudra_name is not None, is_eyes_closed, self.level)
+        if self.level < MAX_LEVEL:
+            self.total_xp += xp_gain
+            self.level = min(MAX_LEVEL, int(self.total_xp / XP_PER_LEVEL) + 1)
+
+        self.snapshot = {
+            "t": now,
+            "chakra_energies": list(self.chakra_energies),
+            "avg_energy": sum(self.chakra_energies) / len(self.chakra_energies),
+            "mudra": mudra_name,
+            "active_chakra": mudra_idx if not gaze_distracted else None,
+            "posture_score": posture_score,
+            "posture_label": posture_label,
+            "eye_ratio": eye_open,
+            "eyes_closed": is_eyes_closed,
+            "gaze_label": gaze_label,
+            "gaze_x": gaze_x,
+            "mood": mood_label,
+            "meditation_stage": med_stage,
+            "concentration": med_level,
+            "alignment_mode": self.alignment_mode,
+            "breath_phase": self.breathing.breath_phase,
+            "xp": self.total_xp,
+            "level": self.level,
+            "warning": warning_msg,
+        }
+        return self.snapshot
+
+
+if __name__ == "__main__":
+    # A 3-hour session at 30 fps: the streaming statistics match the exact
+    # ones, memory does not grow with the session length
+    import random
+    import tracemalloc
+
+    rng = random.Random(3)
+    analytics = AnalyticsTracker()
+    frames = 3 * 3600 * 30
+    scores = [min(1.0, max(0.0, rng.gauss(0.7, 0.15))) for _ in range(frames)]
+
+    def run(tracker, trace):
+        early = 0
+        for i, s in enumerate(scores):
+            t = i / 30.0
+            mudra = "Gyan Mudra" if (i // 300) % 3 == 0 else None # 10 s holds, every 30 s
+            tracker.record_mudra(mudra, t)
+            tracker.record_chakra(6 if mudra else None, t)
+            tracker.record_posture(s)
+            if trace and i == frames // 10:
+                early, _ = tracemalloc.get_traced_memory()
+        return early
+
+    t0 = time.perf_counter()
+    run(AnalyticsTracker(), False)
+    per_frame_us = (time.perf_counter() - t0) / frames * 1e6
+    tracemalloc.start()
+    early = run(analytics, True)
+    late, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summary = analytics.summary()
+    exact = sorted(scores)
+    mean = sum(scores) / frames
+    print(f"[INFO] {per_frame_us:.1f} us/frame, traced memory {early} B at 18 min, {late} B at 3 h")
+    print(f"[INFO] mean {summary['avg_posture']:.4f} (exact {mean:.4f}), quantiles "
+          + ", ".join(f"p{int(p * 100)} {v:.3f}/{exact[int(p * (frames - 1))]:.3f}"
+                      for p, v in summary["posture_quantiles"].items()))
+    print(f"[INFO] Gyan Mudra formed {summary['mudras']['Gyan Mudra']} times, "
+          f"held {summary['mudra_time']['Gyan Mudra']:.0f} s; crown {summary['chakra_time'][6]:.0f} s")
+    assert abs(summary["avg_posture"] - mean) < 1e-9
+    assert all(abs(v - exact[int(p * (frames - 1))]) < 0.01 for p, v in summary["posture_quantiles"].items())
+    assert summary["mudras"]["Gyan Mudra"] == frames // 900
+    assert abs(summary["mudra_time"]["Gyan Mudra"] - frames / 90.0) < 1.0
+    assert late <= early + 1024, "AnalyticsTracker memory grows with the session"
+
+    # Chunked: three trackers handed over with carry_over() and merged must
+    # match the single pass (quantiles within one histogram bin)
+    merged = None
+    chunk = AnalyticsTracker()
+    for i, s in enumerate(scores):
+        if i and i % (frames // 3) == 0:
+            merged = chunk if merged is None else (merged.merge(chunk) or merged)
+            chunk = chunk.carry_over()
+        t = i / 30.0
+        mudra = "Gyan Mudra" if (i // 300) % 3 == 0 else None
+        chunk.record_mudra(mudra, t)
+        chunk.record_chakra(6 if mudra else None, t)
+        chunk.record_posture(s)
+    merged.merge(chunk)
+    stitched = merged.summary()
+    print(f"[INFO] Merged chunks: mean {stitched['avg_posture']:.4f}, std {stitched['posture_std']:.4f} "
+          f"(single pass {summary['posture_std']:.4f}), Gyan Mudra {stitched['mudras']['Gyan Mudra']} holds")
+    assert abs(stitched["avg_posture"] - mean) < 1e-9 and abs(stitched["posture_std"] - summary["posture_std"]) < 1e-9
+    assert stitched["mudras"] == summary["mudras"] and stitched["chakra_time"] == summary["chakra_time"]
+    assert all(abs(stitched["posture_quantiles"][p] - v) < 0.05 for p, v in summary["posture_quantiles"].items())
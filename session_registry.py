@@ -0,0 +1,132 @@
+import os
+import resource
+import sys
+import threading
+import time
+import weakref
+
+from stream_profiles import active_processors
+from admission import TIER_NAMES
+
+# ============================================================
+#   SESSION REGISTRY
+#   Per-session resource accounting for the video processors of
+#   this server process, and an idle reaper: sessions that have
+#   not received a frame for IDLE_TIMEOUT_S (abandoned / hidden
+#   tabs) release their MediaPipe graphs. A session that wakes up
+#   reloads them on its next inference.
+# ============================================================
+
+IDLE_TIMEOUT_S = float(os.environ.get("YOGA_IDLE_TIMEOUT_S", 60))
+REAP_INTERVAL_S = 5.0
+
+
+def rss_mb():
+    """Current resident set size (peak size where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+# Process size before any session loaded its graphs; the growth above it is
+# split evenly between the sessions that hold graphs
+BASELINE_RSS_MB = rss_mb()
+
+
+class SessionReaper:
+    """
+    Background sweep over `active_processors` every REAP_INTERVAL_S:
+    samples each session's CPU share and releases the graphs of idle ones.
+    Processors provide last_frame_t, busy_ms, graphs_loaded and
+    release_graphs(idle_timeout_s).
+    """
+    def __init__(self, idle_timeout_s=IDLE_TIMEOUT_S, interval_s=REAP_INTERVAL_S):
+        self.idle_timeout_s = idle_timeout_s
+        self.interval_s = interval_s
+        self.samples = weakref.WeakKeyDictionary()  # processor -> (t, busy_ms)
+        self.cpu_pct = weakref.WeakKeyDictionary()  # processor -> % of one core
+        self.reaped = 0
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_s)
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"[ERROR] Session sweep failed: {e}")
+
+    def sweep(self, now=None, processors=None):
+        now = time.time() if now is None else now
+        for p in list(active_processors if processors is None else processors):
+            prev = self.samples.get(p)
+            if prev is not None and now > prev[0]:
+                self.cpu_pct[p] = (p.busy_ms - prev[1]) / ((now - prev[0]) * 1000.0) * 100.0
+            self.samples[p] = (now, p.busy_ms)
+            idle_s = now - p.last_frame_t
+            if p.graphs_loaded and idle_s > self.idle_timeout_s and p.release_graphs(self.idle_timeout_s):
+                self.reaped += 1
+                print(f"[INFO] Released the graphs of a session idle for {idle_s:.0f} s")
+
+
+# Shared by every session of this process (started by the first processor)
+reaper = SessionReaper()
+
+
+def session_rows(now=None):
+    """One dict per live session, oldest first, for the admin page."""
+    now = time.time() if now is None else now
+    procs = sorted(list(active_processors), key=lambda p: p.session_start)
+    holding = sum(p.graphs_loaded for p in procs)
+    share = max(0.0, rss_mb() - BASELINE_RSS_MB) / holding if holding else 0.0
+    rows = []
+    for i, p in enumerate(procs):
+        m = p.metrics()
+        rows.append({
+            "session": i + 1,
+            "age_s": int(m["session_s"]),
+            "idle_s": round(now - p.last_frame_t, 1),
+            "tier": TIER_NAMES[m["tier"]],
+            "graphs": "loaded" if p.graphs_loaded else "released",
+            "frames": m["processed"],
+            "dropped": m["dropped"],
+            "infer_ms": round(m["infer_ms"], 1),
+            "render_ms": round(m["render_ms"], 1),
+            "cpu_pct": round(reaper.cpu_pct.get(p, 0.0), 1),
+            "rss_mb": round(share if p.graphs_loaded else 0.0, 1),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    # An idle session is reaped once; a busy one keeps its graphs and gets a CPU share
+    class FakeProcessor:
+        def __init__(self, last_frame_t):
+            self.last_frame_t = last_frame_t
+            self.busy_ms = 0.0
+            self.graphs_loaded = True
+
+        def release_graphs(self, idle_timeout_s):
+            self.graphs_loaded = False
+            return True
+
+    busy, idle = FakeProcessor(0.0), FakeProcessor(0.0)
+    sweeper = SessionReaper(idle_timeout_s=30.0)
+    for t in range(0, 61, 5):
+        busy.last_frame_t = float(t)
+        busy.busy_ms += 5 * 250.0 # 250 ms of work per second
+        sweeper.sweep(now=float(t), processors=[busy, idle])
+    print(f"[INFO] busy: graphs {busy.graphs_loaded}, cpu {sweeper.cpu_pct[busy]:.0f}%; "
+          f"idle: graphs {idle.graphs_loaded}; reaped {sweeper.reaped}; rss {rss_mb():.0f} MB")
+    assert busy.graphs_loaded and not idle.graphs_loaded and sweeper.reaped == 1
+    assert abs(sweeper.cpu_pct[busy] - 25.0) < 0.01
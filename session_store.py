@@ -0,0 +1,227 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+
+# ============================================================
+#   SESSION STORE
+#   Local SQLite history of finished sessions. Rows are keyed by
+#   (user, day) and indexed on user/date and on the dominant
+#   chakra / mudra. Daily aggregates are updated incrementally
+#   in the same transaction as each new session, so "last 30
+#   days" reads at most 30 rows per user instead of rescanning
+#   every session.
+# ============================================================
+
+STORE_PATH = os.path.join("sessions", "sessions.db")
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,              -- local start date, YYYY-MM-DD
+    started REAL NOT NULL,          -- epoch seconds
+    duration_s REAL NOT NULL,
+    avg_posture REAL,               -- NULL if no body was seen
+    dominant_chakra TEXT,
+    dominant_mudra TEXT,
+    mudra_hold_s REAL NOT NULL DEFAULT 0,
+    xp REAL NOT NULL DEFAULT 0,
+    level INTEGER NOT NULL DEFAULT 1,
+    telemetry_path TEXT
+);
+CREATE INDEX IF NOT EXISTS sessions_user_day ON sessions (user, day);
+CREATE INDEX IF NOT EXISTS sessions_chakra_day ON sessions (dominant_chakra, day);
+CREATE INDEX IF NOT EXISTS sessions_mudra_day ON sessions (dominant_mudra, day);
+
+CREATE TABLE IF NOT EXISTS session_mudras (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    mudra TEXT NOT NULL,
+    hold_s REAL NOT NULL,
+    PRIMARY KEY (session_id, mudra)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS session_mudras_mudra ON session_mudras (mudra);
+
+-- Incremental aggregates (rebuild_aggregates() recomputes them from the rows above)
+CREATE TABLE IF NOT EXISTS daily_totals (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sessions INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    posture_sum REAL NOT NULL,      -- sum(avg_posture * duration_s)
+    posture_s REAL NOT NULL,        -- sum(duration_s) of sessions with a posture score
+    mudra_hold_s REAL NOT NULL,
+    PRIMARY KEY (user, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_mudras (
+    user TEXT NOT NULL,
+    day TEXT NOT NULL,
+    mudra TEXT NOT NULL,
+    hold_s REAL NOT NULL,
+    sessions INTEGER NOT NULL,
+    PRIMARY KEY (user, day, mudra)
+) WITHOUT ROWID;
+"""
+
+UPSERT_DAY_SQL = """
+INSERT INTO daily_totals (user, day, sessions, duration_s, posture_sum, posture_s, mudra_hold_s)
+VALUES (?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (user, day) DO UPDATE SET
+    sessions = sessions + 1,
+    duration_s = duration_s + excluded.duration_s,
+    posture_sum = posture_sum + excluded.posture_sum,
+    posture_s = posture_s + excluded.posture_s,
+    mudra_hold_s = mudra_hold_s + excluded.mudra_hold_s
+"""
+
+UPSERT_DAY_MUDRA_SQL = """
+INSERT INTO daily_mudras (user, day, mudra, hold_s, sessions) VALUES (?, ?, ?, ?, 1)
+ON CONFLICT (user, day, mudra) DO UPDATE SET
+    hold_s = hold_s + excluded.hold_s,
+    sessions = sessions + 1
+"""
+
+
+def local_day(ts):
+    return datetime.date.fromtimestamp(ts).isoformat()
+
+
+class SessionStore:
+    """
+    Session history + cross-session queries.
+
+        store = SessionStore()
+        store.add_session("asha", started, duration_s, avg_posture=0.8,
+                          dominant_chakra="Heart", mudra_hold={"Gyan Mudra": 95.0})
+        store.practice_summary("asha", days=30)
+    """
+    def __init__(self, path=STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA_SQL)
+        self.lock = threading.Lock()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def add_session(self, user, started, duration_s, avg_posture=None, dominant_chakra=None,
+                    mudra_hold=None, xp=0.0, level=1, telemetry_path=None):
+        """Stores one finished session and folds it into the daily aggregates; returns its id."""
+        mudra_hold = {m: s for m, s in (mudra_hold or {}).items() if s > 0}
+        hold_total = sum(mudra_hold.values())
+        dominant_mudra = max(mudra_hold, key=mudra_hold.get) if mudra_hold else None
+        day = local_day(started)
+        with self.lock, self.db:
+            cur = self.db.execute(
+                "INSERT INTO sessions (user, day, started, duration_s, avg_posture, dominant_chakra,"
+                " dominant_mudra, mudra_hold_s, xp, level, telemetry_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (user, day, started, duration_s, avg_posture, dominant_chakra, dominant_mudra,
+                 hold_total, xp, level, telemetry_path))
+            session_id = cur.lastrowid
+            self.db.executemany("INSERT INTO session_mudras (session_id, mudra, hold_s) VALUES (?, ?, ?)",
+                                [(session_id, m, s) for m, s in mudra_hold.items()])
+            scored = avg_posture is not None
+            self.db.execute(UPSERT_DAY_SQL, (user, day, duration_s,
+                                             avg_posture * duration_s if scored else 0.0,
+                                             duration_s if scored else 0.0, hold_total))
+            self.db.executemany(UPSERT_DAY_MUDRA_SQL, [(user, day, m, s) for m, s in mudra_hold.items()])
+        return session_id
+
+    def practice_summary(self, user, days=30, today=None):
+        """Practice minutes, average posture and mudra hold time over the last `days` days (aggregates only)."""
+        today = today or datetime.date.today()
+        since = (today - datetime.timedelta(days=days - 1)).isoformat()
+        with self.lock:
+            per_day = self.db.execute(
+                "SELECT day, sessions, duration_s, posture_sum, posture_s, mudra_hold_s FROM daily_totals"
+                " WHERE user = ? AND day >= ? ORDER BY day", (user, since)).fetchall()
+            mudras = self.db.execute(
+                "SELECT mudra, SUM(hold_s) FROM daily_mudras WHERE user = ? AND day >= ?"
+                " GROUP BY mudra ORDER BY 2 DESC", (user, since)).fetchall()
+        posture_s = sum(r[4] for r in per_day)
+        return {
+            "days": days,
+            "sessions": sum(r[1] for r in per_day),
+            "minutes": sum(r[2] for r in per_day) / 60.0,
+            "avg_posture": sum(r[3] for r in per_day) / posture_s if posture_s else None,
+            "mudra_hold_s": sum(r[5] for r in per_day),
+            "mudras": dict(mudras),
+            "per_day": [(r[0], r[2] / 60.0) for r in per_day],
+        }
+
+    def find_sessions(self, user=None, since=None, until=None, chakra=None, mudra=None, limit=50):
+        """Most recent sessions matching the filters (days as YYYY-MM-DD); each is a dict."""
+        where, args = [], []
+        for column, op, value in (("user", "=", user), ("day", ">=", since), ("day", "<=", until),
+                                  ("dominant_chakra", "=", chakra), ("dominant_mudra", "=", mudra)):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                args.append(value)
+        sql = "SELECT * FROM sessions" + (" WHERE " + " AND ".join(where) if where else "")
+        sql += " ORDER BY day DESC, started DESC LIMIT ?"
+        with self.lock:
+            cur = self.db.execute(sql, args + [limit])
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    def rebuild_aggregates(self):
+        """Recomputes the daily aggregates from the session rows (repair / after manual edits)."""
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM daily_totals")
+            self.db.execute("DELETE FROM daily_mudras")
+            self.db.execute(
+                "INSERT INTO daily_totals SELECT user, day, COUNT(*), SUM(duration_s),"
+                " TOTAL(avg_posture * duration_s), TOTAL(CASE WHEN avg_posture IS NULL THEN 0 ELSE duration_s END),"
+                " SUM(mudra_hold_s) FROM sessions GROUP BY user, day")
+            self.db.execute(
+                "INSERT INTO daily_mudras SELECT s.user, s.day, m.mudra, SUM(m.hold_s), COUNT(*)"
+                " FROM session_mudras m JOIN sessions s ON s.id = m.session_id GROUP BY s.user, s.day, m.mudra")
+
+
+if __name__ == "__main__":
+    # 50k sessions of 20 users over a year: the 30-day query must answer in
+    # milliseconds and match a full rescan of the session rows
+    import random
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "sessions_selfcheck.db")
+    store = SessionStore(path)
+    rng = random.Random(7)
+    mudras = ["Gyan Mudra", "Prana Mudra", "Anjali Mudra", "Surya Mudra"]
+    chakras = ["Root", "Sacral", "Solar Plexus", "Heart", "Throat", "Third Eye", "Crown"]
+    now = time.time()
+    t0 = time.perf_counter()
+    for i in range(50_000):
+        duration = rng.uniform(300, 3600)
+        store.add_session(f"user{i % 20}", now - rng.uniform(0, 365 * 86400), duration,
+                          avg_posture=rng.random() if i % 10 else None, dominant_chakra=rng.choice(chakras),
+                          mudra_hold={m: rng.uniform(0, duration / 4) for m in rng.sample(mudras, 2)})
+    insert_ms = (time.perf_counter() - t0) / 50_000 * 1000.0
+
+    t0 = time.perf_counter()
+    summary = store.practice_summary("user3", days=30)
+    query_ms = (time.perf_counter() - t0) * 1000.0
+    print(f"[INFO] add_session {insert_ms:.2f} ms; 30-day summary in {query_ms:.2f} ms: "
+          f"{summary['sessions']} sessions, {summary['minutes']:.0f} min, posture {summary['avg_posture']:.2f}")
+
+    since = (datetime.date.today() - datetime.timedelta(days=29)).isoformat()
+    sessions, minutes, hold = store.db.execute(
+        "SELECT COUNT(*), SUM(duration_s) / 60.0, SUM(mudra_hold_s) FROM sessions WHERE user = ? AND day >= ?",
+        ("user3", since)).fetchone()
+    assert summary["sessions"] == sessions
+    assert abs(summary["minutes"] - minutes) < 1e-6 and abs(summary["mudra_hold_s"] - hold) < 1e-6
+    t0 = time.perf_counter()
+    recent_heart = store.find_sessions(chakra="Heart", since=since, limit=20)
+    print(f"[INFO] find_sessions(chakra='Heart') in {(time.perf_counter() - t0) * 1000.0:.2f} ms")
+    assert recent_heart and all(s["dominant_chakra"] == "Heart" for s in recent_heart)
+    store.rebuild_aggregates()
+    assert store.practice_summary("user3", days=30)["sessions"] == sessions
+    assert query_ms < 20.0
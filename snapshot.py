@@ -0,0 +1,250 @@
+import collections
+import datetime
+import os
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+from frame_pool import blit_premultiplied
+
+# ============================================================
+#   SNAPSHOT SERVICE
+#   Souvenir photos are composed, encoded and written on a worker
+#   thread; the live loop only copies the frame. The aura vignette
+#   is cached per (resolution, aura color) as a premultiplied uint8
+#   sprite, so tinting is two fixed-point OpenCV ops.
+# ============================================================
+
+SCREENSHOT_DIR = "screenshots"
+VIGNETTE_TINT = 0.6      # Max tint at the edges
+VIGNETTE_RADIUS = 0.6    # Falloff radius as a fraction of the frame width
+VIGNETTE_CACHE_SIZE = 8
+SNAPSHOT_QUEUE = 4
+
+
+class VignetteCache:
+    """
+    Aura vignette as (inv, premul) for blit_premultiplied:
+    out = src * (1 - a) + color * a, with a = 0 at the center and
+    VIGNETTE_TINT at VIGNETTE_RADIUS * width.
+    The alpha ramp is computed once per resolution, the tint once per color.
+    """
+    def __init__(self, max_entries=VIGNETTE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.alphas = {}  # (w, h) -> float32 alpha
+        self.sprites = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def _alpha(self, w, h):
+        alpha = self.alphas.get((w, h))
+        if alpha is None:
+            yy, xx = np.ogrid[:h, :w]
+            dist = np.sqrt((xx - w // 2) ** 2 + (yy - h // 2) ** 2, dtype=np.float32)
+            alpha = (np.clip(dist / (w * VIGNETTE_RADIUS), 0, 1) * VIGNETTE_TINT).astype(np.float32)
+            self.alphas[(w, h)] = alpha
+        return alpha
+
+    def get(self, w, h, color):
+        key = (w, h, tuple(int(c) for c in color))
+        with self.lock:
+            sprite = self.sprites.get(key)
+            if sprite is not None:
+                self.sprites.move_to_end(key)
+                return sprite
+            alpha = self._alpha(w, h)[..., None]
+            inv = np.repeat(np.rint(255.0 * (1.0 - alpha)).astype(np.uint8), 3, axis=2)
+            premul = np.rint(alpha * np.array(key[2], dtype=np.float32)).astype(np.uint8)
+            sprite = (inv, premul)
+            self.sprites[key] = sprite
+            if len(self.sprites) > self.max_entries:
+                self.sprites.popitem(last=False)
+            return sprite
+
+    def apply(self, img, color):
+        h, w = img.shape[:2]
+        inv, premul = self.get(w, h, color)
+        blit_premultiplied(img, 0, 0, inv, premul)
+
+
+vignettes = VignetteCache()
+
+
+def compose_souvenir(frame, aura_color, avg_hr, focus_level, when=None):
+    """Draws the souvenir (vignette, border, stats bar) onto `frame` in place."""
+    h, w = frame.shape[:2]
+    when = when or datetime.datetime.now()
+
+    # 1. Aura glow (vignette)
+    vignettes.apply(frame, aura_color)
+
+    # 2. Border
+    cv2.rectangle(frame, (0, 0), (w, h), aura_color, 20)
+
+    # 3. Stats bar
+    bar_h = 120
+    cv2.rectangle(frame, (0, h - bar_h), (w, h), (20, 20, 20), -1)
+    cv2.putText(frame, "YOGA AI SOUVENIR", (w // 2 - 150, h - 80),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+    cv2.putText(frame, when.strftime("%Y-%m-%d %H:%M"), (w - 250, h - 20),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
+    stats_text = f"Avg HR: {int(avg_hr)} BPM   |   Focus: {int(focus_level * 100)}%"
+    cv2.putText(frame, stats_text, (50, h - 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.7, aura_color, 2)
+    return frame
+
+
+class SnapshotService:
+    """
+    Non-blocking souvenir photos.
+
+        filename = snapshots.capture(frame, aura_color, hr, focus)
+
+    capture() copies the frame and returns the target filename right away;
+    composing, PNG/JPEG encoding and the disk write happen on the worker.
+    If the worker is busy with SNAPSHOT_QUEUE photos, the request is dropped
+    (returns None) rather than blocking the live loop.
+    """
+    def __init__(self, directory=SCREENSHOT_DIR, ext=".png", queue_size=SNAPSHOT_QUEUE):
+        self.directory = directory
+        self.ext = ext
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.saved = 0
+        self.dropped = 0
+        self.last_stamp = None
+        self.seq = 0
+        self.last_ms = 0.0
+
+    def _ensure_worker(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def _filename(self, when):
+        # Readable timestamp; a suffix keeps photos taken within one second apart
+        stamp = when.strftime("%Y%m%d_%H%M%S")
+        self.seq = self.seq + 1 if stamp == self.last_stamp else 0
+        self.last_stamp = stamp
+        base = os.path.join(self.directory, f"yoga_session_{stamp}")
+        filename = base + (f"_{self.seq}" if self.seq else "") + self.ext
+        while os.path.exists(filename):
+            self.seq += 1
+            filename = f"{base}_{self.seq}{self.ext}"
+        return filename
+
+    def capture(self, frame, aura_color, avg_hr, focus_level):
+        when = datetime.datetime.now()
+        filename = self._filename(when)
+        try:
+            self.jobs.put_nowait((frame.copy(), tuple(aura_color), avg_hr, focus_level, when, filename))
+        except queue.Full:
+            self.dropped += 1
+            print("[WARN] Snapshot skipped: previous photos are still being saved.")
+            return None
+        self._ensure_worker()
+        return filename
+
+    def _run(self):
+        while True:
+            img, aura_color, avg_hr, focus_level, when, filename = self.jobs.get()
+            t0 = time.perf_counter()
+            try:
+                compose_souvenir(img, aura_color, avg_hr, focus_level, when)
+                os.makedirs(self.directory, exist_ok=True)
+                ok, buf = cv2.imencode(self.ext, img)
+                if not ok:
+                    raise IOError(f"could not encode {self.ext}")
+                with open(filename, "wb") as f:
+                    f.write(buf.tobytes())
+                self.saved += 1
+                self.last_ms = (time.perf_counter() - t0) * 1000.0
+                print(f"[INFO] 📸 Screenshot saved: {filename}")
+            except Exception as e:
+                print(f"[ERROR] Could not save screenshot {filename}: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def flush(self):
+        """Waits until every queued photo is on disk (call at exit)."""
+        if self.thread is not None and self.thread.is_alive():
+            self.jobs.join()
+
+
+# Shared service for the app
+snapshots = SnapshotService()
+
+
+class FlashMessage:
+    """
+    Timed camera-flash + caption drawn by the loop on the following frames,
+    replacing the cv2.waitKey pauses that froze the video.
+    """
+    def __init__(self):
+        self.until = 0.0
+        self.duration = 0.0
+        self.text = ""
+        self.org = (0, 0)
+        self.scale = 1.0
+        self.color = (0, 255, 0)
+        self.thickness = 2
+        self.flash = True
+
+    def show(self, text, org, scale=1.0, color=(0, 255, 0), thickness=3, duration=0.3, flash=True, now=None):
+        now = time.time() if now is None else now
+        self.until = now + duration
+        self.duration = duration
+        self.text = text
+        self.org = (int(org[0]), int(org[1]))
+        self.scale = scale
+        self.color = color
+        self.thickness = thickness
+        self.flash = flash
+
+    def draw(self, frame, now=None):
+        now = time.time() if now is None else now
+        remaining = self.until - now
+        if remaining <= 0:
+            return
+        if self.flash:
+            a = 0.5 * remaining / self.duration # White flash fading out
+            cv2.convertScaleAbs(frame, dst=frame, alpha=1.0 - a, beta=255.0 * a)
+        cv2.putText(frame, self.text, self.org, cv2.FONT_HERSHEY_SIMPLEX, self.scale, self.color, self.thickness)
+
+
+if __name__ == "__main__":
+    # Vignette must match the original float64 blend; capture() must not block
+    import tempfile
+
+    frame = np.random.randint(0, 255, (630, 1120, 3), dtype=np.uint8)
+    color = (255, 0, 180)
+    h, w = frame.shape[:2]
+
+    def old_vignette(f):
+        Y, X = np.ogrid[:h, :w]
+        dist = np.sqrt((X - w // 2) ** 2 + (Y - h // 2) ** 2)
+        alpha = (1 - (1 - np.clip(dist / (w * 0.6), 0, 1))) * 0.6
+        alpha = np.dstack((alpha, alpha, alpha))
+        return (f * (1 - alpha) + np.full((h, w, 3), color, dtype=np.uint8) * alpha).astype(np.uint8)
+
+    t0 = time.perf_counter()
+    a = old_vignette(frame)
+    t_old = time.perf_counter() - t0
+    b = frame.copy()
+    vignettes.apply(b, color)
+    b = frame.copy()
+    t0 = time.perf_counter()
+    vignettes.apply(b, color)
+    t_new = time.perf_counter() - t0
+    diff = np.abs(a.astype(int) - b.astype(int)).max()
+    print(f"[INFO] Vignette {t_old * 1000:.1f} ms -> {t_new * 1000:.2f} ms, max pixel difference {diff}")
+    assert diff <= 2, "Cached vignette differs from the original blend"
+
+    service = SnapshotService(directory=tempfile.mkdtemp())
+    t0 = time.perf_counter()
+    names = [service.capture(frame, color, 72, 0.8) for _ in range(3)]
+    print(f"[INFO] capture(): {(time.perf_counter() - t0) / 3 * 1000:.2f} ms per photo on the live thread")
+    service.flush()
+    assert all(os.path.exists(n) for n in names), names
+    print(f"[INFO] {service.saved} photos written ({service.last_ms:.0f} ms each on the worker)")
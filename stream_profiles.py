@@ -0,0 +1,132 @@
+import collections
+import os
+import threading
+import time
+import weakref
+
+# ============================================================
+#   STREAM PROFILES
+#   Server-driven capture constraints for the WebRTC stream.
+#   The profile (resolution + frame rate) is picked from the
+#   number of live sessions and the current server load, with
+#   hysteresis so it does not flap.
+# ============================================================
+
+StreamProfile = collections.namedtuple("StreamProfile", "name width height fps")
+
+PROFILES = [
+    StreamProfile("720p", 1280, 720, 24),
+    StreamProfile("540p", 960, 540, 20),
+    StreamProfile("480p", 640, 480, 15),
+    StreamProfile("360p", 480, 360, 12),
+]
+
+# Sessions that fit at each profile before stepping down
+SESSIONS_PER_PROFILE = (2, 4, 8)
+HIGH_LOAD = 0.85     # Load (1.0 = saturated) above which one more step down is taken
+OVERLOAD = 1.2       # ... and two steps
+DOWN_HOLD_S = 5.0    # A lower profile must be recommended this long before switching
+UP_HOLD_S = 20.0     # Stepping back up waits longer (a restart costs more than it saves)
+
+FRAME_BUDGET_MS = 1000.0 / 24
+
+# Live video processors of this server process (for session count + latency)
+active_processors = weakref.WeakSet()
+
+
+def cpu_load():
+    """1-minute load average per core; 0.0 where the OS does not report it."""
+    if not hasattr(os, "getloadavg"):
+        return 0.0
+    return os.getloadavg()[0] / (os.cpu_count() or 1)
+
+
+def live_processors():
+    """Sessions currently holding their models (idle ones released by the reaper are left out)."""
+    return [p for p in list(active_processors) if p.graphs_loaded]
+
+
+def processing_load(budget_ms):
+    """Mean per-frame processing latency of the live sessions as a fraction of the frame budget."""
+    latencies = [p.latency_ms for p in live_processors() if p.processed]
+    return (sum(latencies) / len(latencies) / budget_ms) if latencies else 0.0
+
+
+def recommend(sessions, load):
+    """Index into PROFILES for `sessions` live streams at `load`."""
+    idx = sum(sessions > n for n in SESSIONS_PER_PROFILE)
+    if load > OVERLOAD:
+        idx += 2
+    elif load > HIGH_LOAD:
+        idx += 1
+    return max(0, min(len(PROFILES) - 1, idx))
+
+
+def media_constraints(profile):
+    """getUserMedia constraints asking the browser for this profile."""
+    return {
+        "video": {
+            "width": {"ideal": profile.width},
+            "height": {"ideal": profile.height},
+            "frameRate": {"ideal": profile.fps, "max": profile.fps},
+        },
+        "audio": False,
+    }
+
+
+class ProfileSelector:
+    """
+    Process-wide profile choice. update() is cheap and may be called from
+    every session's UI loop; the load is sampled at most once per second.
+    """
+    def __init__(self, budget_ms):
+        self.budget_ms = budget_ms
+        self.index = 0
+        self.pending = None   # (index, since)
+        self.last_sample = 0.0
+        self.sessions = 0
+        self.load = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def profile(self):
+        return PROFILES[self.index]
+
+    def update(self, now=None, sessions=None, load=None):
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if now - self.last_sample < 1.0 and sessions is None:
+                return self.profile
+            self.last_sample = now
+            self.sessions = len(live_processors()) if sessions is None else sessions
+            self.load = max(cpu_load(), processing_load(self.budget_ms)) if load is None else load
+
+            target = recommend(self.sessions, self.load)
+            if target == self.index:
+                self.pending = None
+            elif self.pending is None or self.pending[0] != target:
+                self.pending = (target, now)
+            elif now - self.pending[1] >= (DOWN_HOLD_S if target > self.index else UP_HOLD_S):
+                self.index = target
+                self.pending = None
+                p = self.profile
+                print(f"[INFO] Stream profile -> {p.name} @ {p.fps} fps "
+                      f"(sessions {self.sessions}, load {self.load:.2f})")
+            return self.profile
+
+
+# Shared by every Streamlit session of this process (module globals in app.py
+# are re-created on each script run)
+profile_selector = ProfileSelector(FRAME_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    # Growing class: the profile steps down with sessions / load, and recovers slowly
+    selector = ProfileSelector(FRAME_BUDGET_MS)
+    t = 0.0
+    for sessions, load, seconds in ((1, 0.3, 10), (5, 0.6, 10), (5, 1.3, 10), (2, 0.3, 60)):
+        for _ in range(seconds):
+            t += 1.0
+            p = selector.update(t, sessions, load)
+        print(f"[INFO] sessions={sessions} load={load}: {p.name} @ {p.fps} fps")
+    assert selector.profile.name == "720p"
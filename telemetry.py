@@ -0,0 +1,228 @@
+import datetime
+import os
+import queue
+import threading
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# ============================================================
+#   TELEMETRY RECORDER
+#   Per-frame practice state, columnar. record() stores one row
+#   into preallocated NumPy columns (no Python objects kept per
+#   frame); full batches are handed to a writer thread that
+#   builds Arrow record batches and appends them to a Parquet
+#   file as one row group each. Categorical fields are dictionary
+#   encoded. Memory is bounded by TELEMETRY_BUFFERS batches:
+#   if the writer falls that far behind, a batch is dropped.
+# ============================================================
+
+TELEMETRY_DIR = "telemetry"
+TELEMETRY_BATCH_ROWS = 8192  # ~6 min at 24 fps per row group
+TELEMETRY_BUFFERS = 4        # Batches in memory (filling + queued + being written)
+CHAKRA_COUNT = 7
+
+CATEGORICAL = ("mudra", "gaze", "stage")
+
+SCHEMA = pa.schema([
+    ("ts", pa.timestamp("us")),
+    ("frame", pa.int32()),
+    ("chakra_energies", pa.list_(pa.float32(), CHAKRA_COUNT)),
+    ("mudra", pa.dictionary(pa.int16(), pa.string())),
+    ("posture_score", pa.float32()),
+    ("eye_ratio", pa.float32()),
+    ("gaze", pa.dictionary(pa.int16(), pa.string())),
+    ("hr", pa.float32()),
+    ("spo2", pa.float32()),
+    ("hrv_ms", pa.float32()),
+    ("stage", pa.dictionary(pa.int16(), pa.string())),
+    ("xp", pa.float32()),
+    ("level", pa.int16()),
+])
+
+
+class _Columns:
+    """One batch worth of preallocated columns."""
+    def __init__(self, rows):
+        self.rows = 0
+        self.ts = np.empty(rows, dtype=np.float64)
+        self.frame = np.empty(rows, dtype=np.int32)
+        self.chakra_energies = np.empty((rows, CHAKRA_COUNT), dtype=np.float32)
+        self.codes = {name: np.empty(rows, dtype=np.int16) for name in CATEGORICAL} # -1 = null
+        self.floats = np.empty((rows, 6), dtype=np.float32) # posture, eye, hr, spo2, hrv, xp
+        self.level = np.empty(rows, dtype=np.int16)
+
+
+class TelemetryRecorder:
+    """
+    Records the per-frame state of a session to Parquet.
+
+        tel = TelemetryRecorder("telemetry/session.parquet").start()
+        tel.record(ts, energies, mudra, posture, eye_ratio, gaze, hr, spo2, hrv, stage, xp, level)
+        tel.stop()
+
+    record() costs a few microseconds and never waits for the disk.
+    """
+    def __init__(self, path, batch_rows=TELEMETRY_BATCH_ROWS, buffers=TELEMETRY_BUFFERS, compression="zstd"):
+        self.path = path
+        self.batch_rows = batch_rows
+        self.compression = compression
+        self.free = queue.Queue()
+        for _ in range(buffers - 1):
+            self.free.put(_Columns(batch_rows))
+        self.current = _Columns(batch_rows)
+        self.jobs = queue.Queue()
+        # Category value -> code; append-only, so earlier batches stay valid
+        self.categories = {name: {} for name in CATEGORICAL}
+        self.thread = None
+        self.running = False
+        self.frame = 0
+        self.rows_written = 0
+        self.dropped = 0
+        self.write_ms = 0.0
+        self.error = None
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        print(f"[INFO] Telemetry to {self.path}")
+        return self
+
+    def _code(self, name, value):
+        if value is None:
+            return -1
+        table = self.categories[name]
+        code = table.get(value)
+        if code is None:
+            code = table[value] = len(table)
+        return code
+
+    def record(self, ts, chakra_energies, mudra, posture_score, eye_ratio, gaze,
+               hr, spo2, hrv_ms, stage, xp, level):
+        if not self.running:
+            return
+        c = self.current
+        i = c.rows
+        c.ts[i] = ts
+        c.frame[i] = self.frame
+        c.chakra_energies[i] = chakra_energies
+        c.codes["mudra"][i] = self._code("mudra", mudra)
+        c.codes["gaze"][i] = self._code("gaze", gaze)
+        c.codes["stage"][i] = self._code("stage", stage)
+        c.floats[i] = (posture_score, eye_ratio, hr, spo2, hrv_ms, xp)
+        c.level[i] = level
+        c.rows = i + 1
+        self.frame += 1
+        if c.rows == self.batch_rows:
+            self._seal()
+
+    def _seal(self):
+        c = self.current
+        try:
+            spare = self.free.get_nowait()
+        except queue.Empty:
+            # Writer is TELEMETRY_BUFFERS batches behind: drop this one, keep the memory bound
+            self.dropped += c.rows
+            print(f"[WARN] Telemetry writer behind; dropped {c.rows} rows")
+            c.rows = 0
+            return
+        self.jobs.put((c, {name: list(t) for name, t in self.categories.items()}))
+        spare.rows = 0
+        self.current = spare
+
+    def stop(self):
+        """Writes the partial batch, closes the file."""
+        if not self.running:
+            return
+        self.running = False
+        if self.current.rows:
+            self.jobs.put((self.current, {name: list(t) for name, t in self.categories.items()}))
+        self.jobs.put(None)
+        self.thread.join()
+        print(f"[INFO] Telemetry saved: {self.path} ({self.rows_written} rows, {self.dropped} dropped)")
+
+    # --- Writer side ---
+
+    def _batch(self, c, categories):
+        n = c.rows
+        arrays = [
+            pa.array((c.ts[:n] * 1e6).astype(np.int64), type=pa.timestamp("us")),
+            pa.array(c.frame[:n]),
+            pa.FixedSizeListArray.from_arrays(pa.array(c.chakra_energies[:n].ravel()), CHAKRA_COUNT),
+        ]
+        dicts = {}
+        for name in CATEGORICAL:
+            codes = c.codes[name][:n]
+            dicts[name] = pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0), pa.array(categories[name], type=pa.string()))
+        f = c.floats[:n]
+        arrays += [dicts["mudra"], pa.array(f[:, 0]), pa.array(f[:, 1]), dicts["gaze"],
+                   pa.array(f[:, 2]), pa.array(f[:, 3]), pa.array(f[:, 4]), dicts["stage"],
+                   pa.array(f[:, 5]), pa.array(c.level[:n])]
+        return pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+    def _run(self):
+        writer = None
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                c, categories = job
+                t0 = time.perf_counter()
+                batch = self._batch(c, categories)
+                if writer is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    writer = pq.ParquetWriter(self.path, SCHEMA, compression=self.compression)
+                writer.write_batch(batch, row_group_size=self.batch_rows)
+                self.rows_written += c.rows
+                self.write_ms = (time.perf_counter() - t0) * 1000.0
+                self.free.put(c)
+        except Exception as e:
+            self.error = e
+            self.running = False
+            print(f"[ERROR] Telemetry stopped: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def start_session_telemetry(directory=TELEMETRY_DIR):
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return TelemetryRecorder(os.path.join(directory, f"session_{stamp}.parquet")).start()
+
+
+if __name__ == "__main__":
+    # A simulated 2-hour session at 24 fps: per-frame cost, bounded memory, readable file
+    import tempfile
+    import tracemalloc
+
+    path = os.path.join(tempfile.mkdtemp(), "telemetry_selfcheck.parquet")
+    tel = TelemetryRecorder(path).start()
+    mudras = [None, "Gyan Mudra", "Prana Mudra", "Anjali Mudra"]
+    stages = ["Focusing...", "Dharana (Focus)", "Dhyana (Meditation)", "Distracted"]
+    energies = [0.4] * CHAKRA_COUNT
+    rows = 2 * 3600 * 24
+    t_start = time.time()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for i in range(rows):
+        energies[i % CHAKRA_COUNT] = (i % 100) / 100.0
+        tel.record(t_start + i / 24.0, energies, mudras[(i // 240) % 4], 0.8, 0.03,
+                   "Center" if i % 50 else "Left", 72.0, 98.0, 45.0, stages[(i // 2400) % 4], i * 0.01, 1 + i // 20000)
+    per_row_us = (time.perf_counter() - t0) / rows * 1e6
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tel.stop()
+
+    table = pq.read_table(path)
+    meta = pq.ParquetFile(path).metadata
+    print(f"[INFO] record(): {per_row_us:.1f} us/frame, peak traced memory {peak / 1e6:.1f} MB; "
+          f"{table.num_rows} rows in {meta.num_row_groups} row groups, {os.path.getsize(path) / 1e6:.2f} MB on disk")
+    assert table.num_rows + tel.dropped == rows
+    assert table.column("mudra")[0].as_py() is None and table.column("mudra")[240].as_py() == "Gyan Mudra"
+    assert table.column("chakra_energies")[1].as_py()[1] == np.float32(0.01)
@@ -0,0 +1,235 @@
+import collections
+import threading
+import time
+import cv2
+import numpy as np
+
+from frame_pool import blit_premultiplied
+
+# ============================================================
+#   TEXT SPRITE CACHE
+#   HUD strings are mostly identical from frame to frame, so each
+#   (text, font, scale, strokes) is rasterized once into a small
+#   premultiplied sprite and blitted afterwards. Measurements and
+#   word-wrap results are cached as well. The shared cache is
+#   used from every session's worker thread, so lookups and
+#   evictions are locked; rendering a miss happens outside the lock.
+# ============================================================
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_CACHE_BYTES = 16 * 1024 * 1024 # Sprite memory cap
+MEASURE_CACHE_SIZE = 4096
+WRAP_CACHE_SIZE = 256
+
+
+class _LRU:
+    """Tiny thread-safe LRU dict with an entry cap."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.items = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_entries:
+                self.items.popitem(last=False)
+        return value
+
+
+class TextCache:
+    """
+    Drop-in replacements for cv2.getTextSize / cv2.putText.
+
+    strokes is a tuple of (color, thickness) drawn in order, so outlined
+    text (black shadow + white outline + gold core) becomes ONE blit.
+    Sprites are evicted least-recently-used once max_bytes is exceeded.
+    """
+    def __init__(self, max_bytes=TEXT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.sprites = collections.OrderedDict()
+        self.lock = threading.Lock() # Guards sprites, bytes and the counters
+        self.bytes = 0
+        self.measures = _LRU(MEASURE_CACHE_SIZE)
+        self.wraps = _LRU(WRAP_CACHE_SIZE)
+        self.hits = 0
+        self.misses = 0
+
+    # --- Measurement ---
+
+    def measure(self, text, scale, thickness=1, font=FONT):
+        """Same result as cv2.getTextSize: ((w, h), baseline)."""
+        key = (text, font, scale, thickness)
+        size = self.measures.get(key)
+        if size is None:
+            size = self.measures.put(key, cv2.getTextSize(text, font, scale, thickness))
+        return size
+
+    # --- Wrapping ---
+
+    def wrap_pixels(self, text, max_width, scale, thickness=1, font=FONT):
+        """Greedy word wrap by pixel width (as draw_paragraph_with_bg did)."""
+        key = ("px", text, max_width, scale, thickness, font)
+        lines = self.wraps.get(key)
+        if lines is not None:
+            return lines
+        lines = []
+        line = ""
+        for word in text.split():
+            test_line = line + (" " if line else "") + word
+            (w_px, _), _ = self.measure(test_line, scale, thickness, font)
+            if w_px > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = test_line
+        if line:
+            lines.append(line)
+        return self.wraps.put(key, lines)
+
+    def wrap_chars(self, text, max_chars=60):
+        """Greedy word wrap by character count (as wrap_text did)."""
+        key = ("chars", text, max_chars)
+        lines = self.wraps.get(key)
+        if lines is not None:
+            return lines
+        lines = []
+        line = ""
+        for word in text.split():
+            if len(line) + len(word) + 1 <= max_chars:
+                line += (" " if line else "") + word
+            else:
+                lines.append(line)
+                line = word
+        if line:
+            lines.append(line)
+        return self.wraps.put(key, lines)
+
+    # --- Rendering ---
+
+    def _render(self, text, scale, strokes, font, line_type):
+        max_thick = max(t for _, t in strokes)
+        (tw, th), baseline = self.measure(text, scale, max_thick, font)
+        pad = max_thick + 2
+        w, h = tw + 2 * pad, th + baseline + 2 * pad
+        org = (pad, pad + th) # Baseline origin inside the sprite
+
+        color_acc = np.zeros((h, w, 3), dtype=np.float32)
+        alpha_acc = np.zeros((h, w, 1), dtype=np.float32)
+        mask = np.zeros((h, w), dtype=np.uint8)
+        for color, thick in strokes:
+            mask.fill(0)
+            cv2.putText(mask, text, org, font, scale, 255, thick, line_type)
+            m = (mask.astype(np.float32) / 255.0)[..., None]
+            color_acc = color_acc * (1.0 - m) + np.array(color, dtype=np.float32) * m
+            alpha_acc = alpha_acc * (1.0 - m) + m
+
+        # color_acc is already premultiplied (it started from black)
+        inv = np.repeat(np.rint(255.0 * (1.0 - alpha_acc)).astype(np.uint8), 3, axis=2)
+        premul = np.rint(color_acc).astype(np.uint8)
+        return org, inv, premul
+
+    def sprite(self, text, scale, strokes, font=FONT, line_type=cv2.LINE_AA):
+        key = (text, font, scale, strokes, line_type)
+        with self.lock:
+            entry = self.sprites.get(key)
+            if entry is not None:
+                self.sprites.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = self._render(text, scale, strokes, font, line_type)
+        with self.lock:
+            if key in self.sprites: # Another thread rendered it meanwhile
+                self.sprites.move_to_end(key)
+                return self.sprites[key]
+            self.sprites[key] = entry
+            self.bytes += entry[1].nbytes + entry[2].nbytes
+            while self.bytes > self.max_bytes and len(self.sprites) > 1:
+                _, old = self.sprites.popitem(last=False)
+                self.bytes -= old[1].nbytes + old[2].nbytes
+        return entry
+
+    def put_stroked(self, frame, text, org, scale, strokes, font=FONT, line_type=cv2.LINE_AA):
+        """org is the baseline-left point, exactly like cv2.putText."""
+        if not text:
+            return
+        (ox, oy), inv, premul = self.sprite(text, scale, tuple(strokes), font, line_type)
+        blit_premultiplied(frame, int(org[0]) - ox, int(org[1]) - oy, inv, premul)
+
+    def put_text(self, frame, text, org, scale, color, thickness=1, font=FONT, line_type=cv2.LINE_AA):
+        self.put_stroked(frame, text, org, scale, ((tuple(color), thickness),), font, line_type)
+
+    def stats(self):
+        with self.lock:
+            return {"sprites": len(self.sprites), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+
+# Shared cache for the HUD helpers
+text_cache = TextCache()
+
+
+if __name__ == "__main__":
+    # Compare a typical HUD text workload: cv2 vs cached sprites
+    frame = np.full((630, 1120, 3), 30, dtype=np.uint8)
+    lines = [f"Chakra {i}: Balanced & Flowing" for i in range(20)]
+    strokes = (((0, 0, 0), 4), ((255, 255, 255), 2), ((0, 215, 255), 1))
+
+    def cv2_hud(f):
+        for i, s in enumerate(lines):
+            cv2.getTextSize(s, FONT, 0.6, 2)
+            for color, thick in strokes:
+                cv2.putText(f, s, (20, 30 + i * 28), FONT, 0.6, color, thick, cv2.LINE_AA)
+
+    def cached_hud(f):
+        for i, s in enumerate(lines):
+            text_cache.measure(s, 0.6, 2)
+            text_cache.put_stroked(f, s, (20, 30 + i * 28), 0.6, strokes)
+
+    for name, fn in (("cv2.putText", cv2_hud), ("text cache", cached_hud)):
+        f = frame.copy()
+        fn(f)
+        t0 = time.perf_counter()
+        for _ in range(30):
+            fn(f)
+        print(f"[INFO] 20 outlined HUD lines via {name}: {(time.perf_counter() - t0) / 30 * 1000:.2f} ms")
+
+    # Rendering must match cv2 closely (anti-aliasing only differs in rounding)
+    a = frame.copy()
+    b = frame.copy()
+    cv2.putText(a, "Level 7", (50, 50), FONT, 0.8, (0, 255, 255), 2, cv2.LINE_AA)
+    text_cache.put_text(b, "Level 7", (50, 50), 0.8, (0, 255, 255), 2)
+    diff = np.abs(a.astype(int) - b.astype(int)).max()
+    print(f"[INFO] Max pixel difference vs cv2.putText: {diff}; cache {text_cache.stats()}")
+    assert diff <= 8, "Cached text differs from cv2.putText"
+
+    # Shared by every session thread: concurrent misses and evictions must
+    # neither raise nor corrupt the byte count
+    small = TextCache(max_bytes=512 * 1024)
+    errors = []
+
+    def hammer(seed):
+        try:
+            for i in range(2000):
+                text = f"Session {seed} frame {i}" if i % 10 == 0 else f"Level {i % 15}"
+                small.put_text(frame, text, (20, 40), 0.6, (255, 255, 255), 2)
+                small.measure(f"{seed}:{i % 5000}", 0.5)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=hammer, args=(s,)) for s in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counted = sum(e[1].nbytes + e[2].nbytes for e in small.sprites.values())
+    print(f"[INFO] 8 threads: {small.stats()}, errors {errors}")
+    assert not errors and small.bytes == counted <= small.max_bytes
+    assert len(small.measures.items) <= MEASURE_CACHE_SIZE